@@ -0,0 +1,181 @@
+import numpy as np
+from pydantic import BaseModel
+
+
+class PixelAnomalies(BaseModel):
+    """Class model to define pixels of a frame departing from their own history."""
+
+    pixels: list[int]
+    values: list[int]
+    z_scores: list[float]
+    stuck_pixels: list[int]
+
+
+class PixelAnomalyDetector:
+    """
+    Class to detect pixels departing from their own history, from per-pixel exponentially
+    weighted means and variances of each sensor. Statistics of all sensors are rows of shared
+    arrays, updated in place with a few vectorized operations per frame, so memory and cost per
+    frame do not depend on the number of sensors.
+
+    Pixels whose z-score against their history exceeds the threshold (sudden heating, spikes)
+    are reported once a sensor has seen warmup frames. Deviations are clipped to the threshold
+    when updating statistics, so anomalies do not corrupt the history, and pixels staying at a
+    new level are absorbed over about 1 / alpha frames. Pixels whose value does not change over
+    stuck_frames frames are reported once as stuck.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 4.0,
+        alpha: float = 0.05,
+        warmup: int = 20,
+        stuck_frames: int = 100,
+        count_pixels: int = 64,
+        min_std: float = 1.0,
+        initial_capacity: int = 64,
+    ):
+        self.threshold = threshold
+        self.alpha = alpha
+        self.warmup = warmup
+        self.stuck_frames = stuck_frames
+        self.count_pixels = count_pixels
+        # Floor of standard deviations, so noiseless pixels do not give infinite z-scores
+        self.min_variance = min_std**2
+
+        # Row of each sensor in statistics arrays, grown by doubling
+        self.sensor_rows: dict[str, int] = {}
+        self._means = np.zeros((initial_capacity, count_pixels))
+        self._variances = np.zeros((initial_capacity, count_pixels))
+        self._counts = np.zeros(initial_capacity, dtype=np.int64)
+        self._values_last = np.zeros((initial_capacity, count_pixels), dtype=np.uint16)
+        self._runs_unchanged = np.zeros(
+            (initial_capacity, count_pixels), dtype=np.int32
+        )
+
+        # Constants and buffers reused on every frame
+        self._decay = 1 - alpha
+        self._min_limit = threshold**2 * self.min_variance
+        self._empty = np.empty(0, dtype=np.intp)
+        self._deviations = np.empty(count_pixels)
+        self._squares = np.empty(count_pixels)
+        self._limits = np.empty(count_pixels)
+        self._unchanged = np.empty(count_pixels, dtype=bool)
+
+    def update(self, sensor_id: str, values: np.ndarray):
+        """Score a frame against the history of its sensor, then add it to the history.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            values (np.ndarray): flat frame values.
+
+        Raises:
+            ValueError: frame does not have the number of pixels of the detector.
+
+        Returns:
+            PixelAnomalies | None: anomalous and stuck pixels of the frame. None if there are none.
+        """
+        if len(values) != self.count_pixels:
+            raise ValueError(
+                f"Frame of {len(values)} pixels, expected {self.count_pixels} pixels."
+            )
+
+        row = self.sensor_rows.get(sensor_id)
+        if row is None:
+            row = self._add_sensor(sensor_id, values)
+        mean = self._means[row]
+        variance = self._variances[row]
+        deviations, squares, limits = self._deviations, self._squares, self._limits
+        count = int(self._counts[row])
+        self._counts[row] = count + 1
+
+        np.subtract(values, mean, out=deviations)
+        np.multiply(deviations, deviations, out=squares)
+
+        # Compare squared deviations to the threshold, against the history before the frame is
+        # added to it. Variance is corrected for its zero initialization.
+        anomalous = self._empty
+        if count >= self.warmup:
+            np.multiply(
+                variance, self.threshold**2 / (1 - self._decay**count), out=limits
+            )
+            np.maximum(limits, self._min_limit, out=limits)
+            exceeding = squares > limits
+            if exceeding.any():
+                anomalous = np.flatnonzero(exceeding)
+                z_scores = deviations[anomalous] * (
+                    self.threshold / np.sqrt(limits[anomalous])
+                )
+
+                # Clip deviations of anomalous pixels before updating the history
+                deviations[anomalous] *= self.threshold / np.abs(z_scores)
+                squares[anomalous] = limits[anomalous]
+
+        # Exponentially weighted mean and variance (West's incremental update)
+        squares *= self.alpha
+        variance += squares
+        variance *= self._decay
+        deviations *= self.alpha
+        mean += deviations
+
+        stuck = self._empty
+        if self.stuck_frames > 0:
+            runs = self._runs_unchanged[row]
+            np.equal(values, self._values_last[row], out=self._unchanged)
+            runs += 1
+            runs *= self._unchanged
+            self._values_last[row] = values
+            if runs.max() >= self.stuck_frames:
+                stuck = np.flatnonzero(runs == self.stuck_frames)
+
+        if not anomalous.size and not stuck.size:
+            return None
+
+        return PixelAnomalies(
+            pixels=anomalous.tolist(),
+            values=np.asarray(values)[anomalous].tolist(),
+            z_scores=np.round(z_scores, 3).tolist() if anomalous.size else [],
+            stuck_pixels=stuck.tolist(),
+        )
+
+    def get_stats(self):
+        """Get statistics of the detector.
+
+        Returns:
+            dict: number of tracked sensors and memory used by their statistics [B].
+        """
+        return {
+            "sensors": len(self.sensor_rows),
+            "memory": sum(
+                array.nbytes
+                for array in (
+                    self._means,
+                    self._variances,
+                    self._counts,
+                    self._values_last,
+                    self._runs_unchanged,
+                )
+            ),
+        }
+
+    def _add_sensor(self, sensor_id: str, values: np.ndarray):
+        row = len(self.sensor_rows)
+        if row == len(self._counts):
+            self._means, self._variances, self._values_last, self._runs_unchanged = (
+                np.concatenate([array, np.zeros_like(array)])
+                for array in (
+                    self._means,
+                    self._variances,
+                    self._values_last,
+                    self._runs_unchanged,
+                )
+            )
+            self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)])
+
+        # History starts from the first frame
+        self.sensor_rows[sensor_id] = row
+        self._means[row] = values
+        self._variances[row] = 0
+        self._values_last[row] = values
+
+        return row
@@ -0,0 +1,180 @@
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel, Field, field_validator
+
+from sensor_reader.db.frame_log import get_dir_name
+
+# Content type of calibrated frames encoded as raw little-endian float32 temperatures
+CONTENT_TYPE_TEMPERATURES = "application/x-float32"
+
+# Number of possible raw values, indexing lookup tables
+_COUNT_RAW_VALUES = 2**16
+
+
+class CalibrationParams(BaseModel):
+    """
+    Class model to define the calibration of a sensor, as stored in its calibration file:
+    per-pixel gain and offset applied to raw counts, then a count-to-temperature curve given by
+    points interpolated linearly.
+    """
+
+    gain: float | list[float] = 1.0
+    offset: float | list[float] = 0.0
+    curve: list[tuple[float, float]] = Field(min_length=2)
+
+    @field_validator("curve")
+    @classmethod
+    def _check_curve(cls, curve: list[tuple[float, float]]):
+        counts = [count for count, _ in curve]
+        if any(b <= a for a, b in zip(counts, counts[1:])):
+            raise ValueError("Counts of curve points must be strictly increasing.")
+        return curve
+
+
+class Calibration:
+    """
+    Class to convert raw counts of a sensor to temperatures. The curve is precomputed once into
+    a lookup table indexed by raw value, so a frame is converted with its per-pixel gain and
+    offset, then a single gather. Temperatures are clamped to the end points of the curve.
+    """
+
+    def __init__(self, params: CalibrationParams, count_pixels: int = 64):
+        self.count_pixels = count_pixels
+        self.gain = self._get_pixel_array(params.gain, "gain")
+        self.offset = self._get_pixel_array(params.offset, "offset")
+        # Corrected counts are the raw counts when gain and offset are neutral
+        self.is_identity = bool(np.all(self.gain == 1) and np.all(self.offset == 0))
+
+        counts, temperatures = np.array(params.curve).T
+        self.lut = np.interp(np.arange(_COUNT_RAW_VALUES), counts, temperatures).astype(
+            np.float32
+        )
+
+        # Buffer of corrected counts, reused on every frame
+        self._counts = np.empty(count_pixels, dtype=np.float32)
+
+    def apply(self, values: np.ndarray):
+        """Convert raw counts of a frame to temperatures.
+
+        Args:
+            values (np.ndarray): flat frame of raw uint16 counts.
+
+        Raises:
+            ValueError: frame does not have the number of pixels of the calibration.
+
+        Returns:
+            np.ndarray: temperatures of the frame, as float32.
+        """
+        if len(values) != self.count_pixels:
+            raise ValueError(
+                f"Frame of {len(values)} pixels, expected {self.count_pixels} pixels."
+            )
+        if self.is_identity:
+            return self.lut.take(values)
+
+        counts = self._counts
+        np.multiply(values, self.gain, out=counts)
+        counts += self.offset
+        np.rint(counts, out=counts)
+        np.clip(counts, 0, _COUNT_RAW_VALUES - 1, out=counts)
+
+        return self.lut.take(counts.astype(np.uint16))
+
+    def _get_pixel_array(self, value: float | list[float], name: str):
+        if isinstance(value, list) and len(value) != self.count_pixels:
+            raise ValueError(
+                f"Calibration {name} of {len(value)} pixels, expected {self.count_pixels}."
+            )
+        return np.full(self.count_pixels, value, dtype=np.float32)
+
+
+class CalibrationStore:
+    """
+    Class to load calibrations of sensors from a directory, with a JSON file of
+    CalibrationParams per sensor named '<sensor>.json', or 'default.json' for sensors without
+    their own file. Loaded calibrations are cached by file, so sensors sharing a file share
+    their lookup table, and files are reloaded once modified, checked at most once per reload
+    interval for each sensor. A file that cannot be loaded keeps its previous calibration.
+    """
+
+    name_default = "default"
+
+    def __init__(
+        self, path_dir: str, count_pixels: int = 64, reload_interval: float = 5.0
+    ):
+        self.path_dir = Path(path_dir)
+        self.count_pixels = count_pixels
+        self.reload_interval = reload_interval  # [s]
+
+        # Calibration file of each sensor and time it was last checked, calibration and
+        # modification time of each loaded file
+        self._sensor_files: dict[str, tuple[Path | None, float]] = {}
+        self._calibrations: dict[Path, tuple[int, Calibration | None]] = {}
+        self.count_loads = 0
+        self.count_errors = 0
+
+    def get(self, sensor_id: str):
+        """Get the calibration of a sensor, reloading its file if modified.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+
+        Returns:
+            Calibration | None: calibration of the sensor. None if it has no calibration file.
+        """
+        path, time_checked = self._sensor_files.get(sensor_id, (None, None))
+        time_now = time.monotonic()
+        if time_checked is None or time_now - time_checked >= self.reload_interval:
+            path = self._find_file(sensor_id)
+            self._sensor_files[sensor_id] = (path, time_now)
+            if path is not None:
+                self._load_if_modified(path)
+
+        if path is None:
+            return None
+        return self._calibrations.get(path, (0, None))[1]
+
+    def get_stats(self):
+        """Get statistics of the store.
+
+        Returns:
+            dict: number of sensors and loaded files, file loads and load errors.
+        """
+        return {
+            "sensors": len(self._sensor_files),
+            "files": len(self._calibrations),
+            "loads": self.count_loads,
+            "errors": self.count_errors,
+        }
+
+    def _find_file(self, sensor_id: str):
+        # Sensor identifiers come from raw data, so they may not be safe file names
+        for name in (get_dir_name(sensor_id), self.name_default):
+            path = self.path_dir / f"{name}.json"
+            if path.is_file():
+                return path
+        return None
+
+    def _load_if_modified(self, path: Path):
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return
+        mtime_loaded, calibration = self._calibrations.get(path, (None, None))
+        if mtime == mtime_loaded:
+            return
+
+        try:
+            calibration = Calibration(
+                CalibrationParams.model_validate_json(path.read_bytes()),
+                self.count_pixels,
+            )
+            self.count_loads += 1
+            logger.info(f"Loaded calibration file: {path}")
+        except (OSError, ValueError) as err:
+            self.count_errors += 1
+            logger.error(f"Calibration file {path} could not be loaded: {err}")
+        self._calibrations[path] = (mtime, calibration)
@@ -0,0 +1,172 @@
+import hashlib
+import io
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib import colormaps
+from PIL import Image
+
+# Content type of each supported image format
+CONTENT_TYPES_IMAGE = {"png": "image/png", "jpeg": "image/jpeg"}
+
+
+def get_colormap_lut(colormap: str):
+    """Sample a matplotlib colormap into a lookup table of RGB colors.
+
+    Args:
+        colormap (str): name of the matplotlib colormap.
+
+    Returns:
+        np.ndarray: RGB color of each 8-bit level, of shape (256, 3).
+    """
+    colors = colormaps[colormap](np.linspace(0, 1, 256))[:, :3]
+    return np.round(colors * 255).astype(np.uint8)
+
+
+def get_interpolation_matrix(size_in: int, size_out: int):
+    """Get the matrix of linear interpolation along one axis, aligning pixel centers.
+
+    Args:
+        size_in (int): number of input pixels.
+        size_out (int): number of output pixels.
+
+    Returns:
+        np.ndarray: interpolation matrix, of shape (size_out, size_in).
+    """
+    positions = np.clip(
+        (np.arange(size_out) + 0.5) * size_in / size_out - 0.5, 0, size_in - 1
+    )
+    indices = np.minimum(positions.astype(np.intp), size_in - 2) if size_in > 1 else 0
+    weights = positions - indices
+
+    matrix = np.zeros((size_out, size_in))
+    matrix[np.arange(size_out), indices] = 1 - weights
+    if size_in > 1:
+        matrix[np.arange(size_out), indices + 1] = weights
+
+    return matrix
+
+
+class HeatmapRenderer:
+    """
+    Class to render sensor frames as upscaled heatmap images. The colormap and the bilinear
+    interpolation are precomputed once, so rendering a frame takes two matrix products, a table
+    lookup and the image encoding. Encoded images of identical frames are served from a cache.
+    """
+
+    def __init__(
+        self,
+        frame_shape: tuple[int, int] = (8, 8),
+        scale: int = 32,
+        colormap: str = "inferno",
+        value_range: tuple[int, int] | None = None,
+        image_format: str = "png",
+        quality: int = 85,
+        cache_size: int = 128,
+    ):
+        if image_format not in CONTENT_TYPES_IMAGE:
+            raise ValueError(f"Unsupported image format: {image_format}.")
+
+        self.frame_shape = frame_shape
+        self.scale = scale
+        self.value_range = value_range
+        self.image_format = image_format
+        self.content_type = CONTENT_TYPES_IMAGE[image_format]
+        self.quality = quality
+
+        self._lut = get_colormap_lut(colormap)
+        self._interpolation_rows = get_interpolation_matrix(
+            frame_shape[0], frame_shape[0] * scale
+        )
+        self._interpolation_cols = get_interpolation_matrix(
+            frame_shape[1], frame_shape[1] * scale
+        ).T
+
+        # Encoded images by digest of frame values
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, bytes] = OrderedDict()
+        self.count_cache_hits = 0
+        self.count_cache_misses = 0
+
+    def render(self, values: np.ndarray):
+        """Render frame values as an encoded heatmap image.
+
+        Args:
+            values (np.ndarray): flat or 2D frame values.
+
+        Raises:
+            ValueError: frame does not match the shape of the renderer.
+
+        Returns:
+            bytes: encoded image.
+        """
+        values = np.asarray(values)
+        if values.size != self.frame_shape[0] * self.frame_shape[1]:
+            raise ValueError(
+                f"Frame of {values.size} pixels does not match shape {self.frame_shape}."
+            )
+
+        key = hashlib.blake2b(values.tobytes(), digest_size=16).digest()
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            self.count_cache_hits += 1
+            return image
+
+        self.count_cache_misses += 1
+        image = self.encode(self.colorize(values))
+        self._cache[key] = image
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return image
+
+    def colorize(self, values: np.ndarray):
+        """Upscale frame values and map them to colors.
+
+        Args:
+            values (np.ndarray): flat or 2D frame values.
+
+        Returns:
+            np.ndarray: RGB image, of shape (rows * scale, cols * scale, 3).
+        """
+        frame = np.asarray(values, dtype=np.float64).reshape(self.frame_shape)
+        if self.value_range is None:
+            value_min, value_max = frame.min(), frame.max()
+        else:
+            value_min, value_max = self.value_range
+
+        # Normalize before upscaling, as interpolation does not leave the input range
+        levels = (frame - value_min) * (255 / max(value_max - value_min, 1))
+        levels = self._interpolation_rows @ levels @ self._interpolation_cols
+
+        return self._lut[np.clip(levels, 0, 255).astype(np.uint8)]
+
+    def encode(self, image: np.ndarray):
+        """Encode an RGB image in the set format.
+
+        Args:
+            image (np.ndarray): RGB image.
+
+        Returns:
+            bytes: encoded image.
+        """
+        buffer = io.BytesIO()
+        if self.image_format == "jpeg":
+            Image.fromarray(image).save(buffer, "JPEG", quality=self.quality)
+        else:
+            Image.fromarray(image).save(buffer, "PNG", compress_level=1)
+
+        return buffer.getvalue()
+
+    def get_stats(self):
+        """Get statistics of the image cache.
+
+        Returns:
+            dict: number of cached images, cache hits and misses.
+        """
+        return {
+            "cached": len(self._cache),
+            "hits": self.count_cache_hits,
+            "misses": self.count_cache_misses,
+        }
@@ -0,0 +1,109 @@
+import numpy as np
+from pydantic import BaseModel
+
+
+class HotSpot(BaseModel):
+    """Class model to define a connected region of pixels above the alert threshold."""
+
+    size: int
+    max_value: int
+    mean_value: float
+    centroid_row: float
+    centroid_col: float
+
+
+class HotSpotDetector:
+    """
+    Class to detect hot spots on sensor frames, defined as connected regions (8-connectivity)
+    of pixels whose value reaches a set threshold. All operations are vectorized over the frame.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        min_region_size: int = 1,
+        frame_shape: tuple[int, int] = (8, 8),
+    ):
+        self.threshold = threshold
+        self.min_region_size = min_region_size
+        self.frame_shape = frame_shape
+
+        # Precompute pixel coordinates and neighbour offsets, reused on every frame
+        rows, cols = np.indices(frame_shape)
+        self._rows = rows.ravel()
+        self._cols = cols.ravel()
+        self._offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+
+    def detect(self, data: np.ndarray) -> list[HotSpot]:
+        """Detect hot spots on a sensor frame.
+
+        Args:
+            data (np.ndarray): flat or 2D sensor frame.
+
+        Returns:
+            list[HotSpot]: detected hot spots, sorted by max. value in descending order.
+        """
+        frame = np.asarray(data).reshape(self.frame_shape)
+        mask = frame >= self.threshold
+        if not mask.any():
+            return []
+
+        labels = self._label_regions(mask).ravel()
+        values = frame.ravel()
+        flat_mask = mask.ravel()
+
+        # Compute per-region statistics in one pass
+        _, region_index, sizes = np.unique(
+            labels[flat_mask], return_inverse=True, return_counts=True
+        )
+        region_values = values[flat_mask].astype(np.float64)
+        sums = np.bincount(region_index, weights=region_values)
+        sums_rows = np.bincount(region_index, weights=self._rows[flat_mask])
+        sums_cols = np.bincount(region_index, weights=self._cols[flat_mask])
+        max_values = np.zeros(len(sizes), dtype=np.float64)
+        np.maximum.at(max_values, region_index, region_values)
+
+        hot_spots = [
+            HotSpot(
+                size=int(sizes[i]),
+                max_value=int(max_values[i]),
+                mean_value=float(sums[i] / sizes[i]),
+                centroid_row=float(sums_rows[i] / sizes[i]),
+                centroid_col=float(sums_cols[i] / sizes[i]),
+            )
+            for i in range(len(sizes))
+            if sizes[i] >= self.min_region_size
+        ]
+        hot_spots.sort(key=lambda hot_spot: hot_spot.max_value, reverse=True)
+
+        return hot_spots
+
+    def _label_regions(self, mask: np.ndarray) -> np.ndarray:
+        """Label connected regions of a boolean mask by iterative min-label propagation.
+
+        Args:
+            mask (np.ndarray): 2D boolean mask of pixels above threshold.
+
+        Returns:
+            np.ndarray: region label of each pixel, 0 for background pixels.
+        """
+        height, width = mask.shape
+        background = mask.size + 1
+        labels = np.where(
+            mask, np.arange(1, mask.size + 1).reshape(mask.shape), background
+        )
+
+        while True:
+            padded = np.pad(labels, 1, constant_values=background)
+            neighbours = np.stack(
+                [
+                    padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+                    for dy, dx in self._offsets
+                ]
+            )
+            new_labels = np.where(mask, neighbours.min(axis=0), background)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+
+        return np.where(mask, labels, 0)
@@ -0,0 +1,164 @@
+import math
+import struct
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+# Serialized sketches: number of pixels, number of bins and relative accuracy, followed by the
+# compressed bin counts
+_HEADER_SKETCH = struct.Struct("<IId")
+
+
+@lru_cache
+def _get_bins(relative_accuracy: float, max_value: int):
+    # Bin of each possible value and representative value of each bin: bin 0 holds zeros, bin
+    # k + 1 holds values in (gamma^(k - 1), gamma^k]
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    values = np.arange(1, max_value + 1)
+    bins = np.zeros(max_value + 1, dtype=np.intp)
+    bins[1:] = np.ceil(np.log(values) / math.log(gamma) - 1e-9).astype(np.intp) + 1
+
+    count_bins = int(bins[-1]) + 1
+    bin_values = np.zeros(count_bins)
+    bin_values[1:] = 2 * gamma ** np.arange(count_bins - 1) / (gamma + 1)
+
+    return bins, bin_values
+
+
+class PixelQuantileSketch:
+    """
+    Class to estimate quantiles of the values of each pixel of a sensor in fixed memory. Values
+    are counted in logarithmic bins (DDSketch-like), so estimated quantiles are within the set
+    relative accuracy. Sketches with the same parameters are merged by adding their counts.
+    """
+
+    def __init__(
+        self,
+        count_pixels: int,
+        relative_accuracy: float = 0.01,
+        max_value: int = 2**16 - 1,
+    ):
+        self.count_pixels = count_pixels
+        self.relative_accuracy = relative_accuracy
+        self.max_value = max_value
+        self._bins, self._bin_values = _get_bins(relative_accuracy, max_value)
+
+        self.counts = np.zeros((count_pixels, len(self._bin_values)), dtype=np.int64)
+        # Offset of each pixel in flattened counts
+        self._offsets = np.arange(count_pixels) * self.counts.shape[1]
+
+    @property
+    def count(self):
+        """Number of values counted per pixel.
+
+        Returns:
+            int: number of values.
+        """
+        return int(self.counts[0].sum()) if self.count_pixels else 0
+
+    def update(self, values: np.ndarray):
+        """Count a batch of frames.
+
+        Args:
+            values (np.ndarray): frames values, of shape (frames, pixels) or (pixels,).
+        """
+        values = np.asarray(values).reshape(-1, self.count_pixels)
+        indices = self._bins[values] + self._offsets
+        self.counts += np.bincount(indices.ravel(), minlength=self.counts.size).reshape(
+            self.counts.shape
+        )
+
+    def merge(self, other: "PixelQuantileSketch"):
+        """Merge another sketch with the same parameters into this one.
+
+        Args:
+            other (PixelQuantileSketch): sketch to be merged.
+
+        Raises:
+            ValueError: sketches have different parameters.
+        """
+        if (
+            other.count_pixels != self.count_pixels
+            or other.relative_accuracy != self.relative_accuracy
+            or other.counts.shape != self.counts.shape
+        ):
+            raise ValueError("Cannot merge sketches with different parameters.")
+        self.counts += other.counts
+
+    def quantiles(self, qs: list[float]):
+        """Estimate quantiles of the values of each pixel.
+
+        Args:
+            qs (list[float]): quantiles to estimate, between 0 and 1.
+
+        Returns:
+            np.ndarray: estimated quantiles, of shape (quantiles, pixels). NaN if no values have
+                been counted.
+        """
+        cumulated = np.cumsum(self.counts, axis=1)
+        totals = cumulated[:, -1]
+
+        quantiles = np.full((len(qs), self.count_pixels), np.nan)
+        if not totals.any():
+            return quantiles
+        for index, q in enumerate(qs):
+            ranks = q * (totals - 1)
+            bins = (cumulated <= ranks[:, np.newaxis]).sum(axis=1)
+            quantiles[index] = self._bin_values[
+                np.minimum(bins, len(self._bin_values) - 1)
+            ]
+        quantiles[:, totals == 0] = np.nan
+
+        return quantiles
+
+    def reset(self):
+        """Clear counted values."""
+        self.counts[:] = 0
+
+    def copy(self):
+        """Copy the sketch.
+
+        Returns:
+            PixelQuantileSketch: copied sketch.
+        """
+        sketch = PixelQuantileSketch(
+            self.count_pixels, self.relative_accuracy, self.max_value
+        )
+        sketch.counts[:] = self.counts
+        return sketch
+
+    def to_bytes(self):
+        """Serialize the sketch.
+
+        Returns:
+            bytes: serialized sketch.
+        """
+        return _HEADER_SKETCH.pack(
+            self.count_pixels, self.counts.shape[1], self.relative_accuracy
+        ) + zlib.compress(self.counts.astype("<i8").tobytes(), 1)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, max_value: int = 2**16 - 1):
+        """Deserialize a sketch.
+
+        Args:
+            data (bytes): serialized sketch.
+            max_value (int, optional): max. value counted by the sketch. Defaults to 2**16 - 1.
+
+        Raises:
+            ValueError: data does not hold a sketch with the given max. value.
+
+        Returns:
+            PixelQuantileSketch: deserialized sketch.
+        """
+        count_pixels, count_bins, relative_accuracy = _HEADER_SKETCH.unpack_from(data)
+        sketch = cls(count_pixels, relative_accuracy, max_value)
+        counts = np.frombuffer(
+            zlib.decompress(data[_HEADER_SKETCH.size :]), dtype="<i8"
+        )
+        if count_bins != sketch.counts.shape[1] or counts.size != sketch.counts.size:
+            raise ValueError("Serialized sketch does not match its parameters.")
+        sketch.counts[:] = counts.reshape(sketch.counts.shape)
+
+        return sketch
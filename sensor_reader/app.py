@@ -1,18 +1,65 @@
 import asyncio
+import json
 import sys
+import time
 from collections.abc import Coroutine
 from datetime import datetime
 
 import fire
 import nats
+import numpy as np
+import psycopg2
 from loguru import logger
 from nats.aio.msg import Msg
 from nats.errors import ConnectionClosedError, NoServersError, TimeoutError
 
-from sensor_reader.data.custom_types import AppCommandActions, NatsUrl
-from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.analytics.anomalies import PixelAnomalyDetector
+from sensor_reader.analytics.calibration import (
+    CONTENT_TYPE_TEMPERATURES,
+    CalibrationStore,
+)
+from sensor_reader.analytics.heatmap import HeatmapRenderer
+from sensor_reader.analytics.hot_spots import HotSpotDetector
+from sensor_reader.data.custom_types import (
+    AggregateQuery,
+    AppCommand,
+    AppCommandActions,
+    NatsUrl,
+    ProfilingParams,
+    QuantileQuery,
+    TuningParams,
+)
+from sensor_reader.data.frame import (
+    Frame,
+    FrameParseError,
+    FrameStage,
+    get_stamp_header,
+    get_stamp_now,
+    parse_stamp,
+)
+from sensor_reader.db.aggregate_queries import AggregateQueryService
+from sensor_reader.db.db_client import PostgresDbClient, create_db_client
+from sensor_reader.db.frame_log import FrameLogDbClient
+from sensor_reader.db.pixel_history import FilePixelHistoryStore
+from sensor_reader.ingest.shm_ring import SharedMemoryRingIngest
+from sensor_reader.ingest.unix_socket import UnixSocketIngest
+from sensor_reader.monitoring.profiler import ProfilerSession
+from sensor_reader.monitoring.stats import LatencyHistogram, ThroughputMeter
+from sensor_reader.monitoring.tracing import LatencyTracer
+from sensor_reader.sinks.base import Sink
+from sensor_reader.sinks.calibration_sink import CalibrationSink
+from sensor_reader.sinks.file_sink import FileSink
+from sensor_reader.sinks.nats_sink import NatsSink
+from sensor_reader.sinks.pixel_history_sink import PixelHistorySink
+from sensor_reader.sinks.postgres_sink import PostgresSink
+from sensor_reader.sinks.quantile_sink import QuantileSink
+from sensor_reader.sinks.render_sink import RenderSink
+from sensor_reader.sinks.shm_sink import SharedMemorySink
 from tests.mocks.sensor_infrared import SensorInfrared
 
+# Root of the subjects of raw data messages partitioned over workers by the NATS server
+TOPIC_RAW_DATA_SHARDS = "sensors.shard"
+
 
 class AppSensorReader:
     """
@@ -20,22 +67,280 @@ class AppSensorReader:
     PostgreSQL.
     """
 
-    def __init__(self, freq_report_data: int, uri_db_server: str):
-        self.flag_on_standby = False
+    def __init__(
+        self,
+        freq_report_data: int,
+        uri_db_server: str,
+        alert_threshold: int | None = None,
+        alert_min_region_size: int = 1,
+        alert_latency_budget: float = 0.005,
+        anomaly_threshold: float | None = None,
+        anomaly_alpha: float = 0.05,
+        anomaly_warmup: int = 20,
+        anomaly_stuck_frames: int = 100,
+        sinks: list[str] | None = None,
+        sink_queue_size: int = 1000,
+        sink_batch_size: int = 1,
+        path_file_sink: str = "sensor_data.jsonl",
+        pixel_history_store: str = "postgres",
+        pixel_block_duration: float = 3600.0,
+        pixel_block_size: int = 3600,
+        pixel_flush_interval: float = 60.0,
+        quantile_accuracy: float = 0.01,
+        quantile_snapshot_interval: float = 60.0,
+        render_interval: float = 1.0,
+        render_scale: int = 32,
+        render_colormap: str = "inferno",
+        render_format: str = "png",
+        shm_prefix: str = "sensor_reader",
+        path_calibration_dir: str = "calibration",
+        calibration_reload_interval: float = 5.0,
+        calibration_store: bool = False,
+        aggregate_queries: bool = False,
+        aggregate_cache_size: int = 10000,
+        aggregate_cache_ttl: float = 300.0,
+        aggregate_refresh_interval: float = 1.0,
+        log_sample_rate: int = 1,
+        path_profiling_dir: str = "profiling",
+        trace_slow_threshold: float = 1.0,
+        local_ingest: str | None = None,
+        local_ingest_address: str | None = None,
+        local_ingest_slots: int = 1024,
+        local_ingest_slot_size: int = 4096,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        on_standby: bool = False,
+    ):
+        self.flag_on_standby = on_standby
         self.flag_exit = False
         self.topic_raw_data = "sensors"
+        self.topic_raw_data_sensors = "sensors.*"
         self.topic_command = "app_command"
         self.topic_publishing = "publishing"
+        self.topic_alerts = "alerts"
+        self.topic_anomalies = "anomalies"
+        self.topic_profiling = "profiling"
+        self.topic_quantiles = "quantiles"
+        self.topic_render = "render"
+        self.topic_calibrated = "calibrated"
+        self.topic_aggregates = "aggregates"
+        self.default_sensor_id = "default"
         self.sleep_on_standby = 0.2
         self.sensor_data_array_length = 64
-        self.last_sensor_data: list[int] | None = None
+        # Latest parsed frame of each sensor, not handed to the output sinks yet
+        self.last_sensor_frames: dict[str, Frame] = {}
+        self.frame_seqs: dict[str, int] = {}
+
+        # Shard of the sensors handled by this instance, when run as a worker of a supervisor.
+        # Workers only receive data of their sensors, partitioned by the NATS server (see
+        # get_shard_mapping), and commands from the supervisor on their own topic.
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        if shard_count > 1:
+            self.topic_raw_data_sensors = f"{TOPIC_RAW_DATA_SHARDS}.{shard_index}.*"
+            self.topic_command = f"{self.topic_command}.worker.{shard_index}"
 
         self.freq_report_data = freq_report_data
+        self.log_sample_rate = log_sample_rate
         self.uri_message_server = NatsUrl(url="nats://localhost:4222")
 
-        self.db_client = PostgresDbClient(uri_db_server)
+        self.db_client = create_db_client(uri_db_server)
+
+        # Aggregate queries, answered on their own database connection with cached buckets
+        self.db_client_aggregates: PostgresDbClient | FrameLogDbClient | None = None
+        self.aggregate_service: AggregateQueryService | None = None
+        if aggregate_queries:
+            self.db_client_aggregates = create_db_client(uri_db_server)
+            self.aggregate_service = AggregateQueryService(
+                self.db_client_aggregates,
+                aggregate_cache_size,
+                aggregate_cache_ttl,
+                aggregate_refresh_interval,
+            )
+
+        # Edge analytics stage, detecting hot spots on the fast path (disabled if no threshold)
+        self.hot_spot_detector: HotSpotDetector | None = None
+        if alert_threshold is not None:
+            self.hot_spot_detector = HotSpotDetector(
+                alert_threshold, min_region_size=alert_min_region_size
+            )
+        self.alert_latency_budget = alert_latency_budget  # [s]
+        self.last_alert_latency: float | None = None  # [s]
+        self.count_alerts_over_budget = 0
+
+        # Edge analytics stage, detecting pixels departing from their own history on the fast
+        # path (disabled if no threshold)
+        self.anomaly_detector: PixelAnomalyDetector | None = None
+        if anomaly_threshold is not None:
+            self.anomaly_detector = PixelAnomalyDetector(
+                anomaly_threshold,
+                alpha=anomaly_alpha,
+                warmup=anomaly_warmup,
+                stuck_frames=anomaly_stuck_frames,
+                count_pixels=self.sensor_data_array_length,
+            )
+
+        # Output sinks, each one running concurrently with its own queue
+        self.sink_queue_size = sink_queue_size
+        self.sink_batch_size = sink_batch_size
+        self.path_file_sink = path_file_sink
+        self.pixel_history_store = pixel_history_store
+        self.pixel_block_duration = pixel_block_duration  # [s]
+        self.pixel_block_size = pixel_block_size
+        self.pixel_flush_interval = pixel_flush_interval  # [s]
+        self.db_client_pixels: PostgresDbClient | None = None
+        self.quantile_accuracy = quantile_accuracy
+        self.quantile_snapshot_interval = quantile_snapshot_interval  # [s]
+        self.db_client_quantiles: PostgresDbClient | None = None
+        self.quantile_sink: QuantileSink | None = None
+        self.render_interval = render_interval  # [s]
+        self.render_scale = render_scale
+        self.render_colormap = render_colormap
+        self.render_format = render_format
+        self.shm_prefix = shm_prefix
+        self.path_calibration_dir = path_calibration_dir
+        self.calibration_reload_interval = calibration_reload_interval  # [s]
+        self.calibration_store = calibration_store
+        self.db_client_calibrated: PostgresDbClient | None = None
+        self.sinks: list[Sink] = [
+            self.create_sink(sink_name) for sink_name in (sinks or ["nats", "postgres"])
+        ]
         # self.mock_sensor = SensorInfrared(min_range_value, max_range_value)
 
+        # Runtime statistics
+        self.time_start = time.monotonic()
+        self.throughput_received = ThroughputMeter()
+        self.throughput_processed = ThroughputMeter()
+        self.latency_parse = LatencyHistogram()
+        self.latency_alert = LatencyHistogram()
+        self.latency_anomalies = LatencyHistogram()
+        self.tracer = LatencyTracer(slow_threshold=trace_slow_threshold)
+        for sink in self.sinks:
+            sink.tracer = self.tracer
+
+        # On-demand profiling, bounded in time
+        self.path_profiling_dir = path_profiling_dir
+        self.profiler_session: ProfilerSession | None = None
+        self._task_profiling_timeout: asyncio.Task | None = None
+
+        # Local transport of raw data from co-located drivers, bypassing the NATS server
+        self.local_ingest: UnixSocketIngest | SharedMemoryRingIngest | None = None
+        match local_ingest:
+            case None:
+                pass
+            case "unix":
+                self.local_ingest = UnixSocketIngest(
+                    local_ingest_address or "/tmp/sensor_reader.sock",
+                    self.ingest_raw_data,
+                    queue_size=local_ingest_slots,
+                )
+            case "shm":
+                self.local_ingest = SharedMemoryRingIngest(
+                    local_ingest_address or "sensor_reader",
+                    self.ingest_raw_data,
+                    local_ingest_slots,
+                    local_ingest_slot_size,
+                )
+            case _:
+                raise ValueError(f"Unknown local ingest transport: {local_ingest}.")
+
+    def create_sink(self, sink_name: str):
+        """Create an output sink from its name.
+
+        Args:
+            sink_name (str): name of the sink. Supported sinks are 'nats', 'postgres', 'file',
+                'pixels', 'quantiles', 'render', 'shm' and 'calibrated'.
+
+        Raises:
+            ValueError: unknown sink, or sink not supported by the database.
+
+        Returns:
+            Sink: created sink.
+        """
+        kwargs = {
+            "queue_size": self.sink_queue_size,
+            "batch_size": self.sink_batch_size,
+        }
+        match sink_name:
+            case "nats":
+                return NatsSink(self.publish_sensor_data, **kwargs)
+            case "postgres":
+                return PostgresSink(self.db_client, **kwargs)
+            case "file":
+                return FileSink(self.path_file_sink, **kwargs)
+            case "pixels":
+                store: PostgresDbClient | FilePixelHistoryStore
+                if self.pixel_history_store == "postgres":
+                    if isinstance(self.db_client, FrameLogDbClient):
+                        raise ValueError(
+                            "Pixel history needs a directory store with a frame log database."
+                        )
+                    # Own connection, so blocks are not committed along with frames
+                    self.db_client_pixels = PostgresDbClient(
+                        self.db_client.address_db_server.uri
+                    )
+                    store = self.db_client_pixels
+                else:
+                    store = FilePixelHistoryStore(self.pixel_history_store)
+                return PixelHistorySink(
+                    store,
+                    self.pixel_block_duration,
+                    self.pixel_block_size,
+                    self.pixel_flush_interval,
+                    **kwargs,
+                )
+            case "quantiles":
+                # Sketches are stored on their own connection, only if snapshots are enabled
+                if self.quantile_snapshot_interval > 0:
+                    if isinstance(self.db_client, FrameLogDbClient):
+                        raise ValueError(
+                            "Quantile snapshots are not supported with a frame log database."
+                        )
+                    self.db_client_quantiles = PostgresDbClient(
+                        self.db_client.address_db_server.uri
+                    )
+                self.quantile_sink = QuantileSink(
+                    self.db_client_quantiles,
+                    self.quantile_accuracy,
+                    self.quantile_snapshot_interval,
+                    **kwargs,
+                )
+                return self.quantile_sink
+            case "render":
+                renderer = HeatmapRenderer(
+                    scale=self.render_scale,
+                    colormap=self.render_colormap,
+                    image_format=self.render_format,
+                )
+                return RenderSink(
+                    renderer, self.publish_heatmap, self.render_interval, **kwargs
+                )
+            case "shm":
+                return SharedMemorySink(self.shm_prefix, **kwargs)
+            case "calibrated":
+                # Calibrated frames are stored on their own connection, if enabled
+                if self.calibration_store:
+                    if isinstance(self.db_client, FrameLogDbClient):
+                        raise ValueError(
+                            "Calibrated frames are not stored with a frame log database."
+                        )
+                    self.db_client_calibrated = PostgresDbClient(
+                        self.db_client.address_db_server.uri
+                    )
+                store_calibrations = CalibrationStore(
+                    self.path_calibration_dir,
+                    self.sensor_data_array_length,
+                    self.calibration_reload_interval,
+                )
+                return CalibrationSink(
+                    store_calibrations,
+                    self.publish_calibrated,
+                    self.db_client_calibrated,
+                    **kwargs,
+                )
+
+        raise ValueError(f"Unknown sink: {sink_name}.")
+
     async def connect_to_message_server(self):
         """
         Connect to set NATS server.
@@ -62,8 +367,13 @@ class AppSensorReader:
         )
 
         # Subscribe to sensor data publishing topic
-        self.sub_raw_data = await self.nats_client.subscribe(
-            self.topic_raw_data, cb=self.handler_raw_data_messages
+        self.sub_raw_data = None
+        if self.is_sensor_owned(self.default_sensor_id):
+            self.sub_raw_data = await self.nats_client.subscribe(
+                self.topic_raw_data, cb=self.handler_raw_data_messages
+            )
+        self.sub_raw_data_sensors = await self.nats_client.subscribe(
+            self.topic_raw_data_sensors, cb=self.handler_raw_data_messages
         )
 
         # Subscribe to app command topic
@@ -71,6 +381,20 @@ class AppSensorReader:
             self.topic_command, cb=self.handler_command_messages
         )
 
+        # Subscribe to quantile queries topic, if sketches are maintained
+        self.sub_quantiles = None
+        if self.quantile_sink is not None:
+            self.sub_quantiles = await self.nats_client.subscribe(
+                f"{self.topic_quantiles}.*", cb=self.handler_quantile_queries
+            )
+
+        # Subscribe to aggregate queries topic, if enabled
+        self.sub_aggregates = None
+        if self.aggregate_service is not None:
+            self.sub_aggregates = await self.nats_client.subscribe(
+                f"{self.topic_aggregates}.*", cb=self.handler_aggregate_queries
+            )
+
         return flag_connected
 
     async def connect_errors_handler(
@@ -83,18 +407,25 @@ class AppSensorReader:
         """
         logger.error(f"Cannot connect to NATS message server: {err}")
 
-    async def connect_to_db(self):
+    async def connect_to_db(
+        self, db_client: PostgresDbClient | FrameLogDbClient | None = None
+    ):
         """Connect to set database.
 
+        Args:
+            db_client (PostgresDbClient | FrameLogDbClient | None, optional): database client
+                to be connected. Defaults to the client of the app.
+
         Returns:
             bool: result of the connection. True if successfull connection, False otherwise.
         """
+        db_client = db_client or self.db_client
         flag_connected = False
         while not flag_connected:
             logger.info(
-                f"Trying to connect to database server on URI: {self.db_client.address_db_server.uri}"
+                f"Trying to connect to database server on URI: {db_client.address_db_server.uri}"
             )
-            db_conn, error_code = self.db_client.connect()
+            db_conn, error_code = db_client.connect()
 
             if error_code is None:
                 flag_connected = True
@@ -102,11 +433,11 @@ class AppSensorReader:
                 await asyncio.sleep(2)
 
         logger.success(
-            f"Successfully connected to database server on URI: {self.db_client.address_db_server.uri}"
+            f"Successfully connected to database server on URI: {db_client.address_db_server.uri}"
         )
 
         # Setup basic data structure
-        self.db_client.setup_data_structure()
+        db_client.setup_data_structure()
 
         return flag_connected
 
@@ -116,68 +447,204 @@ class AppSensorReader:
         Args:
             msg (Msg): message containing raw data from infrared sensor.
         """
-        subject = msg.subject
-        reply = msg.reply
-        raw_data: str = msg.data.decode()
-        logger.debug(f"Received raw sensor data on '{subject}' topic: {raw_data}")
+        stamp_receipt = get_stamp_now()
 
         # Respond to the message if needed
-        if reply:
-            await self.nats_client.publish(reply, b"OK")
-
-        raw_data = raw_data[1:-1]
-        raw_data = raw_data.replace("\n", ",")
-        raw_data = raw_data.replace("  ", ",")
-
-        index = 0
-        data_parsed: list[int] | None = []
-        while index <= len(raw_data) - 1:
-            character = raw_data[index]
-            if character in [" ", "[", "]", ",", "\n"]:
-                index += 1
-                continue
+        if msg.reply:
+            await self.nats_client.publish(msg.reply, b"OK")
+
+        headers = msg.headers or {}
+        await self.ingest_raw_data(
+            self.sensor_id_from_subject(msg.subject),
+            msg.data,
+            headers.get("Content-Type"),
+            parse_stamp(headers.get(get_stamp_header(FrameStage.CAPTURE))),
+            stamp_receipt,
+        )
 
-            try:
-                character_numeric = True
-                index_last_digit = index
-                while character_numeric:
-                    if index_last_digit + 1 > len(raw_data) - 1:
-                        break
-                    if raw_data[index_last_digit + 1].isnumeric() is True:
-                        index_last_digit += 1
-                    else:
-                        character_numeric = False
-                        break
-
-                data_parsed.append(int(raw_data[index : index_last_digit + 1]))  # type: ignore
-                index = index_last_digit + 1
-            except Exception as err:
-                logger.error(
-                    f"Raw data could not be parsed, removing last captured data: {raw_data}."
-                    f"Error: {err}"
-                )
-                data_parsed = None
+    async def ingest_raw_data(
+        self,
+        sensor_id: str,
+        payload: bytes,
+        content_type: str | None,
+        stamp_capture: tuple[float, float] | None,
+        stamp_receipt: tuple[float, float],
+    ):
+        """Parse raw data received from a sensor, on NATS or on a local transport, and run
+        edge analytics on it.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            payload (bytes): raw sensor data.
+            content_type (str | None): content type of the payload. Parsed as text if not set.
+            stamp_capture (tuple[float, float] | None): monotonic and wall-clock capture times
+                [s], if set by the sensor.
+            stamp_receipt (tuple[float, float]): monotonic and wall-clock receipt times [s].
+        """
+        time_arrival = stamp_receipt[0]
+        self.throughput_received.record()
+        if self.is_log_sampled(self.throughput_received.count):
+            logger.debug(f"Received raw data of sensor '{sensor_id}': {payload!r}")
+
+        seq = self.frame_seqs.get(sensor_id, -1) + 1
+        self.frame_seqs[sensor_id] = seq
+        try:
+            frame: Frame | None = Frame.from_payload(
+                payload,
+                sensor_id,
+                seq,
+                content_type=content_type,
+                stamp_capture=stamp_capture,
+                stamp_receipt=stamp_receipt,
+            )
+        except (FrameParseError, ValueError) as err:
+            logger.error(
+                f"Raw data could not be parsed, removing last captured data: {payload!r}. "
+                f"Error: {err}"
+            )
+            frame = None
+
+        if frame is None:
+            self.last_sensor_frames.pop(sensor_id, None)
+        else:
+            self.last_sensor_frames[sensor_id] = frame
+        self.latency_parse.record(time.monotonic() - time_arrival)
+        if frame is not None:
+            frame.stamp(FrameStage.PARSE)
+            self.tracer.record(frame, FrameStage.PARSE)
+
+        # Fast path: run edge analytics before data is handed to the (slower) storage loop
+        if not frame or len(frame) != self.sensor_data_array_length:
+            return
+        if self.hot_spot_detector is not None:
+            await self.detect_hot_spots(frame, time_arrival)
+        if self.anomaly_detector is not None:
+            await self.detect_anomalies(frame)
+
+        # Sinks taking every frame get it here, other sinks get the latest frame on next report
+        timestamp = datetime.fromtimestamp(frame.timestamp)
+        for sink in self.sinks:
+            if sink.every_frame:
+                sink.put(frame, timestamp)
+
+    def is_sensor_owned(self, sensor_id: str):
+        """Check if a sensor belongs to the shard of this instance.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+
+        Returns:
+            bool: True if the sensor belongs to the shard, False otherwise.
+        """
+        if self.shard_count == 1:
+            return True
+        return get_shard(sensor_id, self.shard_count) == self.shard_index
+
+    def sensor_id_from_subject(self, subject: str):
+        """Get the identifier of the sensor which published data on a given subject.
+
+        Args:
+            subject (str): subject of the raw data message, like 'sensors', 'sensors.<sensor>'
+                or 'sensors.shard.<index>.<sensor>'.
+
+        Returns:
+            str: identifier of the sensor. Default identifier if not set in the subject.
+        """
+        if subject == self.topic_raw_data:
+            return self.default_sensor_id
+        return subject.rsplit(".", 1)[1]
+
+    async def detect_hot_spots(self, frame: Frame, time_arrival: float):
+        """Detect hot spots on a frame and publish them to the alerts topic of its sensor.
+
+        Args:
+            frame (Frame): parsed frame from sensor.
+            time_arrival (float): monotonic time at frame arrival [s].
+        """
+        hot_spots = self.hot_spot_detector.detect(frame.values)  # type: ignore
+        if not hot_spots:
+            return
 
-        self.last_sensor_data = data_parsed
+        sensor_id = frame.sensor_id
+        alert = {
+            "sensor": sensor_id,
+            "seq": frame.seq,
+            "timestamp": datetime.now().isoformat(),
+            "hot_spots": [hot_spot.model_dump() for hot_spot in hot_spots],
+        }
+        await self.nats_client.publish(
+            f"{self.topic_alerts}.{sensor_id}", json.dumps(alert).encode()
+        )
+
+        # Check latency from frame arrival to alert publishing against set budget
+        self.last_alert_latency = time.monotonic() - time_arrival
+        self.latency_alert.record(self.last_alert_latency)
+        if self.last_alert_latency > self.alert_latency_budget:
+            self.count_alerts_over_budget += 1
+            logger.warning(
+                f"Alert latency {self.last_alert_latency * 1e3:.3f} ms exceeds budget of "
+                f"{self.alert_latency_budget * 1e3:.3f} ms."
+            )
+
+    async def detect_anomalies(self, frame: Frame):
+        """Update the history of the pixels of a frame and publish its anomalous or stuck pixels
+        to the anomalies topic of its sensor.
+
+        Args:
+            frame (Frame): parsed frame from sensor.
+        """
+        time_start = time.perf_counter()
+        anomalies = self.anomaly_detector.update(  # type: ignore
+            frame.sensor_id, frame.values
+        )
+        self.latency_anomalies.record(time.perf_counter() - time_start)
+        if anomalies is None:
+            return
+
+        sensor_id = frame.sensor_id
+        message = {
+            "sensor": sensor_id,
+            "seq": frame.seq,
+            "timestamp": datetime.now().isoformat(),
+            **anomalies.model_dump(),
+        }
+        await self.nats_client.publish(
+            f"{self.topic_anomalies}.{sensor_id}", json.dumps(message).encode()
+        )
 
     async def handler_command_messages(self, msg: Msg):
         """Callback to handle command messages that control app state.
 
         Args:
-            msg (Msg): command message setting state of the app. Three execution modes
-                ares currently supported:
+            msg (Msg): command message setting state of the app. Commands can be sent as a bare
+                action value or as a JSON object like {"action": "set", "params": {...}}. If the
+                message has a reply subject, the result of the command is sent back as JSON.
+                Supported actions:
                     1. AppCommandActions.START: start capturing and publushind data from sensors.
                     2. AppCommandActions.STOP: stop capturing and publushind data from sensors.
                     Sets the app on standby state.
                     3. AppCommandActions.EXIT: stop all functionalities and exits app main loop.
+                    4. AppCommandActions.SET: set performance parameters (TuningParams).
+                    5. AppCommandActions.STATS: get a snapshot of runtime statistics.
+                    6. AppCommandActions.PROFILE_START: start a CPU and memory profiling session
+                    (ProfilingParams), stopped automatically after set duration.
+                    7. AppCommandActions.PROFILE_STOP: stop current profiling session and publish
+                    its results summary.
         """
         subject = msg.subject
         data = msg.data.decode()
         logger.debug(f"Received a message on '{subject}' topic: {data}")
 
         # Parse command data
-        data = AppCommandActions(int(data))
-        match data:
+        try:
+            command = AppCommand.from_message(data)
+        except ValueError as err:
+            logger.error(f"Invalid command received: {data}. Error: {err}")
+            await self.reply_command(msg, {"status": "error", "error": str(err)})
+            return
+
+        response: dict = {"status": "ok"}
+        match command.action:
             case AppCommandActions.START:
                 self.flag_on_standby = False
                 logger.info("Restarting sensor data capturing and processing.")
@@ -188,12 +655,288 @@ class AppSensorReader:
 
             case AppCommandActions.EXIT:
                 logger.info("Closing app ...")
+                await self.reply_command(msg, response)
                 await self.close()
+                return
+
+            case AppCommandActions.SET:
+                self.apply_tuning_params(command.params)
+                response["params"] = self.get_tuning_params().model_dump()
+
+            case AppCommandActions.STATS:
+                response["stats"] = self.get_stats()
+
+            case AppCommandActions.PROFILE_START:
+                try:
+                    self.start_profiling(command.params)  # type: ignore
+                    response["profiling"] = command.params.model_dump()  # type: ignore
+                except RuntimeError as err:
+                    response = {"status": "error", "error": str(err)}
+
+            case AppCommandActions.PROFILE_STOP:
+                summary = await self.stop_profiling()
+                if summary is None:
+                    response = {
+                        "status": "error",
+                        "error": "No profiling session running.",
+                    }
+                else:
+                    response["profiling"] = summary
+
+        await self.reply_command(msg, response)
+
+    async def handler_quantile_queries(self, msg: Msg):
+        """Callback to handle queries of per-pixel quantiles of a sensor, sent as requests on
+        the 'quantiles.<sensor>' topic. Only the instance handling the sensor replies.
+
+        Args:
+            msg (Msg): query message, with a JSON payload like
+                {"quantiles": [0.01, 0.5, 0.99], "pixels": [37]} (see QuantileQuery). Quantiles
+                are estimated since app start, or from stored sketches of the time windows
+                overlapping "time_start" to "time_end" if set. Windows are merged whole, so the
+                range of the merged windows is replied.
+        """
+        sensor_id = msg.subject.split(".", 1)[1]
+        if not self.is_sensor_owned(sensor_id):
+            return
+
+        try:
+            query = QuantileQuery.model_validate_json(msg.data or b"{}")
+            time_range = None
+            if query.time_start is None and query.time_end is None:
+                sketch = self.quantile_sink.sketches.get(sensor_id)  # type: ignore
+            else:
+                sketch, *time_range = await self.quantile_sink.get_stored_sketch(  # type: ignore
+                    sensor_id,
+                    query.time_start or datetime.min,
+                    query.time_end or datetime.now(),
+                )
+            if sketch is None:
+                raise ValueError(f"No quantile sketch of sensor '{sensor_id}'.")
+
+            quantiles = sketch.quantiles(query.quantiles)
+            if query.pixels is not None:
+                quantiles = quantiles[:, query.pixels]
+        except (ValueError, IndexError, psycopg2.Error) as err:
+            await self.reply_command(msg, {"status": "error", "error": str(err)})
+            return
+
+        response = {
+            "status": "ok",
+            "sensor_id": sensor_id,
+            "count": sketch.count,
+            "quantiles": {
+                str(q): [None if np.isnan(value) else value for value in row]
+                for q, row in zip(query.quantiles, quantiles.tolist())
+            },
+        }
+        if time_range is not None:
+            # Range widened to the whole windows overlapping the queried range
+            response["time_start"], response["time_end"] = (
+                time_window.isoformat() for time_window in time_range
+            )
+        await self.reply_command(msg, response)
+
+    async def handler_aggregate_queries(self, msg: Msg):
+        """Callback to handle queries of aggregates of the frames of a sensor over time
+        buckets, sent as requests on the 'aggregates.<sensor>' topic. Only the instance handling
+        the sensor replies.
+
+        Args:
+            msg (Msg): query message, with a JSON payload like
+                {"aggregate": "max", "per_pixel": true, "bucket": 86400} (see AggregateQuery).
+        """
+        sensor_id = msg.subject.split(".", 1)[1]
+        if not self.is_sensor_owned(sensor_id):
+            return
+
+        try:
+            query = AggregateQuery.model_validate_json(msg.data or b"{}")
+            buckets = await asyncio.to_thread(
+                self.aggregate_service.query, sensor_id, query  # type: ignore
+            )
+        except (ValueError, OSError, psycopg2.Error) as err:
+            await self.reply_command(msg, {"status": "error", "error": str(err)})
+            return
+
+        response = {
+            "status": "ok",
+            "sensor_id": sensor_id,
+            "aggregate": query.aggregate,
+            "per_pixel": query.per_pixel,
+            "bucket": query.bucket,
+            "buckets": [bucket.model_dump(mode="json") for bucket in buckets],
+        }
+        await self.reply_command(msg, response)
+
+    async def reply_command(self, msg: Msg, response: dict):
+        """Reply to a command message, if it was sent as a request.
+
+        Args:
+            msg (Msg): command message.
+            response (dict): result of the command.
+        """
+        if msg.reply:
+            await self.nats_client.publish(msg.reply, json.dumps(response).encode())
+
+    def apply_tuning_params(self, params: TuningParams):
+        """Apply performance parameters at runtime. Parameters not set are left unchanged.
+
+        Args:
+            params (TuningParams): performance parameters to be applied.
+        """
+        if params.freq_report_data is not None:
+            self.freq_report_data = params.freq_report_data
+        if params.log_sample_rate is not None:
+            self.log_sample_rate = params.log_sample_rate
+        if params.sink_batch_size is not None:
+            self.sink_batch_size = params.sink_batch_size
+        if params.sink_queue_size is not None:
+            self.sink_queue_size = params.sink_queue_size
+
+        for sink in self.sinks:
+            sink.batch_size = self.sink_batch_size
+            sink.queue_size = self.sink_queue_size
+
+        logger.info(f"Performance parameters updated: {self.get_tuning_params()}")
+
+    def get_tuning_params(self):
+        """Get current performance parameters.
+
+        Returns:
+            TuningParams: current performance parameters.
+        """
+        return TuningParams(
+            freq_report_data=self.freq_report_data,
+            sink_batch_size=self.sink_batch_size,
+            sink_queue_size=self.sink_queue_size,
+            log_sample_rate=self.log_sample_rate,
+        )
+
+    def get_stats(self):
+        """Get a snapshot of runtime statistics: throughput, queue depths and latencies.
+
+        Returns:
+            dict: runtime statistics.
+        """
+        return {
+            "uptime": time.monotonic() - self.time_start,
+            "on_standby": self.flag_on_standby,
+            "throughput": {
+                "received": self.throughput_received.snapshot(),
+                "processed": self.throughput_processed.snapshot(),
+            },
+            "latency": {
+                "parse": self.latency_parse.snapshot(),
+                "alert": self.latency_alert.snapshot(),
+                "anomalies": self.latency_anomalies.snapshot(),
+                "frames": self.tracer.snapshot(),
+            },
+            "sinks": {sink.name: sink.get_stats() for sink in self.sinks},
+            "anomalies": (
+                self.anomaly_detector.get_stats()
+                if self.anomaly_detector is not None
+                else None
+            ),
+            "aggregates": (
+                self.aggregate_service.get_stats()
+                if self.aggregate_service is not None
+                else None
+            ),
+            "local_ingest": (
+                self.local_ingest.get_stats() if self.local_ingest is not None else None
+            ),
+            "params": self.get_tuning_params().model_dump(),
+        }
+
+    def start_profiling(self, params: ProfilingParams):
+        """Start a profiling session, stopped automatically after set duration.
+
+        Args:
+            params (ProfilingParams): parameters of the profiling session.
+        """
+        if self.profiler_session is not None:
+            raise RuntimeError("A profiling session is already running.")
+
+        self.profiler_session = ProfilerSession(
+            self.path_profiling_dir, mode=params.mode, memory=params.memory
+        )
+        self.profiler_session.start()
+        self._task_profiling_timeout = asyncio.create_task(
+            self._stop_profiling_after(params.duration)
+        )
+        self._task_profiling_timeout.add_done_callback(self._log_profiling_error)
+        logger.info(f"Profiling session started: {params}")
+
+    async def _stop_profiling_after(self, duration: float):
+        await asyncio.sleep(duration)
+        self._task_profiling_timeout = None
+        await self.stop_profiling()
+
+    @staticmethod
+    def _log_profiling_error(task: asyncio.Task):
+        # Nothing awaits the task stopping the session after its duration
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Cannot stop profiling session: {task.exception()!r}")
+
+    async def stop_profiling(self):
+        """Stop current profiling session, writing its results to the profiling directory and
+        publishing a summary to the profiling topic.
+
+        Returns:
+            dict | None: summary of profiling results. None if no profiling session was running.
+        """
+        if self.profiler_session is None:
+            return None
+
+        if self._task_profiling_timeout is not None:
+            self._task_profiling_timeout.cancel()
+            self._task_profiling_timeout = None
+
+        profiler_session, self.profiler_session = self.profiler_session, None
+        # Profilers are removed from the thread of the event loop, and results are written
+        # from another thread
+        profiler_session.disable()
+        summary = await asyncio.to_thread(profiler_session.stop)
+        logger.info(
+            f"Profiling session finished, results written to: {summary['files']}"
+        )
+
+        await self.nats_client.publish(
+            self.topic_profiling, json.dumps(summary).encode()
+        )
+
+        return summary
+
+    def is_log_sampled(self, count: int):
+        """Check if a recurrent log message has to be emitted, given set log sampling rate.
+
+        Args:
+            count (int): number of times the message has been triggered.
+
+        Returns:
+            bool: True if the message has to be logged, False otherwise.
+        """
+        return count % self.log_sample_rate == 0
 
     async def run(self):
         """Run main loop of the app."""
         await self.connect_to_message_server()
-        await self.connect_to_db()
+        if self.local_ingest is not None:
+            await self.local_ingest.start()
+        if any(isinstance(sink, PostgresSink) for sink in self.sinks):
+            await self.connect_to_db()
+        if self.db_client_pixels is not None:
+            await self.connect_to_db(self.db_client_pixels)
+        if self.db_client_quantiles is not None:
+            await self.connect_to_db(self.db_client_quantiles)
+        if self.db_client_calibrated is not None:
+            await self.connect_to_db(self.db_client_calibrated)
+        if self.db_client_aggregates is not None:
+            await self.connect_to_db(self.db_client_aggregates)
+
+        for sink in self.sinks:
+            sink.start()
 
         while not self.flag_exit:
             await self.process_sensor_data()
@@ -207,18 +950,22 @@ class AppSensorReader:
             await asyncio.sleep(self.sleep_on_standby)
             return
 
-        # Get sensor data and its associated timestamp
-        new_sensor_data = self.read_data_from_sensor()
-        timestamp = datetime.now()
+        # Get latest sensor data of each sensor, received since last report
+        new_sensor_frames = self.read_data_from_sensor()
 
-        if not new_sensor_data:
+        if not new_sensor_frames:
             await asyncio.sleep(self.sleep_on_standby)
             return
 
-        await self.publish_sensor_data(new_sensor_data)
+        for new_sensor_data in new_sensor_frames:
+            # Timestamp of sensor data: capture time, or receipt if not set
+            timestamp = datetime.fromtimestamp(new_sensor_data.timestamp)
 
-        # Save new read sensor data on database
-        self.db_client.save_data(new_sensor_data, timestamp)
+            # Hand sensor data to output sinks, written concurrently by each sink
+            for sink in self.sinks:
+                if not sink.every_frame:
+                    sink.put(new_sensor_data, timestamp)
+            self.throughput_processed.record()
 
         # Asynchronously wait for next data update
         await asyncio.sleep(self.freq_report_data)
@@ -227,37 +974,88 @@ class AppSensorReader:
         """Read raw data from sensors.
 
         Returns:
-            list[int] | None: raw data from sensor. None in case of corrupted data.
+            list[Frame]: latest raw data of each sensor, each frame being read once. Corrupted
+                data is discarded.
         """
-        if not self.last_sensor_data:
-            return self.last_sensor_data
+        last_sensor_frames = []
+        sensor_frames, self.last_sensor_frames = self.last_sensor_frames, {}
+        for sensor_id, last_sensor_data in sensor_frames.items():
+            # Check data has been correctly parsed
+            if len(last_sensor_data) != self.sensor_data_array_length:
+                logger.warning(
+                    f"Bad data read from sensor '{sensor_id}'. Data will be discarded."
+                )
+                continue
+
+            # last_sensor_data = self.mock_sensor.get_data()
+            if self.is_log_sampled(self.throughput_processed.count):
+                logger.info(f"Read data: {last_sensor_data}")
+            last_sensor_frames.append(last_sensor_data)
 
-        # Check data has been correctly parsed
-        if len(self.last_sensor_data) != self.sensor_data_array_length:
-            logger.warning("Bad data read from sensor. Data will be discarded.")
-            self.last_sensor_data = None
+        return last_sensor_frames
 
-        # last_sensor_data = self.mock_sensor.get_data()
-        last_sensor_data = self.last_sensor_data
-        logger.info(f"Read data: {last_sensor_data}")
+    async def publish_sensor_data(self, last_sensor_data: Frame):
+        """Publish captured sensor data to a NATS topic, as raw uint16 values with headers
+        describing the frame (see Frame.from_message). A frame published again keeps the stamp
+        of its first publication.
 
-        return last_sensor_data
+        Args:
+            last_sensor_data (Frame): raw data from sensor.
+        """
+        if last_sensor_data.stamp_once(FrameStage.PUBLISH):
+            self.tracer.record(last_sensor_data, FrameStage.PUBLISH)
+        await self.nats_client.publish(
+            self.topic_publishing,
+            last_sensor_data.to_bytes(),
+            headers=last_sensor_data.get_headers(),
+        )
 
-    async def publish_sensor_data(self, last_sensor_data: list[int] | None):
-        """Publish captured sensor data to a NATS topic.
+    async def publish_heatmap(self, frame: Frame, image: bytes, content_type: str):
+        """Publish a heatmap image of a frame to the NATS topic of its sensor.
 
         Args:
-            last_sensor_data (list[int] | None): raw data from sensor. None in case of corrupted data.
+            frame (Frame): rendered frame.
+            image (bytes): encoded image.
+            content_type (str): content type of the image.
         """
         await self.nats_client.publish(
-            self.topic_publishing, str(last_sensor_data).encode()
+            f"{self.topic_render}.{frame.sensor_id}",
+            image,
+            headers={
+                "Content-Type": content_type,
+                "Sensor-Id": frame.sensor_id,
+                "Frame-Seq": str(frame.seq),
+            },
+        )
+
+    async def publish_calibrated(self, frame: Frame, temperatures: np.ndarray):
+        """Publish temperatures of a calibrated frame to the NATS topic of its sensor, as raw
+        float32 values with the headers of the frame.
+
+        Args:
+            frame (Frame): raw frame.
+            temperatures (np.ndarray): temperatures of the frame.
+        """
+        await self.nats_client.publish(
+            f"{self.topic_calibrated}.{frame.sensor_id}",
+            temperatures.astype("<f4", copy=False).tobytes(),
+            headers={
+                **frame.get_headers(),
+                "Content-Type": CONTENT_TYPE_TEMPERATURES,
+            },
         )
 
     async def disconnect_from_message_server(self):
         """Disconnect from NATS server and unsubscribe from capturing and command topics."""
         # Remove interest in subscription.
-        await self.sub_raw_data.unsubscribe()
+        if self.sub_raw_data is not None:
+            await self.sub_raw_data.unsubscribe()
+        await self.sub_raw_data_sensors.unsubscribe()
         await self.sub_app_command.unsubscribe()
+        if self.sub_quantiles is not None:
+            await self.sub_quantiles.unsubscribe()
+        if self.sub_aggregates is not None:
+            await self.sub_aggregates.unsubscribe()
 
         # Close connection to NATS server after processing remaining messages
         await self.nats_client.drain()
@@ -268,11 +1066,67 @@ class AppSensorReader:
         self.flag_exit = True
         self.flag_on_standby = True
 
+        # Finish profiling session, if any
+        await self.stop_profiling()
+
+        # Stop receiving raw data on local transport
+        if self.local_ingest is not None:
+            await self.local_ingest.stop()
+
+        # Write pending data and stop output sinks
+        for sink in self.sinks:
+            await sink.stop()
+
         # Close connection to NATS server
         await self.disconnect_from_message_server()
 
         # Close database connection
-        self.db_client.disconnect()
+        if self.db_client.db_conn is not None:
+            self.db_client.disconnect()
+        for db_client in [
+            self.db_client_pixels,
+            self.db_client_quantiles,
+            self.db_client_calibrated,
+            self.db_client_aggregates,
+        ]:
+            if db_client is not None and db_client.db_conn is not None:
+                db_client.disconnect()
+
+
+def get_shard(sensor_id: str, shard_count: int):
+    """Get the shard a sensor belongs to, stable across processes. The FNV-1a hash of the
+    sensor identifier matches the partitions of the NATS server (see get_shard_mapping).
+
+    Args:
+        sensor_id (str): identifier of the sensor.
+        shard_count (int): number of shards.
+
+    Returns:
+        int: index of the shard.
+    """
+    hash_sensor = 0x811C9DC5
+    for byte in sensor_id.encode():
+        hash_sensor = ((hash_sensor ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return hash_sensor % shard_count
+
+
+def get_shard_mapping(shard_count: int):
+    """Get the subject mapping of the NATS server partitioning raw data messages of sensors
+    over shards, so that each worker only subscribes to the subject of its shard.
+
+    Args:
+        shard_count (int): number of shards.
+
+    Returns:
+        dict[str, str]: destination subject by source subject, as set in the 'mappings' block
+            of the NATS server configuration.
+    """
+    return {
+        "sensors.*": (
+            f"{TOPIC_RAW_DATA_SHARDS}.{{{{partition({shard_count},1)}}}}"
+            ".{{wildcard(1)}}"
+        )
+    }
 
 
 async def run_concurrent_tasks(tasks: list[Coroutine]):
@@ -290,6 +1144,43 @@ def main(
     uri_db_server: str,
     min_range_value: int | None = None,
     max_range_value: int | None = None,
+    alert_threshold: int | None = None,
+    alert_min_region_size: int = 1,
+    alert_latency_budget: float = 0.005,
+    anomaly_threshold: float | None = None,
+    anomaly_alpha: float = 0.05,
+    anomaly_warmup: int = 20,
+    anomaly_stuck_frames: int = 100,
+    sinks: str | tuple[str, ...] = ("nats", "postgres"),
+    sink_queue_size: int = 1000,
+    sink_batch_size: int = 1,
+    path_file_sink: str = "sensor_data.jsonl",
+    pixel_history_store: str = "postgres",
+    pixel_block_duration: float = 3600.0,
+    pixel_block_size: int = 3600,
+    pixel_flush_interval: float = 60.0,
+    quantile_accuracy: float = 0.01,
+    quantile_snapshot_interval: float = 60.0,
+    render_interval: float = 1.0,
+    render_scale: int = 32,
+    render_colormap: str = "inferno",
+    render_format: str = "png",
+    shm_prefix: str = "sensor_reader",
+    path_calibration_dir: str = "calibration",
+    calibration_reload_interval: float = 5.0,
+    calibration_store: bool = False,
+    aggregate_queries: bool = False,
+    aggregate_cache_size: int = 10000,
+    aggregate_cache_ttl: float = 300.0,
+    aggregate_refresh_interval: float = 1.0,
+    log_sample_rate: int = 1,
+    path_profiling_dir: str = "profiling",
+    trace_slow_threshold: float = 1.0,
+    local_ingest: str | None = None,
+    local_ingest_address: str | None = None,
+    local_ingest_slots: int = 1024,
+    local_ingest_slot_size: int = 4096,
+    workers: int = 1,
     log_level: str = "INFO",
 ):
     """Main method to run main lopp of AppSensorReader and input "mock infrared sensor" (if set).
@@ -297,10 +1188,94 @@ def main(
     Args:
         sensor_type (str): type of input infrared sensor. Can be mock or real.
         freq_read_data (int): frequency at which raw sensor data is read.
-        uri_db_server (str): URI to database server.
+        uri_db_server (str): URI to database server, like '127.0.0.1:5432' for PostgreSQL, or
+            'file:///path/to/dir' for an embedded frame log (see FrameLogDbClient).
         min_range_value (int | None, optional): min. value returned by input sensor. Defaults to None.
         max_range_value (int | None, optional): max. value returned by input sensor. Defaults to None.
+        alert_threshold (int | None, optional): min. pixel value of hot spots published as alerts.
+            Hot-spot detection is disabled if not set. Defaults to None.
+        alert_min_region_size (int, optional): min. number of pixels of a hot spot. Defaults to 1.
+        alert_latency_budget (float, optional): max. latency from frame arrival to alert publishing
+            [s]. Defaults to 0.005.
+        anomaly_threshold (float | None, optional): min. z-score of pixels against their own
+            history published as anomalies. Anomaly detection is disabled if not set.
+            Defaults to None.
+        anomaly_alpha (float, optional): weight of each frame in the running mean and variance
+            of pixels. Defaults to 0.05.
+        anomaly_warmup (int, optional): number of frames of a sensor before its anomalies are
+            published. Defaults to 20.
+        anomaly_stuck_frames (int, optional): number of frames a pixel value does not change
+            before it is published as stuck. Disabled if set to 0. Defaults to 100.
+        sinks (str | tuple[str, ...], optional): output sinks of sensor data, as a comma-separated
+            string or a tuple. Supported sinks are 'nats', 'postgres', 'file', 'pixels'
+            (pixel-major history), 'quantiles' (per-pixel quantile sketches), 'render'
+            (heatmap images), 'shm' (latest frame of each sensor in shared memory) and
+            'calibrated' (temperatures from calibration files).
+            Defaults to ("nats", "postgres").
+        sink_queue_size (int, optional): max. number of pending data on each sink. Defaults to 1000.
+        sink_batch_size (int, optional): max. number of data written at once by each sink.
+            Defaults to 1.
+        path_file_sink (str, optional): path to output file of 'file' sink.
+            Defaults to "sensor_data.jsonl".
+        pixel_history_store (str, optional): store of 'pixels' sink: 'postgres' or path to a
+            local directory. Defaults to "postgres".
+        pixel_block_duration (float, optional): duration of time blocks of the pixel-major
+            history [s]. Defaults to 3600.0.
+        pixel_block_size (int, optional): max. number of frames per block of the pixel-major
+            history. Defaults to 3600.
+        pixel_flush_interval (float, optional): interval between stores of open blocks of the
+            pixel-major history [s]. Defaults to 60.0.
+        quantile_accuracy (float, optional): relative accuracy of per-pixel quantiles.
+            Defaults to 0.01.
+        quantile_snapshot_interval (float, optional): interval between stored snapshots of
+            quantile sketches [s]. Sketches are not stored if set to 0. Defaults to 60.0.
+        render_interval (float, optional): min. interval between heatmap images published for
+            each sensor [s]. Defaults to 1.0.
+        render_scale (int, optional): upscaling factor of heatmap images. Defaults to 32.
+        render_colormap (str, optional): matplotlib colormap of heatmap images.
+            Defaults to "inferno".
+        render_format (str, optional): format of heatmap images: 'png' or 'jpeg'.
+            Defaults to "png".
+        shm_prefix (str, optional): prefix of the names of the shared memory segments of 'shm'
+            sink, followed by the sensor identifier. Defaults to "sensor_reader".
+        path_calibration_dir (str, optional): directory of calibration files of 'calibrated'
+            sink, '<sensor>.json' or 'default.json' (see CalibrationStore).
+            Defaults to "calibration".
+        calibration_reload_interval (float, optional): min. interval between checks of
+            modified calibration files of each sensor [s]. Defaults to 5.0.
+        calibration_store (bool, optional): store calibrated frames in the database, next to
+            raw frames. Defaults to False.
+        aggregate_queries (bool, optional): answer requests of aggregates of stored frames on
+            'aggregates.<sensor>' (see AggregateQuery). Defaults to False.
+        aggregate_cache_size (int, optional): max. number of cached aggregates of time buckets.
+            Defaults to 10000.
+        aggregate_cache_ttl (float, optional): max. age of cached aggregates of past time
+            buckets [s]. Defaults to 300.0.
+        aggregate_refresh_interval (float, optional): max. age of cached aggregates of time
+            buckets still receiving frames [s]. Defaults to 1.0.
+        log_sample_rate (int, optional): log only one of every N per-frame messages. Defaults to 1.
+        path_profiling_dir (str, optional): directory where profiling results are written.
+            Defaults to "profiling".
+        trace_slow_threshold (float, optional): min. latency of a frame from capture (or receipt)
+            to any stage for its trace to be logged [s]. Defaults to 1.0.
+        local_ingest (str | None, optional): local transport of raw data from co-located
+            drivers, in addition to NATS: 'unix' (Unix datagram socket) or 'shm' (shared memory
+            ring buffer). Disabled if not set. Defaults to None.
+        local_ingest_address (str | None, optional): path to the Unix socket, or name of the
+            shared memory ring buffer, of the local transport. Defaults to
+            "/tmp/sensor_reader.sock" or "sensor_reader" if not set.
+        local_ingest_slots (int, optional): number of slots of the shared memory ring buffer, or
+            max. number of pending datagrams of the Unix socket. Defaults to 1024.
+        local_ingest_slot_size (int, optional): size of each slot of the shared memory ring
+            buffer [B]. Defaults to 4096.
+        workers (int, optional): number of worker processes, each one handling a shard of the
+            sensors. A supervisor forwards commands to workers and restarts them if they crash
+            if set to more than 1, and the NATS server must partition sensor data over workers
+            (see get_shard_mapping). Defaults to 1.
         log_level (str, optional): level of logging messages. Defaults to "INFO".
+
+    Raises:
+        ValueError: local ingest transport set with several workers.
     """
     # Configure logging level
     logger.configure(handlers=[{"sink": sys.stderr, "level": log_level}])
@@ -313,8 +1288,58 @@ def main(
         )
         tasks.append(mock_sensor.run())
 
-    app_sensor_reader = AppSensorReader(freq_read_data, uri_db_server)
-    tasks.append(app_sensor_reader.run())
+    app_kwargs = dict(
+        freq_report_data=freq_read_data,
+        uri_db_server=uri_db_server,
+        alert_threshold=alert_threshold,
+        alert_min_region_size=alert_min_region_size,
+        alert_latency_budget=alert_latency_budget,
+        anomaly_threshold=anomaly_threshold,
+        anomaly_alpha=anomaly_alpha,
+        anomaly_warmup=anomaly_warmup,
+        anomaly_stuck_frames=anomaly_stuck_frames,
+        sinks=sinks.split(",") if isinstance(sinks, str) else list(sinks),
+        sink_queue_size=sink_queue_size,
+        sink_batch_size=sink_batch_size,
+        path_file_sink=path_file_sink,
+        pixel_history_store=pixel_history_store,
+        pixel_block_duration=pixel_block_duration,
+        pixel_block_size=pixel_block_size,
+        pixel_flush_interval=pixel_flush_interval,
+        quantile_accuracy=quantile_accuracy,
+        quantile_snapshot_interval=quantile_snapshot_interval,
+        render_interval=render_interval,
+        render_scale=render_scale,
+        render_colormap=render_colormap,
+        render_format=render_format,
+        shm_prefix=shm_prefix,
+        path_calibration_dir=path_calibration_dir,
+        calibration_reload_interval=calibration_reload_interval,
+        calibration_store=calibration_store,
+        aggregate_queries=aggregate_queries,
+        aggregate_cache_size=aggregate_cache_size,
+        aggregate_cache_ttl=aggregate_cache_ttl,
+        aggregate_refresh_interval=aggregate_refresh_interval,
+        log_sample_rate=log_sample_rate,
+        path_profiling_dir=path_profiling_dir,
+        trace_slow_threshold=trace_slow_threshold,
+        local_ingest=local_ingest,
+        local_ingest_address=local_ingest_address,
+        local_ingest_slots=local_ingest_slots,
+        local_ingest_slot_size=local_ingest_slot_size,
+    )
+    if workers > 1:
+        if local_ingest is not None:
+            raise ValueError("Local ingest transport is not supported with workers.")
+
+        # Imported here as the supervisor runs AppSensorReader in its workers
+        from sensor_reader.supervisor import Supervisor
+
+        supervisor = Supervisor(workers, app_kwargs, log_level=log_level)
+        tasks.append(supervisor.run())
+    else:
+        app_sensor_reader = AppSensorReader(**app_kwargs)
+        tasks.append(app_sensor_reader.run())
     # asyncio.run(app_sensor_reader.run())
 
     asyncio.run(run_concurrent_tasks(tasks))
@@ -1,8 +1,10 @@
 import re
+from datetime import datetime
 from enum import Enum
-from urllib.parse import urlparse
+from typing import Literal
+from urllib.parse import parse_qsl, unquote, urlparse
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic.networks import IPvAnyAddress
 
 
@@ -12,6 +14,120 @@ class AppCommandActions(Enum):
     START: int = 0
     STOP: int = 1
     EXIT: int = 2
+    SET: int = 3
+    STATS: int = 4
+    PROFILE_START: int = 5
+    PROFILE_STOP: int = 6
+
+
+class TuningParams(BaseModel):
+    """Class model to define performance parameters of AppSensorReader tunable at runtime."""
+
+    freq_report_data: float | None = Field(default=None, gt=0)
+    sink_batch_size: int | None = Field(default=None, gt=0)
+    sink_queue_size: int | None = Field(default=None, gt=0)
+    log_sample_rate: int | None = Field(default=None, gt=0)
+
+
+class ProfilingParams(BaseModel):
+    """Class model to define parameters of an in-process profiling session."""
+
+    mode: Literal["deterministic", "sampling"] = "sampling"
+    duration: float = Field(default=30.0, gt=0, le=600)
+    memory: bool = True
+
+
+class QuantileQuery(BaseModel):
+    """
+    Class model to define queries of per-pixel quantiles of a sensor. Quantiles are estimated
+    since app start, or over stored time windows within a time range if set.
+    """
+
+    quantiles: list[float] = Field(default=[0.01, 0.5, 0.99], min_length=1)
+    pixels: list[int] | None = None
+    time_start: datetime | None = None
+    time_end: datetime | None = None
+
+    @field_validator("quantiles")
+    @classmethod
+    def _check_quantiles(cls, quantiles: list[float]):
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError("Quantiles must be between 0 and 1.")
+        return quantiles
+
+    @field_validator("pixels")
+    @classmethod
+    def _check_pixels(cls, pixels: list[int] | None):
+        if pixels is not None and any(pixel < 0 for pixel in pixels):
+            raise ValueError("Pixel indices must be positive.")
+        return pixels
+
+
+class AggregateQuery(BaseModel):
+    """
+    Class model to define queries of aggregates of the frames of a sensor over time buckets,
+    like the hourly mean of the sensor over the last day, or the max. of each pixel today.
+    Buckets are aligned on multiples of their duration since epoch, and the time range is
+    extended to whole buckets. The time range defaults to the last day.
+    """
+
+    aggregate: Literal["mean", "min", "max"] = "mean"
+    per_pixel: bool = False
+    bucket: int = Field(default=3600, gt=0)
+    time_start: datetime | None = None
+    time_end: datetime | None = None
+
+
+class AppCommand(BaseModel):
+    """
+    Class model to define structured commands to AppSensorReader. Actions can be set by their
+    value or their name.
+    """
+
+    action: AppCommandActions
+    params: TuningParams | ProfilingParams | dict = {}
+
+    @field_validator("action", mode="before")
+    @classmethod
+    def _parse_action_name(cls, action):
+        if isinstance(action, str):
+            try:
+                return AppCommandActions[action.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown command action: {action}.")
+        return action
+
+    @model_validator(mode="before")
+    @classmethod
+    def _validate_params(cls, data):
+        # Parse parameters with the model of the command action, if it has any
+        if not isinstance(data, dict):
+            return data
+
+        action = cls._parse_action_name(data.get("action"))
+        params = data.get("params") or {}
+        match action:
+            case AppCommandActions.SET | AppCommandActions.SET.value:
+                data = {**data, "params": TuningParams.model_validate(params)}
+            case AppCommandActions.PROFILE_START | AppCommandActions.PROFILE_START.value:
+                data = {**data, "params": ProfilingParams.model_validate(params)}
+
+        return data
+
+    @classmethod
+    def from_message(cls, data: str):
+        """Parse a command from message data, either a bare action value or a JSON object.
+
+        Args:
+            data (str): message data.
+
+        Returns:
+            AppCommand: parsed command.
+        """
+        data = data.strip()
+        if data.isdigit():
+            return cls(action=AppCommandActions(int(data)))
+        return cls.model_validate_json(data)
 
 
 class UrlConstraints(BaseModel):
@@ -95,3 +211,23 @@ class IPAddressWithPort(BaseModel):
 
         # If no IP and port are found, raise an error
         raise ValueError("Invalid IP or port.")
+
+
+class FileUri(BaseModel):
+    """Class model to define local storage addresses, like 'file:///path/to/dir?param=value'."""
+
+    uri: str
+    path: str | None = None
+    params: dict[str, str] = {}
+
+    @model_validator(mode="after")
+    def _validate_uri(self):
+        parsed_uri = urlparse(self.uri)
+        if parsed_uri.scheme != "file":
+            raise ValueError("URI header is incorrect. Must be file://.")
+        if not parsed_uri.path:
+            raise ValueError("URI path is empty.")
+
+        self.path = unquote(parsed_uri.path)
+        self.params = dict(parse_qsl(parsed_uri.query))
+        return self
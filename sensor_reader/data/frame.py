@@ -0,0 +1,292 @@
+import re
+import time
+from enum import IntEnum
+
+import numpy as np
+
+# Content type of frames encoded as raw little-endian uint16 values
+CONTENT_TYPE_FRAME = "application/x-uint16"
+
+# Translation table removing array delimiters from frames encoded as text
+_TEXT_DELIMITERS = bytes.maketrans(b"[],\n", b"    ")
+_PATTERN_TEXT_VALUES = re.compile(rb"[0-9\s]*")
+
+
+class FrameStage(IntEnum):
+    """
+    Enum class to define stages of the frame pipeline where frames are timestamped. COMMIT is
+    stamped once a frame is committed to the database, possibly after it has been published, so it
+    is only known to this process and never sent in message headers.
+    """
+
+    CAPTURE: int = 0
+    RECEIPT: int = 1
+    PARSE: int = 2
+    PUBLISH: int = 3
+    COMMIT: int = 4
+
+
+def get_stamp_now():
+    """Get current monotonic and wall-clock times.
+
+    Returns:
+        tuple[float, float]: monotonic time [s] and wall-clock time since epoch [s].
+    """
+    return time.monotonic(), time.time()
+
+
+class FrameParseError(ValueError):
+    """Error raised when a frame cannot be parsed from a message payload."""
+
+
+class Frame:
+    """
+    Class to define a sensor frame: pixel values held in a contiguous uint16 buffer, with the
+    identifier of the sensor, its sequence number and the monotonic and wall-clock times at which
+    it went through each stage of the pipeline (FrameStage) attached.
+    """
+
+    __slots__ = ("values", "sensor_id", "seq", "stamps")
+
+    dtype = np.dtype("<u2")
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        sensor_id: str,
+        seq: int,
+        stamps: np.ndarray | None = None,
+    ):
+        self.values = values
+        self.sensor_id = sensor_id
+        self.seq = seq
+
+        # Monotonic and wall-clock times of each stage [s], NaN for stages not reached
+        if stamps is None:
+            stamps = np.full((len(FrameStage), 2), np.nan)
+            stamps[FrameStage.RECEIPT] = get_stamp_now()
+        self.stamps = stamps
+
+    def stamp(self, stage: FrameStage, stamp: tuple[float, float] | None = None):
+        """Timestamp a stage of the frame.
+
+        Args:
+            stage (FrameStage): stage of the pipeline.
+            stamp (tuple[float, float] | None, optional): monotonic and wall-clock times [s].
+                Current times are used if not set. Defaults to None.
+        """
+        self.stamps[stage] = get_stamp_now() if stamp is None else stamp
+
+    def stamp_once(self, stage: FrameStage):
+        """Timestamp a stage of the frame with current times, unless it has already been
+        reached, as the same frame can be handed to sinks several times.
+
+        Args:
+            stage (FrameStage): stage of the pipeline.
+
+        Returns:
+            bool: True if the stage has been stamped, False if it had already been reached.
+        """
+        if self.get_stamp(stage) is not None:
+            return False
+
+        self.stamp(stage)
+        return True
+
+    def get_stamp(self, stage: FrameStage):
+        """Get timestamps of a stage of the frame.
+
+        Args:
+            stage (FrameStage): stage of the pipeline.
+
+        Returns:
+            tuple[float, float] | None: monotonic and wall-clock times [s]. None if the stage has
+                not been reached.
+        """
+        monotonic, wall = self.stamps[stage]
+        if np.isnan(monotonic):
+            return None
+        return float(monotonic), float(wall)
+
+    @property
+    def timestamp(self):
+        """Wall-clock time of the frame: capture time if set by the sensor, receipt otherwise.
+
+        Returns:
+            float: time since epoch [s].
+        """
+        stamp = self.get_stamp(FrameStage.CAPTURE) or self.get_stamp(FrameStage.RECEIPT)
+        return stamp[1]  # type: ignore
+
+    @classmethod
+    def from_payload(
+        cls,
+        payload: bytes,
+        sensor_id: str,
+        seq: int,
+        content_type: str | None = None,
+        stamp_capture: tuple[float, float] | None = None,
+        stamp_receipt: tuple[float, float] | None = None,
+    ):
+        """Parse a frame from a message payload, either raw uint16 values or text like the
+        string representation of a list or a NumPy array.
+
+        Args:
+            payload (bytes): message payload.
+            sensor_id (str): identifier of the sensor.
+            seq (int): sequence number of the frame.
+            content_type (str | None, optional): content type of the payload. Payload is parsed as
+                text if not set. Defaults to None.
+            stamp_capture (tuple[float, float] | None, optional): monotonic and wall-clock capture
+                times set by the sensor [s]. Defaults to None.
+            stamp_receipt (tuple[float, float] | None, optional): monotonic and wall-clock receipt
+                times [s]. Current times are used if not set. Defaults to None.
+
+        Raises:
+            FrameParseError: payload could not be parsed.
+
+        Returns:
+            Frame: parsed frame.
+        """
+        if content_type == CONTENT_TYPE_FRAME:
+            if len(payload) % cls.dtype.itemsize:
+                raise FrameParseError("Payload size is not a multiple of value size.")
+            values = np.frombuffer(payload, dtype=cls.dtype)
+        else:
+            values = cls.parse_text(payload)
+
+        frame = cls(values, sensor_id, seq)
+        if stamp_capture is not None:
+            frame.stamp(FrameStage.CAPTURE, stamp_capture)
+        if stamp_receipt is not None:
+            frame.stamp(FrameStage.RECEIPT, stamp_receipt)
+
+        return frame
+
+    @classmethod
+    def parse_text(cls, payload: bytes):
+        """Parse frame values from text, like the string representation of a list or an array.
+
+        Args:
+            payload (bytes): text payload.
+
+        Raises:
+            FrameParseError: payload contains other characters than values and delimiters, or
+                values exceed uint16 range.
+
+        Returns:
+            np.ndarray: parsed values.
+        """
+        text = payload.translate(_TEXT_DELIMITERS)
+        if not _PATTERN_TEXT_VALUES.fullmatch(text):
+            raise FrameParseError(f"Unexpected characters in payload: {payload[:64]!r}")
+        if not text.strip():
+            return np.empty(0, dtype=cls.dtype)
+
+        values = np.fromstring(text, dtype=np.int64, sep=" ")
+        if values.size and values.max() > np.iinfo(cls.dtype).max:
+            raise FrameParseError("Values exceed uint16 range.")
+
+        return values.astype(cls.dtype)
+
+    def to_bytes(self):
+        """Encode frame values as raw little-endian uint16 values.
+
+        Returns:
+            bytes: encoded values.
+        """
+        return self.values.tobytes()
+
+    def get_headers(self):
+        """Get NATS message headers describing the frame.
+
+        Returns:
+            dict[str, str]: message headers.
+        """
+        headers = {
+            "Content-Type": CONTENT_TYPE_FRAME,
+            "Sensor-Id": self.sensor_id,
+            "Frame-Seq": str(self.seq),
+        }
+        for stage in FrameStage:
+            stamp = self.get_stamp(stage)
+            if stamp is not None and stage != FrameStage.COMMIT:
+                headers[get_stamp_header(stage)] = format_stamp(stamp)
+
+        return headers
+
+    @classmethod
+    def from_message(cls, payload: bytes, headers: dict[str, str]):
+        """Decode a frame published with its headers, as done by AppSensorReader.
+
+        Args:
+            payload (bytes): message payload.
+            headers (dict[str, str]): message headers.
+
+        Returns:
+            Frame: decoded frame.
+        """
+        frame = cls(
+            np.frombuffer(payload, dtype=cls.dtype),
+            headers["Sensor-Id"],
+            int(headers["Frame-Seq"]),
+            stamps=np.full((len(FrameStage), 2), np.nan),
+        )
+        for stage in FrameStage:
+            stamp = parse_stamp(headers.get(get_stamp_header(stage)))
+            if stamp is not None:
+                frame.stamp(stage, stamp)
+
+        return frame
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return (
+            f"Frame(sensor_id={self.sensor_id!r}, seq={self.seq}, values={self.values})"
+        )
+
+
+def get_stamp_header(stage: FrameStage):
+    """Get name of the message header carrying timestamps of a frame stage.
+
+    Args:
+        stage (FrameStage): stage of the pipeline.
+
+    Returns:
+        str: header name, like 'Stamp-Capture'.
+    """
+    return f"Stamp-{stage.name.capitalize()}"
+
+
+def format_stamp(stamp: tuple[float, float]):
+    """Format monotonic and wall-clock times as a message header value.
+
+    Args:
+        stamp (tuple[float, float]): monotonic and wall-clock times [s].
+
+    Returns:
+        str: header value, with both times separated by a space.
+    """
+    return f"{stamp[0]!r} {stamp[1]!r}"
+
+
+def parse_stamp(value: str | None):
+    """Parse monotonic and wall-clock times from a message header value.
+
+    Args:
+        value (str | None): header value, with both times separated by a space.
+
+    Returns:
+        tuple[float, float] | None: monotonic and wall-clock times [s]. None if the header is
+            missing or malformed.
+    """
+    if not value:
+        return None
+
+    try:
+        monotonic, wall = value.split()
+        return float(monotonic), float(wall)
+    except ValueError:
+        return None
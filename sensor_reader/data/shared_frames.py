@@ -0,0 +1,255 @@
+import re
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from sensor_reader.data.frame import Frame, FrameStage, get_stamp_now
+
+# Segment layout: version counter on its own cache line, frame header (magic, capacity and number
+# of pixels, sequence number), stamps of each stage, then pixel values
+_OFFSET_VERSION = 0
+_OFFSET_HEADER = 64
+_OFFSET_STAMPS = 96
+_OFFSET_VALUES = 192
+_MAGIC_SEGMENT = b"SRF1"
+_HEADER_SEGMENT = struct.Struct("<4sIIq")
+# Version of segments replaced or removed by the writer
+_VERSION_CLOSED = 2**64 - 1
+
+_PATTERN_NAME_INVALID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def get_segment_name(prefix: str, sensor_id: str):
+    """Get name of the shared memory segment holding the latest frame of a sensor.
+
+    Args:
+        prefix (str): prefix of segment names.
+        sensor_id (str): identifier of the sensor.
+
+    Returns:
+        str: name of the segment.
+    """
+    return f"{prefix}_{_PATTERN_NAME_INVALID.sub('_', sensor_id)}"
+
+
+class _Segment:
+    __slots__ = ("shm", "version", "capacity", "stamps", "values")
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.version = np.ndarray((1,), np.uint64, shm.buf, _OFFSET_VERSION)
+        self.capacity = capacity
+        self.stamps = np.ndarray(
+            (len(FrameStage), 2), np.float64, shm.buf, _OFFSET_STAMPS
+        )
+        self.values = np.ndarray((capacity,), Frame.dtype, shm.buf, _OFFSET_VALUES)
+
+    def close(self):
+        del self.version, self.stamps, self.values
+        self.shm.close()
+
+
+class LatestFrameWriter:
+    """
+    Class to publish the latest frame of each sensor in a named shared memory segment, so
+    co-located consumers read it without serialization nor broker. Each segment holds a
+    seqlock-style version counter, odd while a frame is being written: readers retry reads
+    which overlap a write. This relies on aligned 8-byte stores being atomic and kept in order,
+    as on x86-64.
+    """
+
+    def __init__(self, prefix: str = "sensor_reader"):
+        self.prefix = prefix
+        self._segments: dict[str, _Segment] = {}
+
+    def write(self, frame: Frame):
+        """Publish a frame as the latest one of its sensor, stamped with its publication time.
+        The segment of the sensor is created on its first frame, and replaced if a frame
+        exceeds its capacity.
+
+        Args:
+            frame (Frame): frame to be published.
+        """
+        segment = self._segments.get(frame.sensor_id)
+        if segment is not None and len(frame) > segment.capacity:
+            self._remove(frame.sensor_id)
+            segment = None
+        if segment is None:
+            segment = self._create(frame.sensor_id, len(frame))
+
+        version = int(segment.version[0])
+        segment.version[0] = version + 1
+        _HEADER_SEGMENT.pack_into(
+            segment.shm.buf,
+            _OFFSET_HEADER,
+            _MAGIC_SEGMENT,
+            segment.capacity,
+            len(frame),
+            frame.seq,
+        )
+        segment.stamps[:] = frame.stamps
+        segment.stamps[FrameStage.PUBLISH] = get_stamp_now()
+        segment.values[: len(frame)] = frame.values
+        segment.version[0] = version + 2
+
+    def close(self):
+        """Mark all segments as closed for readers, and remove them."""
+        for sensor_id in list(self._segments):
+            self._remove(sensor_id)
+
+    def _create(self, sensor_id: str, capacity: int):
+        name = get_segment_name(self.prefix, sensor_id)
+        size = _OFFSET_VALUES + capacity * Frame.dtype.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Remove segment left by a previous run
+            shared_memory.SharedMemory(name).unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+
+        shm.buf[:_OFFSET_VALUES] = bytes(_OFFSET_VALUES)
+        _HEADER_SEGMENT.pack_into(
+            shm.buf, _OFFSET_HEADER, _MAGIC_SEGMENT, capacity, 0, -1
+        )
+        segment = _Segment(shm, capacity)
+        self._segments[sensor_id] = segment
+
+        return segment
+
+    def _remove(self, sensor_id: str):
+        segment = self._segments.pop(sensor_id)
+        segment.version[0] = _VERSION_CLOSED
+        segment.shm.unlink()
+        segment.close()
+
+
+class LatestFrameReader:
+    """
+    Class to read the latest frame of a sensor published by a LatestFrameWriter. The segment is
+    attached on first read, and attached again if the writer replaced it. The resource tracker
+    of the reader is stopped from removing the segment at exit, unless unregister is disabled
+    because the tracker is shared with the writer, like in processes spawned by it.
+    """
+
+    def __init__(
+        self,
+        sensor_id: str,
+        prefix: str = "sensor_reader",
+        unregister: bool = True,
+        max_retries: int = 1000,
+    ):
+        self.sensor_id = sensor_id
+        self.name = get_segment_name(prefix, sensor_id)
+        self.unregister = unregister
+        self.max_retries = max_retries
+        # Version of the last read frame, 0 if none
+        self.version = 0
+        self.count_retries = 0
+        self._segment: _Segment | None = None
+
+    def read(self, copy: bool = True):
+        """Read the latest frame of the sensor.
+
+        Args:
+            copy (bool, optional): copy pixel values. If not set, values are a read-only view on
+                shared memory, overwritten by the next frame: check is_current after using
+                them. Defaults to True.
+
+        Raises:
+            TimeoutError: frame kept being written over max_retries attempts.
+
+        Returns:
+            Frame | None: latest frame. None if no frame has been published yet.
+        """
+        for _ in range(self.max_retries):
+            if self._segment is None and not self._attach():
+                return None
+            segment: _Segment = self._segment  # type: ignore
+
+            version = int(segment.version[0])
+            if version == _VERSION_CLOSED:
+                self._detach()
+                continue
+            if version % 2:
+                self.count_retries += 1
+                continue
+
+            _, _, count_pixels, seq = _HEADER_SEGMENT.unpack_from(
+                segment.shm.buf, _OFFSET_HEADER
+            )
+            stamps = segment.stamps.copy()
+            values = segment.values[:count_pixels]
+            if copy:
+                values = values.copy()
+            else:
+                values.flags.writeable = False
+
+            if int(segment.version[0]) != version:
+                self.count_retries += 1
+                continue
+
+            self.version = version
+            if seq < 0:
+                return None
+            return Frame(values, self.sensor_id, seq, stamps=stamps)
+
+        raise TimeoutError(f"Latest frame of sensor '{self.sensor_id}' not readable.")
+
+    def read_new(self, copy: bool = True):
+        """Read the latest frame of the sensor, if it is newer than the last read one.
+
+        Args:
+            copy (bool, optional): copy pixel values (see read). Defaults to True.
+
+        Returns:
+            Frame | None: latest frame. None if no newer frame has been published.
+        """
+        if self.is_current():
+            return None
+        segment, version = self._segment, self.version
+        frame = self.read(copy)
+        if frame is None or (self._segment is segment and self.version == version):
+            return None
+
+        return frame
+
+    def is_current(self):
+        """Check if the last read frame is still the latest one, so values read without copy
+        are consistent.
+
+        Returns:
+            bool: True if no frame has been written since the last read, False otherwise.
+        """
+        return (
+            self._segment is not None and int(self._segment.version[0]) == self.version
+        )
+
+    def close(self):
+        """Detach from the segment."""
+        self._detach()
+
+    def _attach(self):
+        try:
+            shm = shared_memory.SharedMemory(self.name)
+        except FileNotFoundError:
+            return False
+        # Segment is owned by the writer, do not remove it when this process exits
+        if self.unregister:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+
+        magic, capacity, _, _ = _HEADER_SEGMENT.unpack_from(shm.buf, _OFFSET_HEADER)
+        if magic != _MAGIC_SEGMENT:
+            shm.close()
+            # Segment just created, and not initialized yet by the writer
+            if not any(magic):
+                return False
+            raise ValueError(f"Shared memory '{self.name}' does not hold a frame.")
+        self._segment = _Segment(shm, capacity)
+
+        return True
+
+    def _detach(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sensor_reader.data.custom_types import AggregateQuery
+from sensor_reader.db.aggregates import AggregateBucket
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.db.frame_log import FrameLogDbClient
+from sensor_reader.monitoring.stats import LatencyHistogram
+
+
+class AggregateQueryService:
+    """
+    Class to answer aggregate queries of sensor frames from a database, with the aggregate of
+    each time bucket kept in an LRU cache keyed by query and bucket. Past buckets are kept for
+    the cache TTL, while buckets still receiving frames are only kept for the refresh interval,
+    so repeated queries only recompute their newest bucket. Missing buckets are computed by the
+    database, with one query per run of consecutive buckets.
+    """
+
+    def __init__(
+        self,
+        db_client: PostgresDbClient | FrameLogDbClient,
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        refresh_interval: float = 1.0,
+        max_buckets: int = 1000,
+    ):
+        self.db_client = db_client
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl  # [s]
+        self.refresh_interval = refresh_interval  # [s]
+        self.max_buckets = max_buckets
+
+        # Expiry time and aggregate (None if the bucket holds no frames) of cached buckets, by
+        # query and bucket index
+        self._cache: OrderedDict[
+            tuple, tuple[float, AggregateBucket | None]
+        ] = OrderedDict()
+        # Queries run on worker threads, and share the cache and the database connection
+        self._lock = threading.Lock()
+        self.count_queries = 0
+        self.count_hits = 0
+        self.count_misses = 0
+        self.latency_query = LatencyHistogram()
+
+    def query(self, sensor_id: str, query: AggregateQuery):
+        """Get aggregates of the frames of a sensor over the buckets of a query.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            query (AggregateQuery): aggregate query.
+
+        Raises:
+            ValueError: time range of the query spans more buckets than allowed.
+
+        Returns:
+            list[AggregateBucket]: aggregates of buckets holding frames, in time order.
+        """
+        time_start_query = time.perf_counter()
+        time_now = time.time()
+        bucket = query.bucket
+        time_end = query.time_end.timestamp() if query.time_end else time_now
+        time_start = (
+            query.time_start.timestamp() if query.time_start else time_end - 86400
+        )
+        index_first = math.floor(time_start / bucket)
+        index_end = max(math.ceil(time_end / bucket), index_first + 1)
+        if index_end - index_first > self.max_buckets:
+            raise ValueError(
+                f"Query spans {index_end - index_first} buckets, more than "
+                f"{self.max_buckets}."
+            )
+
+        key = (sensor_id, query.aggregate, query.per_pixel, bucket)
+        with self._lock:
+            results: dict[int, AggregateBucket | None] = {}
+            missing = []
+            time_cache = time.monotonic()
+            for index in range(index_first, index_end):
+                entry = self._cache.get((*key, index))
+                if entry is not None and entry[0] > time_cache:
+                    self._cache.move_to_end((*key, index))
+                    results[index] = entry[1]
+                else:
+                    missing.append(index)
+            self.count_hits += len(results)
+            self.count_misses += len(missing)
+
+            for run in get_runs(missing):
+                results.update(self._compute_buckets(key, run, time_now))
+            self.count_queries += 1
+
+        self.latency_query.record(time.perf_counter() - time_start_query)
+
+        return [result for _, result in sorted(results.items()) if result is not None]
+
+    def get_stats(self):
+        """Get statistics of the service.
+
+        Returns:
+            dict: number of cached buckets, queries, bucket cache hits and misses, and query
+                latencies.
+        """
+        return {
+            "cached": len(self._cache),
+            "queries": self.count_queries,
+            "hits": self.count_hits,
+            "misses": self.count_misses,
+            "latency": self.latency_query.snapshot(),
+        }
+
+    def _compute_buckets(self, key: tuple, indices: list[int], time_now: float):
+        sensor_id, aggregate, per_pixel, bucket = key
+        buckets = self.db_client.get_aggregates(
+            sensor_id,
+            aggregate,
+            per_pixel,
+            bucket,
+            datetime.fromtimestamp(indices[0] * bucket, timezone.utc),
+            datetime.fromtimestamp((indices[-1] + 1) * bucket, timezone.utc),
+        )
+        computed = {
+            int(result.time_start.timestamp()) // bucket: result for result in buckets
+        }
+
+        results = {}
+        time_cache = time.monotonic()
+        for index in indices:
+            # Buckets not over yet are recomputed after the refresh interval
+            ttl = (
+                self.refresh_interval
+                if (index + 1) * bucket > time_now
+                else self.cache_ttl
+            )
+            results[index] = computed.get(index)
+            self._cache[(*key, index)] = (time_cache + ttl, results[index])
+            self._cache.move_to_end((*key, index))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return results
+
+
+def get_runs(indices: list[int]):
+    """Split sorted indices into runs of consecutive indices.
+
+    Args:
+        indices (list[int]): sorted indices.
+
+    Returns:
+        list[list[int]]: runs of consecutive indices.
+    """
+    runs: list[list[int]] = []
+    for index in indices:
+        if runs and index == runs[-1][-1] + 1:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+
+    return runs
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from pydantic import BaseModel
+
+# Reductions of frame values over the frames of a time bucket, for each supported aggregate
+_REDUCTIONS = {"mean": np.add, "min": np.minimum, "max": np.maximum}
+
+
+class AggregateBucket(BaseModel):
+    """
+    Class model to define an aggregate of the frames of a sensor over a time bucket: one value
+    for the whole sensor, or one value per pixel.
+    """
+
+    time_start: datetime
+    count: int
+    values: list[float]
+
+
+def aggregate_frames(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    aggregate: str,
+    per_pixel: bool,
+    bucket: int,
+):
+    """Aggregate frames over time buckets aligned on multiples of the bucket duration since
+    epoch.
+
+    Args:
+        timestamps (np.ndarray): non-decreasing timestamps [s] since epoch.
+        values (np.ndarray): frame values (frames, pixels).
+        aggregate (str): aggregate of values: 'mean', 'min' or 'max'.
+        per_pixel (bool): aggregate each pixel, or all pixels of the sensor at once.
+        bucket (int): duration of time buckets [s].
+
+    Returns:
+        list[AggregateBucket]: aggregates of buckets holding frames, in time order.
+    """
+    if not len(timestamps):
+        return []
+
+    reduction = _REDUCTIONS[aggregate]
+    values = np.asarray(values, dtype=np.float64)
+    if not per_pixel:
+        # Frames are aggregated first, so all buckets hold one value per frame
+        if aggregate == "mean":
+            values = values.mean(axis=1, keepdims=True)
+        else:
+            values = reduction.reduce(values, axis=1, keepdims=True)
+
+    # Timestamps are sorted, so the frames of each bucket are contiguous
+    buckets = np.floor_divide(timestamps, bucket).astype(np.int64)
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    counts = np.diff(starts, append=len(buckets))
+    results = reduction.reduceat(values, starts, axis=0)
+    if aggregate == "mean":
+        results /= counts[:, np.newaxis]
+
+    return [
+        AggregateBucket(
+            time_start=datetime.fromtimestamp(int(index) * bucket, timezone.utc),
+            count=int(count),
+            values=row,
+        )
+        for index, count, row in zip(buckets[starts], counts, results.tolist())
+    ]
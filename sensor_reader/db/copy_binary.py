@@ -0,0 +1,71 @@
+import io
+import struct
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from sensor_reader.data.frame import Frame
+
+# Binary COPY format: signature, flags and header extension length, then tuples, then trailer
+_COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_BINARY_TRAILER = struct.pack("!h", -1)
+_OID_INT4 = 23
+_EPOCH_POSTGRES = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def format_array_text(values: np.ndarray):
+    """Format values as a PostgreSQL array literal.
+
+    Args:
+        values (np.ndarray): integer values.
+
+    Returns:
+        str: array literal, like '{1,2,3}'.
+    """
+    return "{" + ",".join(map(str, values.tolist())) + "}"
+
+
+def format_array_binary(values: np.ndarray):
+    """Format values as a PostgreSQL INT[] in binary format.
+
+    Args:
+        values (np.ndarray): integer values.
+
+    Returns:
+        bytes: encoded array.
+    """
+    # Header (dimensions, null flag, element type, length, lower bound), then length and value
+    # of each element
+    elements = np.empty((len(values), 2), dtype=">i4")
+    elements[:, 0] = 4
+    elements[:, 1] = values
+    return struct.pack("!iiiii", 1, 0, _OID_INT4, len(values), 1) + elements.tobytes()
+
+
+def build_copy_frames(batch: list[tuple[Frame, datetime]]):
+    """Encode a batch of frames in PostgreSQL binary COPY format, as rows of
+    (value, sensor_id, seq, timestamp). Naive timestamps are taken as local time.
+
+    Args:
+        batch (list[tuple[Frame, datetime]]): frames and their timestamps.
+
+    Returns:
+        io.BytesIO: encoded batch.
+    """
+    buffer = io.BytesIO()
+    buffer.write(_COPY_BINARY_HEADER)
+    for frame, timestamp in batch:
+        array = format_array_binary(frame.values)
+        sensor_id = frame.sensor_id.encode()
+        timestamp_us = (timestamp.astimezone() - _EPOCH_POSTGRES) // timedelta(
+            microseconds=1
+        )
+        buffer.write(struct.pack("!hi", 4, len(array)))
+        buffer.write(array)
+        buffer.write(struct.pack("!i", len(sensor_id)))
+        buffer.write(sensor_id)
+        buffer.write(struct.pack("!iqiq", 8, frame.seq, 8, timestamp_us))
+    buffer.write(_COPY_BINARY_TRAILER)
+    buffer.seek(0)
+
+    return buffer
@@ -1,8 +1,18 @@
+from datetime import datetime, timezone
+
+import numpy as np
 import psycopg2
 from loguru import logger
 from psycopg2.extensions import connection, cursor
+from psycopg2.extras import execute_values
 
+from sensor_reader.analytics.quantiles import PixelQuantileSketch
 from sensor_reader.data.custom_types import IPAddressWithPort
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.aggregates import AggregateBucket
+from sensor_reader.db.copy_binary import build_copy_frames, format_array_text
+from sensor_reader.db.frame_log import FrameLogDbClient
+from sensor_reader.db.pixel_history import PixelBlock, merge_pixel_series
 
 
 class PostgresDbClient:
@@ -17,6 +27,10 @@ class PostgresDbClient:
         self.timeout_connect = 10  # [s]
         self.db_conn: connection | None = None
         self.table_name = "sensor_data"
+        self.table_name_blocks = "sensor_data_blocks"
+        self.table_name_pixels = "sensor_data_pixels"
+        self.table_name_quantiles = "sensor_data_quantiles"
+        self.table_name_calibrated = "sensor_data_calibrated"
 
     def connect(self):
         """Connect to set PostgreSQL server.
@@ -45,17 +59,75 @@ class PostgresDbClient:
         """Set table data structure in case there was no previous existing data."""
         # Check previous existing data
         self.cursor = self.db_conn.cursor()
+
         flag_previous_data = self.check_existing_data(self.cursor)
 
         if flag_previous_data:
-            return
+            # Add frame metadata to tables created by previous versions
+            self.cursor.execute(
+                f"""ALTER TABLE {self.table_name}
+                ADD COLUMN IF NOT EXISTS sensor_id TEXT,
+                ADD COLUMN IF NOT EXISTS seq BIGINT;"""
+            )
+        else:
+            # Define basic structure of the database table
+            self.cursor.execute(
+                f"""CREATE TABLE {self.table_name}
+                (id serial  PRIMARY KEY,
+                value       INT[]    NOT NULL,
+                timestamp   TIMESTAMPTZ NOT NULL,
+                sensor_id   TEXT,
+                seq         BIGINT);"""  # noqa E231 E241
+            )
+
+        # Index frames of each sensor by time, for time range and aggregate queries
+        self.cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table_name}_sensor_time_idx "
+            f"ON {self.table_name} (sensor_id, timestamp);"
+        )
+
+        # Define pixel-major history: blocks of frames of a sensor, with the series of each pixel
+        # stored in its own row
+        self.cursor.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name_blocks}
+            (id serial  PRIMARY KEY,
+            sensor_id   TEXT        NOT NULL,
+            time_start  TIMESTAMPTZ NOT NULL,
+            time_end    TIMESTAMPTZ NOT NULL,
+            count       INT         NOT NULL,
+            timestamps  BYTEA       NOT NULL);
+            CREATE INDEX IF NOT EXISTS {self.table_name_blocks}_sensor_time_idx
+            ON {self.table_name_blocks} (sensor_id, time_start);
+            CREATE TABLE IF NOT EXISTS {self.table_name_pixels}
+            (block_id   INT     NOT NULL REFERENCES {self.table_name_blocks} (id) ON DELETE CASCADE,
+            pixel       INT     NOT NULL,
+            value       BYTEA   NOT NULL,
+            PRIMARY KEY (block_id, pixel));"""  # noqa E231 E241
+        )
+
+        # Define quantile sketches of pixel values of each sensor over time windows
+        self.cursor.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name_quantiles}
+            (id serial  PRIMARY KEY,
+            sensor_id   TEXT        NOT NULL,
+            time_start  TIMESTAMPTZ NOT NULL,
+            time_end    TIMESTAMPTZ NOT NULL,
+            count       BIGINT      NOT NULL,
+            sketch      BYTEA       NOT NULL);
+            CREATE INDEX IF NOT EXISTS {self.table_name_quantiles}_sensor_time_idx
+            ON {self.table_name_quantiles} (sensor_id, time_start);"""  # noqa E231 E241
+        )
 
-        # Define basic structure of the database table
+        # Define calibrated frames (temperatures), stored next to raw frames
         self.cursor.execute(
-            f"""CREATE TABLE {self.table_name}
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name_calibrated}
             (id serial  PRIMARY KEY,
-            value       INT[]    NOT NULL,
-            timestamp   TIMESTAMPTZ NOT NULL);"""  # noqa E231 E241
+            value       REAL[]      NOT NULL,
+            timestamp   TIMESTAMPTZ NOT NULL,
+            sensor_id   TEXT        NOT NULL,
+            seq         BIGINT      NOT NULL);
+            CREATE INDEX IF NOT EXISTS {self.table_name_calibrated}_sensor_time_idx
+            ON {self.table_name_calibrated} (sensor_id, timestamp);"""  # noqa E231 E241
         )
         self.db_conn.commit()
 
@@ -75,7 +147,7 @@ class PostgresDbClient:
             tables = cursor.fetchall()
 
             for table in tables:
-                if self.table_name in table[0]:
+                if self.table_name == table[0]:
                     return True
 
         except psycopg2.Error as err:
@@ -83,20 +155,324 @@ class PostgresDbClient:
 
         return False
 
-    def save_data(self, data: list[int], timestamp: int):
+    def save_data(self, data: Frame, timestamp: datetime):
         """Save data to database.
 
         Args:
-            data (list[int]): data to be stored.
-            timestamp (int): timestamp of the data.
+            data (Frame): data to be stored.
+            timestamp (datetime): timestamp of the data.
+        """
+        self.cursor.execute(
+            f"INSERT INTO {self.table_name} (value, sensor_id, seq, timestamp) "
+            "VALUES (%s::INT[], %s, %s, %s)",
+            self._get_row(data, timestamp),
+        )
+        self.db_conn.commit()  # type: ignore
+
+    def save_data_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Save a batch of data to database in a single transaction, with a binary COPY of
+        the frames as INT[].
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): data to be stored and their timestamps.
+        """
+        try:
+            self.cursor.copy_expert(
+                f"COPY {self.table_name} (value, sensor_id, seq, timestamp) "
+                "FROM STDIN WITH (FORMAT binary)",
+                build_copy_frames(batch),
+            )
+            self.db_conn.commit()  # type: ignore
+        except psycopg2.Error:
+            self.db_conn.rollback()  # type: ignore
+            raise
+
+    def save_calibrated_batch(self, batch: list[tuple[Frame, np.ndarray, datetime]]):
+        """Save a batch of calibrated frames in a single transaction.
+
+        Args:
+            batch (list[tuple[Frame, np.ndarray, datetime]]): frames, their temperatures and
+                their timestamps.
+        """
+        try:
+            execute_values(
+                self.cursor,
+                f"INSERT INTO {self.table_name_calibrated} "
+                "(value, sensor_id, seq, timestamp) VALUES %s",
+                [
+                    (temperatures.tolist(), frame.sensor_id, frame.seq, timestamp)
+                    for frame, temperatures, timestamp in batch
+                ],
+                template="(%s::REAL[], %s, %s, %s)",
+                page_size=len(batch),
+            )
+            self.db_conn.commit()  # type: ignore
+        except psycopg2.Error:
+            self.db_conn.rollback()  # type: ignore
+            raise
+
+    def save_pixel_blocks(self, blocks: list[PixelBlock]):
+        """Save blocks of frames to the pixel-major history in a single transaction. Blocks
+        replace stored blocks of the same sensor starting at the same time, as open blocks grow.
+
+        Args:
+            blocks (list[PixelBlock]): blocks to be stored.
+        """
+        try:
+            for block in blocks:
+                self.cursor.execute(
+                    f"DELETE FROM {self.table_name_blocks} "
+                    "WHERE sensor_id = %s AND time_start = %s",
+                    (block.sensor_id, block.time_start),
+                )
+                self.cursor.execute(
+                    f"INSERT INTO {self.table_name_blocks} "
+                    "(sensor_id, time_start, time_end, count, timestamps) "
+                    "VALUES (%s, %s, %s, %s, %s) RETURNING id",
+                    (
+                        block.sensor_id,
+                        block.time_start,
+                        block.time_end,
+                        block.count_frames,
+                        psycopg2.Binary(block.encode_timestamps()),
+                    ),
+                )
+                block_id = self.cursor.fetchone()[0]  # type: ignore
+                execute_values(
+                    self.cursor,
+                    f"INSERT INTO {self.table_name_pixels} (block_id, pixel, value) VALUES %s",
+                    [
+                        (block_id, pixel, psycopg2.Binary(chunk))
+                        for pixel, chunk in enumerate(block.encode_pixels())
+                    ],
+                    page_size=block.count_pixels,
+                )
+            self.db_conn.commit()  # type: ignore
+        except psycopg2.Error:
+            self.db_conn.rollback()  # type: ignore
+            raise
+
+    def get_pixel_history(
+        self,
+        sensor_id: str,
+        pixels: list[int],
+        time_start: datetime,
+        time_end: datetime,
+    ):
+        """Get the series of some pixels of a sensor over a time range, reading only the
+        requested pixels from the pixel-major history.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            pixels (list[int]): indices of the pixels.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: timestamps [s] since epoch and values (pixels, frames).
+        """
+        self.cursor.execute(
+            f"SELECT b.id, b.timestamps, p.pixel, p.value "
+            f"FROM {self.table_name_blocks} b JOIN {self.table_name_pixels} p "
+            "ON p.block_id = b.id "
+            "WHERE b.sensor_id = %s AND b.time_end >= %s AND b.time_start <= %s "
+            "AND p.pixel = ANY(%s) "
+            "ORDER BY b.time_start, b.id",
+            (sensor_id, time_start, time_end, list(pixels)),
+        )
+
+        # Group pixel series by block, in requested order
+        blocks: dict[int, tuple[bytes, dict[int, bytes]]] = {}
+        for block_id, timestamps, pixel, value in self.cursor.fetchall():
+            blocks.setdefault(block_id, (timestamps, {}))[1][pixel] = value
+        self.db_conn.commit()  # type: ignore
+
+        parts = []
+        for timestamps, values in blocks.values():
+            if any(pixel not in values for pixel in pixels):
+                raise ValueError(f"Pixel indices out of range: {pixels}.")
+            parts.append(
+                (
+                    PixelBlock.decode_timestamps(bytes(timestamps)),
+                    np.stack(
+                        [
+                            PixelBlock.decode_pixel(bytes(values[pixel]))
+                            for pixel in pixels
+                        ]
+                    ),
+                )
+            )
+
+        return merge_pixel_series(parts, len(pixels), time_start, time_end)
+
+    def save_quantile_sketches(
+        self,
+        sketches: dict[str, PixelQuantileSketch],
+        time_start: datetime,
+        time_end: datetime,
+    ):
+        """Save quantile sketches of several sensors over a time window.
+
+        Args:
+            sketches (dict[str, PixelQuantileSketch]): sketches of each sensor.
+            time_start (datetime): start of the time window.
+            time_end (datetime): end of the time window.
+        """
+        try:
+            execute_values(
+                self.cursor,
+                f"INSERT INTO {self.table_name_quantiles} "
+                "(sensor_id, time_start, time_end, count, sketch) VALUES %s",
+                [
+                    (
+                        sensor_id,
+                        time_start,
+                        time_end,
+                        sketch.count,
+                        psycopg2.Binary(sketch.to_bytes()),
+                    )
+                    for sensor_id, sketch in sketches.items()
+                ],
+            )
+            self.db_conn.commit()  # type: ignore
+        except psycopg2.Error:
+            self.db_conn.rollback()  # type: ignore
+            raise
+
+    def get_quantile_sketch(
+        self, sensor_id: str, time_start: datetime, time_end: datetime
+    ):
+        """Get the quantile sketch of a sensor over a time range, merging stored sketches of
+        the time windows overlapping the range. Windows are merged whole, so the range is
+        widened to the windows it overlaps.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range.
+
+        Returns:
+            tuple[PixelQuantileSketch | None, datetime | None, datetime | None]: merged sketch,
+                with start of the first and end of the last merged window. None if no sketches
+                are stored in range.
         """
         self.cursor.execute(
-            f"INSERT INTO {self.table_name} (value, timestamp) VALUES (%s, %s)",
-            (data, timestamp),
+            f"SELECT time_start, time_end, sketch FROM {self.table_name_quantiles} "
+            "WHERE sensor_id = %s AND time_end > %s AND time_start < %s",
+            (sensor_id, time_start, time_end),
         )
+        rows = self.cursor.fetchall()
         self.db_conn.commit()  # type: ignore
 
+        sketch = None
+        time_start_windows = time_end_windows = None
+        for time_start_window, time_end_window, data in rows:
+            if sketch is None:
+                sketch = PixelQuantileSketch.from_bytes(bytes(data))
+                time_start_windows, time_end_windows = (
+                    time_start_window,
+                    time_end_window,
+                )
+            else:
+                sketch.merge(PixelQuantileSketch.from_bytes(bytes(data)))
+                time_start_windows = min(time_start_windows, time_start_window)
+                time_end_windows = max(time_end_windows, time_end_window)
+
+        return sketch, time_start_windows, time_end_windows
+
+    def get_aggregates(
+        self,
+        sensor_id: str,
+        aggregate: str,
+        per_pixel: bool,
+        bucket: int,
+        time_start: datetime,
+        time_end: datetime,
+    ):
+        """Get aggregates of the frames of a sensor over the time buckets of a time range,
+        computed by the database server.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            aggregate (str): aggregate of values: 'mean', 'min' or 'max'.
+            per_pixel (bool): aggregate each pixel, or all pixels of the sensor at once.
+            bucket (int): duration of time buckets [s], aligned on multiples since epoch.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range, excluded.
+
+        Returns:
+            list[AggregateBucket]: aggregates of buckets holding frames, in time order.
+        """
+        function = {"mean": "avg", "min": "min", "max": "max"}[aggregate]
+        bucket_index = "floor(extract(epoch FROM timestamp) / %(bucket)s)::BIGINT"
+        where = (
+            "sensor_id = %(sensor_id)s "
+            "AND timestamp >= %(time_start)s AND timestamp < %(time_end)s"
+        )
+        if per_pixel:
+            # Each pixel is aggregated over its values in the bucket, one per frame
+            query = (
+                "SELECT bucket, max(count_frames), "
+                "array_agg(value_pixel ORDER BY pixel) FROM ("
+                f"SELECT {bucket_index} AS bucket, u.pixel, "
+                f"{function}(u.v)::FLOAT8 AS value_pixel, count(*) AS count_frames "
+                f"FROM {self.table_name}, unnest(value) WITH ORDINALITY AS u(v, pixel) "
+                f"WHERE {where} GROUP BY 1, 2) p "
+                "GROUP BY bucket ORDER BY bucket"
+            )
+        else:
+            # Frames are aggregated first, so all buckets hold one value per frame
+            query = (
+                f"SELECT bucket, count(*), ARRAY[{function}(value_frame)::FLOAT8] FROM ("
+                f"SELECT {bucket_index} AS bucket, "
+                f"(SELECT {function}(v) FROM unnest(value) AS v) AS value_frame "
+                f"FROM {self.table_name} WHERE {where}) f "
+                "GROUP BY bucket ORDER BY bucket"
+            )
+        try:
+            self.cursor.execute(
+                query,
+                {
+                    "sensor_id": sensor_id,
+                    "bucket": bucket,
+                    "time_start": time_start,
+                    "time_end": time_end,
+                },
+            )
+            rows = self.cursor.fetchall()
+            self.db_conn.commit()  # type: ignore
+        except psycopg2.Error:
+            self.db_conn.rollback()  # type: ignore
+            raise
+
+        return [
+            AggregateBucket(
+                time_start=datetime.fromtimestamp(index * bucket, timezone.utc),
+                count=count,
+                values=values,
+            )
+            for index, count, values in rows
+        ]
+
+    def _get_row(self, data: Frame, timestamp: datetime):
+        return (format_array_text(data.values), data.sensor_id, data.seq, timestamp)
+
     def disconnect(self):
         """Close cursor and connection to server database."""
         self.cursor.close()
         self.db_conn.close()
+
+
+def create_db_client(uri_db_server: str):
+    """Create a database client from the URI of its server.
+
+    Args:
+        uri_db_server (str): URI to database server, like '127.0.0.1:5432' for PostgreSQL, or
+            'file:///path/to/dir' for an embedded frame log.
+
+    Returns:
+        PostgresDbClient | FrameLogDbClient: database client.
+    """
+    if uri_db_server.startswith("file://"):
+        return FrameLogDbClient(uri_db_server)
+    return PostgresDbClient(uri_db_server)
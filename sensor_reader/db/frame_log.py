@@ -0,0 +1,466 @@
+import re
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from sensor_reader.data.custom_types import FileUri
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.aggregates import aggregate_frames
+
+# Segment files: magic, number of pixels and capacity of records, and number of written records,
+# followed by fixed-size records
+_MAGIC_SEGMENT = b"SRL1"
+_HEADER_SEGMENT = struct.Struct("<4sIIQ")
+_SIZE_HEADER_SEGMENT = 64
+_OFFSET_COUNT = 12
+_SUFFIX_SEGMENT = ".log"
+# Characters replaced in directory names, and leading dot, so sensors cannot name '..'
+_PATTERN_NAME_INVALID = re.compile(r"^\.|[^A-Za-z0-9_.-]")
+
+
+def get_record_dtype(count_pixels: int):
+    """Get type of the records of frames with a given number of pixels.
+
+    Args:
+        count_pixels (int): number of pixels per frame.
+
+    Returns:
+        np.dtype: record type: timestamp [us] since epoch, sequence number and pixel values.
+    """
+    return np.dtype(
+        [("timestamp", "<i8"), ("seq", "<i8"), ("values", Frame.dtype, (count_pixels,))]
+    )
+
+
+def get_dir_name(sensor_id: str):
+    """Get name of the directory holding the data of a sensor, safe to use as a single path
+    component.
+
+    Args:
+        sensor_id (str): identifier of the sensor.
+
+    Returns:
+        str: name of the directory.
+    """
+    return _PATTERN_NAME_INVALID.sub("_", sensor_id) or "_"
+
+
+def get_segment_time_start(path_file: Path):
+    """Get timestamp of the first record of a segment, from its file name.
+
+    Args:
+        path_file (Path): path to the segment file.
+
+    Returns:
+        int: timestamp [us] since epoch.
+    """
+    return int(path_file.stem.partition("_")[0])
+
+
+class FrameLogSegment:
+    """
+    Class to define a segment of a frame log: a preallocated file of fixed-size records, memory
+    mapped, named after the timestamp of its first record. The number of written records is
+    updated in the header after the records, so readers never see partially written records.
+    """
+
+    def __init__(self, path_file: Path, writable: bool = False):
+        self.path_file = path_file
+        self.time_start = get_segment_time_start(path_file)  # [us] since epoch
+        mode = "r+" if writable else "r"
+
+        with open(path_file, "rb") as file:
+            magic, count_pixels, capacity, _ = _HEADER_SEGMENT.unpack(
+                file.read(_HEADER_SEGMENT.size)
+            )
+        if magic != _MAGIC_SEGMENT:
+            raise ValueError(f"Not a frame log segment: {path_file}")
+
+        self.count_pixels = count_pixels
+        self.capacity = capacity
+        self._count = np.memmap(
+            path_file, dtype="<u8", mode=mode, offset=_OFFSET_COUNT, shape=(1,)
+        )
+        self.records = np.memmap(
+            path_file,
+            dtype=get_record_dtype(count_pixels),
+            mode=mode,
+            offset=_SIZE_HEADER_SEGMENT,
+            shape=(capacity,),
+        )
+        # Sparse index of the timestamps, cached until records are appended
+        self._index: tuple[int, np.ndarray] | None = None
+
+    @classmethod
+    def create(cls, path_file: Path, count_pixels: int, capacity: int):
+        """Create an empty segment file.
+
+        Args:
+            path_file (Path): path to the segment file.
+            count_pixels (int): number of pixels per frame.
+            capacity (int): max. number of records.
+
+        Returns:
+            FrameLogSegment: writable segment.
+        """
+        path_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(path_file, "wb") as file:
+            file.write(
+                _HEADER_SEGMENT.pack(_MAGIC_SEGMENT, count_pixels, capacity, 0).ljust(
+                    _SIZE_HEADER_SEGMENT, b"\x00"
+                )
+            )
+            file.truncate(
+                _SIZE_HEADER_SEGMENT
+                + capacity * get_record_dtype(count_pixels).itemsize
+            )
+
+        return cls(path_file, writable=True)
+
+    @property
+    def count(self):
+        """Number of written records.
+
+        Returns:
+            int: number of records.
+        """
+        return int(self._count[0])
+
+    @property
+    def time_end(self):
+        """Timestamp of the last record of the segment.
+
+        Returns:
+            int | None: timestamp [us] since epoch. None if the segment is empty.
+        """
+        count = self.count
+        return int(self.records["timestamp"][count - 1]) if count else None
+
+    def append(self, frames: list[Frame], timestamps: list[int]):
+        """Append records of frames to the segment.
+
+        Args:
+            frames (list[Frame]): frames, with the number of pixels of the segment.
+            timestamps (list[int]): timestamps of the frames [us] since epoch.
+        """
+        count = self.count
+        records = self.records[count : count + len(frames)]
+        records["timestamp"] = timestamps
+        records["seq"] = [frame.seq for frame in frames]
+        records["values"] = np.stack([frame.values for frame in frames])
+        self._count[0] = count + len(frames)
+
+    def get_index(self, interval: int):
+        """Get sparse index of the timestamps of the segment.
+
+        Args:
+            interval (int): number of records between indexed timestamps.
+
+        Returns:
+            np.ndarray: timestamps of records 0, interval, 2 * interval, ... [us] since epoch.
+        """
+        count = self.count
+        if self._index is not None and self._index[0] == count:
+            return self._index[1]
+
+        index = np.array(self.records["timestamp"][:count:interval])
+        self._index = (count, index)
+        return index
+
+    def search(self, time_start: int, time_end: int, interval: int):
+        """Find the records in a time range, with a binary search over the sparse index and
+        then over the records between two indexed timestamps.
+
+        Args:
+            time_start (int): start of the time range [us] since epoch.
+            time_end (int): end of the time range [us] since epoch.
+            interval (int): number of records between indexed timestamps.
+
+        Returns:
+            slice: records in the time range.
+        """
+        count = self.count
+        index = self.get_index(interval)
+        timestamps = self.records["timestamp"]
+
+        def search_bound(value: int, side: str):
+            block = max(int(np.searchsorted(index, value, side)) - 1, 0)
+            start, end = block * interval, min((block + 1) * interval, count)
+            return start + int(np.searchsorted(timestamps[start:end], value, side))
+
+        return slice(search_bound(time_start, "left"), search_bound(time_end, "right"))
+
+    def flush(self):
+        """Write changes of the segment to disk."""
+        self.records.flush()
+        self._count.flush()
+
+    def close(self):
+        """Unmap the segment file."""
+        del self.records, self._count
+
+
+class FrameLogDbClient:
+    """
+    Class to define an embedded storage of frames, with the interface of PostgresDbClient. Frames
+    of each sensor are appended to their own log: memory-mapped segment files of fixed-size
+    records, rotated when full and expired after the retention time. Timestamps are kept
+    non-decreasing in each log, so time ranges are found with binary searches.
+
+    The storage is set with a URI like 'file:///path/to/dir?segment_records=65536', with
+    optional parameters: segment_records (records per segment), index_interval (records per
+    entry of the sparse index), retention (max. age of segments [s], 0 to keep them forever) and
+    sync (1 to flush segments to disk after each batch, so they survive a host crash).
+    """
+
+    def __init__(self, uri_db_server: str):
+        self.address_db_server = FileUri(uri=uri_db_server)
+        self.path_dir = Path(self.address_db_server.path)  # type: ignore
+
+        params = dict(self.address_db_server.params)
+        self.segment_records = int(params.pop("segment_records", 65536))
+        self.index_interval = int(params.pop("index_interval", 64))
+        self.retention = float(params.pop("retention", 0.0))  # [s]
+        self.sync = params.pop("sync", "0") == "1"
+        if params:
+            raise ValueError(f"Unknown frame log parameters: {', '.join(params)}.")
+        if self.segment_records <= 0 or self.index_interval <= 0:
+            raise ValueError(
+                "Frame log segment size and index interval must be positive."
+            )
+
+        # Set once connected, like connections of PostgresDbClient
+        self.db_conn: Path | None = None
+        # Open segment of each sensor, with the timestamp of its last record
+        self._segments: dict[str, tuple[FrameLogSegment, int]] = {}
+        self.count_reordered = 0
+        self.count_expired = 0
+
+    def connect(self):
+        """Open the storage directory, creating it if needed.
+
+        Returns:
+            Path | None: storage directory.
+            [OSError | None]: error code of the connection process.
+        """
+        try:
+            self.path_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as err:
+            logger.error(f"Cannot open frame log directory: {err}")
+            return self.db_conn, err
+
+        self.db_conn = self.path_dir
+        return self.db_conn, None
+
+    def setup_data_structure(self):
+        """Expire old segments of the logs found in the storage directory."""
+        for path_dir in self.path_dir.iterdir():
+            if path_dir.is_dir():
+                self.expire_segments(path_dir.name)
+
+    def save_data(self, data: Frame, timestamp: datetime):
+        """Save data to the log of its sensor.
+
+        Args:
+            data (Frame): data to be stored.
+            timestamp (datetime): timestamp of the data.
+        """
+        self.save_data_batch([(data, timestamp)])
+
+    def save_data_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Save a batch of data to the logs of their sensors.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): data to be stored and their timestamps.
+        """
+        segments_written = {}
+        for frame, timestamp in batch:
+            timestamp_us = round(timestamp.timestamp() * 1e6)
+            segment, time_last = self._get_segment(frame, timestamp_us)
+
+            # Out-of-order frames are stored with the timestamp of the previous one
+            if timestamp_us < time_last:
+                self.count_reordered += 1
+                timestamp_us = time_last
+
+            segment.append([frame], [timestamp_us])
+            self._segments[frame.sensor_id] = (segment, timestamp_us)
+            segments_written[segment.path_file] = segment
+
+        if self.sync:
+            for segment in segments_written.values():
+                segment.flush()
+
+    def get_frames(self, sensor_id: str, time_start: datetime, time_end: datetime):
+        """Get the frames of a sensor over a time range.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: timestamps [s] since epoch, sequence
+                numbers and values (frames, pixels). Values are views on the log if all frames
+                are in a single segment.
+        """
+        range_us = (
+            round(time_start.timestamp() * 1e6),
+            round(time_end.timestamp() * 1e6),
+        )
+        paths_file = self._get_paths_segment(sensor_id)
+
+        parts = []
+        for index, path_file in enumerate(paths_file):
+            # Segments span from their first record to the first record of the next one
+            time_next = (
+                get_segment_time_start(paths_file[index + 1])
+                if index + 1 < len(paths_file)
+                else None
+            )
+            if get_segment_time_start(path_file) > range_us[1] or (
+                time_next is not None and time_next < range_us[0]
+            ):
+                continue
+
+            segment = self._open_segment(sensor_id, path_file)
+            records = segment.records[
+                segment.search(range_us[0], range_us[1], self.index_interval)
+            ]
+            if len(records):
+                parts.append(records)
+
+        if not parts:
+            return (
+                np.empty(0),
+                np.empty(0, dtype=np.int64),
+                np.empty((0, 0), dtype=Frame.dtype),
+            )
+        if len({part["values"].shape[1] for part in parts}) > 1:
+            raise ValueError(
+                f"Frames of sensor '{sensor_id}' in range have different sizes."
+            )
+
+        records = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return records["timestamp"] / 1e6, np.array(records["seq"]), records["values"]
+
+    def get_aggregates(
+        self,
+        sensor_id: str,
+        aggregate: str,
+        per_pixel: bool,
+        bucket: int,
+        time_start: datetime,
+        time_end: datetime,
+    ):
+        """Get aggregates of the frames of a sensor over the time buckets of a time range.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            aggregate (str): aggregate of values: 'mean', 'min' or 'max'.
+            per_pixel (bool): aggregate each pixel, or all pixels of the sensor at once.
+            bucket (int): duration of time buckets [s], aligned on multiples since epoch.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range, excluded.
+
+        Returns:
+            list[AggregateBucket]: aggregates of buckets holding frames, in time order.
+        """
+        timestamps, _, values = self.get_frames(sensor_id, time_start, time_end)
+        count = np.searchsorted(timestamps, time_end.timestamp(), side="left")
+
+        return aggregate_frames(
+            timestamps[:count], values[:count], aggregate, per_pixel, bucket
+        )
+
+    def expire_segments(self, sensor_id: str):
+        """Remove the segments of the log of a sensor older than the retention time. The last
+        segment is always kept.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+        """
+        if self.retention <= 0:
+            return
+
+        time_limit = round((time.time() - self.retention) * 1e6)
+        paths_file = self._get_paths_segment(sensor_id)
+        # A segment is expired once the next one starts before the time limit
+        for path_file, path_file_next in zip(paths_file, paths_file[1:]):
+            if get_segment_time_start(path_file_next) >= time_limit:
+                break
+            path_file.unlink()
+            self.count_expired += 1
+            logger.info(f"Expired frame log segment {path_file}")
+
+    def disconnect(self):
+        """Flush and close open segments."""
+        for segment, _ in self._segments.values():
+            segment.flush()
+            segment.close()
+        self._segments.clear()
+        self.db_conn = None
+
+    def _get_paths_segment(self, sensor_id: str):
+        return sorted(
+            (self.path_dir / get_dir_name(sensor_id)).glob(f"*{_SUFFIX_SEGMENT}")
+        )
+
+    def _open_segment(self, sensor_id: str, path_file: Path):
+        # Reuse mapping of the open segment, which holds records not flushed yet
+        segment_open = self._segments.get(sensor_id)
+        if segment_open is not None and segment_open[0].path_file == path_file:
+            return segment_open[0]
+        return FrameLogSegment(path_file)
+
+    def _get_segment(self, frame: Frame, timestamp: int):
+        segment_open = self._segments.get(frame.sensor_id)
+        if segment_open is None:
+            segment_open = self._resume_segment(frame.sensor_id)
+
+        if segment_open is not None:
+            segment, time_last = segment_open
+            if segment.count < segment.capacity and segment.count_pixels == len(frame):
+                return segment, time_last
+
+            # Rotate full segment, or segment of frames of another size
+            segment.flush()
+            segment.close()
+            del self._segments[frame.sensor_id]
+        else:
+            time_last = 0
+
+        # Segments starting at the same time (frames of the same timestamp) are ordered by index
+        time_start = max(timestamp, time_last)
+        path_file = (
+            self.path_dir
+            / get_dir_name(frame.sensor_id)
+            / f"{time_start:020d}{_SUFFIX_SEGMENT}"
+        )
+        index = 0
+        while path_file.exists():
+            index += 1
+            path_file = path_file.with_name(
+                f"{time_start:020d}_{index:04d}{_SUFFIX_SEGMENT}"
+            )
+        segment = FrameLogSegment.create(path_file, len(frame), self.segment_records)
+        self._segments[frame.sensor_id] = (segment, time_last)
+        self.expire_segments(frame.sensor_id)
+
+        return segment, time_last
+
+    def _resume_segment(self, sensor_id: str):
+        # Keep appending to the last segment written before a restart
+        paths_file = self._get_paths_segment(sensor_id)
+        if not paths_file:
+            return None
+
+        segment = FrameLogSegment(paths_file[-1], writable=True)
+        segment_open = (segment, segment.time_end or segment.time_start)
+        self._segments[sensor_id] = segment_open
+
+        return segment_open
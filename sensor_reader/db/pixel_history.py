@@ -0,0 +1,378 @@
+import math
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.frame_log import get_dir_name
+
+# Block files: magic, number of pixels and number of frames, followed by the offsets of the
+# timestamps chunk and of each pixel chunk
+_MAGIC_BLOCK_FILE = b"PXB1"
+_HEADER_BLOCK_FILE = struct.Struct("<4sII")
+_SUFFIX_BLOCK_FILE = ".pxb"
+
+
+def encode_chunk(values: np.ndarray):
+    """Compress a series of integers: delta encoding, byte shuffling and zlib.
+
+    Args:
+        values (np.ndarray): 2D array of series, one per row.
+
+    Returns:
+        list[bytes]: compressed series.
+    """
+    deltas = np.diff(values.astype(np.int64), axis=-1, prepend=0)
+    itemsize = 4 if values.dtype.itemsize <= 2 else 8
+    deltas = deltas.astype(f"<i{itemsize}")
+
+    # Group bytes of same significance together, mostly zeros for slowly varying series
+    shuffled = deltas.view(np.uint8).reshape(*deltas.shape, itemsize).swapaxes(-1, -2)
+    return [zlib.compress(np.ascontiguousarray(row).tobytes(), 1) for row in shuffled]
+
+
+def decode_chunk(data: bytes, dtype: np.dtype | str):
+    """Decompress a series of integers compressed with encode_chunk.
+
+    Args:
+        data (bytes): compressed series.
+        dtype (np.dtype | str): type of series values.
+
+    Returns:
+        np.ndarray: series values.
+    """
+    itemsize = 4 if np.dtype(dtype).itemsize <= 2 else 8
+    shuffled = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+    deltas = shuffled.reshape(itemsize, -1).T.copy().view(f"<i{itemsize}").ravel()
+
+    return np.cumsum(deltas, dtype=np.int64).astype(dtype)
+
+
+class PixelBlock:
+    """
+    Class to define a block of frames of a sensor stored pixel-major: the series of each pixel
+    over the block is contiguous, so it can be read without reading full frames.
+    """
+
+    __slots__ = ("sensor_id", "timestamps", "values")
+
+    def __init__(self, sensor_id: str, timestamps: np.ndarray, values: np.ndarray):
+        self.sensor_id = sensor_id
+        self.timestamps = timestamps  # [s] since epoch
+        self.values = values  # (pixels, frames)
+
+    @property
+    def time_start(self):
+        """Wall-clock time of the first frame of the block.
+
+        Returns:
+            datetime: time of the first frame.
+        """
+        return datetime.fromtimestamp(self.timestamps[0]).astimezone()
+
+    @property
+    def time_end(self):
+        """Wall-clock time of the last frame of the block.
+
+        Returns:
+            datetime: time of the last frame.
+        """
+        return datetime.fromtimestamp(self.timestamps[-1]).astimezone()
+
+    @property
+    def count_pixels(self):
+        """Number of pixels of the frames of the block.
+
+        Returns:
+            int: number of pixels.
+        """
+        return self.values.shape[0]
+
+    @property
+    def count_frames(self):
+        """Number of frames of the block.
+
+        Returns:
+            int: number of frames.
+        """
+        return self.values.shape[1]
+
+    def encode_timestamps(self):
+        """Compress timestamps of the block, with microsecond resolution.
+
+        Returns:
+            bytes: compressed timestamps.
+        """
+        timestamps_us = np.round(self.timestamps * 1e6).astype(np.int64)
+        return encode_chunk(timestamps_us[np.newaxis])[0]
+
+    def encode_pixels(self):
+        """Compress the series of each pixel of the block.
+
+        Returns:
+            list[bytes]: compressed series, one per pixel.
+        """
+        return encode_chunk(self.values)
+
+    @staticmethod
+    def decode_timestamps(data: bytes):
+        """Decompress timestamps of a block.
+
+        Args:
+            data (bytes): compressed timestamps.
+
+        Returns:
+            np.ndarray: timestamps [s] since epoch.
+        """
+        return decode_chunk(data, np.int64) / 1e6
+
+    @staticmethod
+    def decode_pixel(data: bytes):
+        """Decompress the series of a pixel of a block.
+
+        Args:
+            data (bytes): compressed series.
+
+        Returns:
+            np.ndarray: pixel values.
+        """
+        return decode_chunk(data, Frame.dtype)
+
+
+class PixelBlockBuilder:
+    """
+    Class to group frames of each sensor into pixel-major blocks. Blocks are aligned on
+    block_duration and hold at most block_size frames. Open blocks can be built before they are
+    closed, so they can be stored as they grow. Frames of a sensor are added once, by sequence
+    number.
+    """
+
+    def __init__(self, block_duration: float = 3600.0, block_size: int = 3600):
+        self.block_duration = block_duration  # [s]
+        self.block_size = block_size
+        # Open block of each sensor: slot index, timestamps and frame values
+        self._blocks: dict[str, tuple[int, list[float], list[np.ndarray]]] = {}
+        # Sensors with frames added to their open block since the last snapshot
+        self._sensors_updated: set[str] = set()
+        # Sequence number of the last frame added for each sensor
+        self._seqs_last: dict[str, int] = {}
+        self.count_skipped = 0
+
+    def add(self, frame: Frame, timestamp: float):
+        """Add a frame to the open block of its sensor, unless a frame of the same or a later
+        sequence number has already been added.
+
+        Args:
+            frame (Frame): frame to be added.
+            timestamp (float): timestamp of the frame [s] since epoch.
+
+        Returns:
+            list[PixelBlock]: blocks completed by the frame, if any.
+        """
+        if frame.seq <= self._seqs_last.get(frame.sensor_id, -1):
+            self.count_skipped += 1
+            return []
+        self._seqs_last[frame.sensor_id] = frame.seq
+
+        blocks = []
+        slot = math.floor(timestamp / self.block_duration)
+        block = self._blocks.get(frame.sensor_id)
+        if block is not None and (
+            block[0] != slot
+            or len(block[1]) >= self.block_size
+            or len(block[2][0]) != len(frame)
+        ):
+            blocks.append(self._build(frame.sensor_id, *block[1:]))
+            block = None
+
+        if block is None:
+            block = (slot, [], [])
+            self._blocks[frame.sensor_id] = block
+        block[1].append(timestamp)
+        block[2].append(frame.values)
+        self._sensors_updated.add(frame.sensor_id)
+
+        return blocks
+
+    def snapshot(self):
+        """Build open blocks with frames added since the last snapshot, keeping them open.
+
+        Returns:
+            list[PixelBlock]: open blocks, holding their frames so far.
+        """
+        blocks = [
+            self._build(sensor_id, *self._blocks[sensor_id][1:])
+            for sensor_id in self._sensors_updated
+        ]
+        self._sensors_updated.clear()
+
+        return blocks
+
+    def flush(self):
+        """Close open blocks of all sensors.
+
+        Returns:
+            list[PixelBlock]: closed blocks.
+        """
+        blocks = [
+            self._build(sensor_id, *block[1:])
+            for sensor_id, block in self._blocks.items()
+        ]
+        self._blocks.clear()
+        self._sensors_updated.clear()
+
+        return blocks
+
+    def _build(self, sensor_id: str, timestamps: list[float], values: list[np.ndarray]):
+        # Transpose frames, so each pixel series is contiguous
+        return PixelBlock(
+            sensor_id,
+            np.array(timestamps),
+            np.ascontiguousarray(np.stack(values, axis=1)),
+        )
+
+
+def merge_pixel_series(
+    parts: list[tuple[np.ndarray, np.ndarray]],
+    count_pixels: int,
+    time_start: datetime,
+    time_end: datetime,
+):
+    """Concatenate pixel series read from several blocks and keep those in a time range.
+
+    Args:
+        parts (list[tuple[np.ndarray, np.ndarray]]): timestamps and values (pixels, frames) read
+            from each block, in chronological order.
+        count_pixels (int): number of requested pixels.
+        time_start (datetime): start of the time range.
+        time_end (datetime): end of the time range.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: timestamps [s] since epoch and values (pixels, frames).
+    """
+    if not parts:
+        return np.empty(0), np.empty((count_pixels, 0), dtype=Frame.dtype)
+
+    timestamps = np.concatenate([part[0] for part in parts])
+    values = np.concatenate([part[1] for part in parts], axis=1)
+    mask = (timestamps >= time_start.timestamp()) & (timestamps <= time_end.timestamp())
+
+    return timestamps[mask], values[:, mask]
+
+
+class FilePixelHistoryStore:
+    """
+    Class to store pixel-major blocks in local files, one file per block named after its time
+    range, so queries only open the blocks in range and read the requested pixels. A stored
+    block is replaced by blocks of the same sensor starting at the same time, as open blocks
+    grow.
+    """
+
+    def __init__(self, path_dir: str):
+        self.path_dir = Path(path_dir)
+
+    def save_pixel_blocks(self, blocks: list[PixelBlock]):
+        """Save blocks of frames.
+
+        Args:
+            blocks (list[PixelBlock]): blocks to be stored.
+        """
+        for block in blocks:
+            chunks = [block.encode_timestamps(), *block.encode_pixels()]
+            offsets = (
+                np.cumsum([0] + [len(chunk) for chunk in chunks], dtype="<u8")
+                + _HEADER_BLOCK_FILE.size
+                + 8 * (len(chunks) + 1)
+            )
+
+            path_dir = self.path_dir / get_dir_name(block.sensor_id)
+            path_dir.mkdir(parents=True, exist_ok=True)
+            block_start = round(block.timestamps[0] * 1e6)
+            path_file = path_dir / (
+                f"{block_start}_{round(block.timestamps[-1] * 1e6)}{_SUFFIX_BLOCK_FILE}"
+            )
+            # Written aside then renamed, so queries never read a partial file
+            path_file_tmp = path_file.with_suffix(".tmp")
+            with open(path_file_tmp, "wb") as file:
+                file.write(
+                    _HEADER_BLOCK_FILE.pack(
+                        _MAGIC_BLOCK_FILE, block.count_pixels, block.count_frames
+                    )
+                )
+                file.write(offsets.tobytes())
+                file.writelines(chunks)
+            path_file_tmp.replace(path_file)
+
+            # Remove previous versions of the block
+            for path_other in path_dir.glob(f"{block_start}_*{_SUFFIX_BLOCK_FILE}"):
+                if path_other != path_file:
+                    path_other.unlink(missing_ok=True)
+
+    def get_pixel_history(
+        self,
+        sensor_id: str,
+        pixels: list[int],
+        time_start: datetime,
+        time_end: datetime,
+    ):
+        """Get the series of some pixels of a sensor over a time range.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            pixels (list[int]): indices of the pixels.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: timestamps [s] since epoch and values (pixels, frames).
+        """
+        range_us = (
+            round(time_start.timestamp() * 1e6),
+            round(time_end.timestamp() * 1e6),
+        )
+        # Latest version of each block in range, by start time
+        paths_file: dict[int, tuple[int, Path]] = {}
+        path_dir = self.path_dir / get_dir_name(sensor_id)
+        for path_file in path_dir.glob(f"*{_SUFFIX_BLOCK_FILE}"):
+            block_start, block_end = map(int, path_file.stem.split("_"))
+            if (
+                block_end >= range_us[0]
+                and block_start <= range_us[1]
+                and block_end >= paths_file.get(block_start, (block_end, None))[0]
+            ):
+                paths_file[block_start] = (block_end, path_file)
+
+        parts = [
+            self._read_block(path_file, pixels)
+            for _, (_, path_file) in sorted(paths_file.items())
+        ]
+        return merge_pixel_series(parts, len(pixels), time_start, time_end)
+
+    def _read_block(self, path_file: Path, pixels: list[int]):
+        with open(path_file, "rb") as file:
+            magic, count_pixels, _ = _HEADER_BLOCK_FILE.unpack(
+                file.read(_HEADER_BLOCK_FILE.size)
+            )
+            if magic != _MAGIC_BLOCK_FILE:
+                raise ValueError(f"Not a pixel block file: {path_file}")
+            offsets = np.frombuffer(file.read(8 * (count_pixels + 2)), dtype="<u8")
+            if any(not 0 <= pixel < count_pixels for pixel in pixels):
+                raise ValueError(f"Pixel indices out of range [0, {count_pixels}).")
+
+            def read_chunk(index: int):
+                file.seek(int(offsets[index]))
+                return file.read(int(offsets[index + 1] - offsets[index]))
+
+            timestamps = PixelBlock.decode_timestamps(read_chunk(0))
+            values = (
+                np.stack(
+                    [PixelBlock.decode_pixel(read_chunk(pixel + 1)) for pixel in pixels]
+                )
+                if pixels
+                else np.empty((0, len(timestamps)), dtype=Frame.dtype)
+            )
+
+        return timestamps, values
@@ -0,0 +1,74 @@
+import math
+import struct
+
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME
+
+# Datagrams of local transports: content type flag, length of sensor identifier and capture
+# times (NaN if not set), followed by the sensor identifier and the payload
+_HEADER_DATAGRAM = struct.Struct("<BHdd")
+_FLAG_RAW = 1
+
+
+class DatagramError(ValueError):
+    """Error raised when a datagram of a local transport cannot be decoded."""
+
+
+def encode_datagram(
+    sensor_id: str,
+    payload: bytes,
+    content_type: str | None = CONTENT_TYPE_FRAME,
+    stamp_capture: tuple[float, float] | None = None,
+):
+    """Encode raw sensor data for a local transport.
+
+    Args:
+        sensor_id (str): identifier of the sensor.
+        payload (bytes): raw sensor data, as published on NATS.
+        content_type (str | None, optional): content type of the payload. Payload is parsed as
+            text if not set. Defaults to CONTENT_TYPE_FRAME.
+        stamp_capture (tuple[float, float] | None, optional): monotonic and wall-clock capture
+            times [s]. Defaults to None.
+
+    Returns:
+        bytes: encoded datagram.
+    """
+    sensor_id_encoded = sensor_id.encode()
+    monotonic, wall = stamp_capture if stamp_capture is not None else (math.nan,) * 2
+    return (
+        _HEADER_DATAGRAM.pack(
+            _FLAG_RAW if content_type == CONTENT_TYPE_FRAME else 0,
+            len(sensor_id_encoded),
+            monotonic,
+            wall,
+        )
+        + sensor_id_encoded
+        + payload
+    )
+
+
+def decode_datagram(data: bytes | memoryview):
+    """Decode raw sensor data received on a local transport.
+
+    Args:
+        data (bytes | memoryview): encoded datagram.
+
+    Raises:
+        DatagramError: datagram is truncated.
+
+    Returns:
+        tuple[str, bytes, str | None, tuple[float, float] | None]: sensor identifier, payload,
+            content type and capture times.
+    """
+    if len(data) < _HEADER_DATAGRAM.size:
+        raise DatagramError("Datagram shorter than its header.")
+
+    flags, length_sensor_id, monotonic, wall = _HEADER_DATAGRAM.unpack_from(data)
+    offset = _HEADER_DATAGRAM.size + length_sensor_id
+    if len(data) < offset:
+        raise DatagramError("Datagram shorter than its sensor identifier.")
+
+    sensor_id = bytes(data[_HEADER_DATAGRAM.size : offset]).decode()
+    content_type = CONTENT_TYPE_FRAME if flags & _FLAG_RAW else None
+    stamp_capture = None if math.isnan(monotonic) else (monotonic, wall)
+
+    return sensor_id, bytes(data[offset:]), content_type, stamp_capture
@@ -0,0 +1,366 @@
+import asyncio
+import os
+import struct
+import tempfile
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from loguru import logger
+
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, get_stamp_now
+from sensor_reader.ingest.datagram import (
+    DatagramError,
+    decode_datagram,
+    encode_datagram,
+)
+from sensor_reader.ingest.unix_socket import IngestHandler
+
+# Ring layout: write counter, read counter and waiting flag of the consumer on their own cache
+# lines, ring parameters, then slots holding the length of a datagram followed by its data
+_OFFSET_HEAD = 0
+_OFFSET_TAIL = 64
+_OFFSET_WAITING = 128
+_OFFSET_PARAMS = 192
+_OFFSET_SLOTS = 256
+_MAGIC_RING = b"SRR1"
+_PARAMS_RING = struct.Struct("<4sII")
+_LENGTH_SLOT = struct.Struct("<I")
+
+
+def get_path_doorbell(name: str):
+    """Get path to the FIFO waking up the consumer of a ring buffer.
+
+    Args:
+        name (str): name of the ring buffer.
+
+    Returns:
+        str: path to the FIFO.
+    """
+    return os.path.join(tempfile.gettempdir(), f"{name}.doorbell")
+
+
+class SharedMemoryRing:
+    """
+    Class to define a single-producer/single-consumer ring buffer of datagrams in a named shared
+    memory segment. The producer only writes the head counter and the consumer only writes the
+    tail counter, so no lock is needed: a slot is published by incrementing the head after
+    writing it, and released by incrementing the tail after reading it. This relies on aligned
+    8-byte stores being atomic and kept in order, as on x86-64.
+
+    An idle consumer sets its waiting flag and sleeps on a FIFO, which the producer writes to
+    only when the flag is set, so no system call is made while the consumer keeps up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slot_count: int = 1024,
+        slot_size: int = 4096,
+        create: bool = False,
+        unregister: bool = True,
+    ):
+        self.name = name
+        self.count_dropped = 0
+        self.count_wakeups = 0
+
+        if create:
+            size = _OFFSET_SLOTS + slot_count * slot_size
+            try:
+                self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+            except FileExistsError:
+                # Remove segment left by a previous run
+                shared_memory.SharedMemory(name).unlink()
+                self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+            self.shm.buf[:_OFFSET_SLOTS] = bytes(_OFFSET_SLOTS)
+            _PARAMS_RING.pack_into(
+                self.shm.buf, _OFFSET_PARAMS, _MAGIC_RING, slot_count, slot_size
+            )
+        else:
+            self.shm = shared_memory.SharedMemory(name)
+            # Segment is owned by its creator, do not remove it when this process exits
+            if unregister:
+                resource_tracker.unregister(self.shm._name, "shared_memory")  # type: ignore
+            magic, slot_count, slot_size = _PARAMS_RING.unpack_from(
+                self.shm.buf, _OFFSET_PARAMS
+            )
+            if magic != _MAGIC_RING:
+                self.shm.close()
+                raise ValueError(f"Shared memory '{name}' does not hold a ring buffer.")
+
+        self.slot_count = slot_count
+        self.slot_size = slot_size  # [B]
+        self._head = np.ndarray((1,), np.uint64, self.shm.buf, _OFFSET_HEAD)
+        self._tail = np.ndarray((1,), np.uint64, self.shm.buf, _OFFSET_TAIL)
+        self._waiting = np.ndarray((1,), np.uint64, self.shm.buf, _OFFSET_WAITING)
+        self._fd_doorbell: int | None = None
+
+    def __len__(self):
+        return int(self._head[0]) - int(self._tail[0])
+
+    @property
+    def waiting(self):
+        """Whether the consumer is waiting for a wakeup.
+
+        Returns:
+            bool: True if the consumer is waiting, False otherwise.
+        """
+        return bool(self._waiting[0])
+
+    @waiting.setter
+    def waiting(self, value: bool):
+        self._waiting[0] = value
+
+    def write(self, data: bytes):
+        """Write a datagram to the ring (producer side), and wake up the consumer if it is
+        waiting. The datagram is dropped if the ring is full.
+
+        Args:
+            data (bytes): datagram.
+
+        Raises:
+            ValueError: datagram does not fit in a slot.
+
+        Returns:
+            bool: True if the datagram was written, False if the ring is full.
+        """
+        if len(data) > self.slot_size - _LENGTH_SLOT.size:
+            raise ValueError(
+                f"Datagram of {len(data)} B does not fit in slots of {self.slot_size} B."
+            )
+
+        head = int(self._head[0])
+        if head - int(self._tail[0]) >= self.slot_count:
+            self.count_dropped += 1
+            return False
+
+        offset = _OFFSET_SLOTS + (head % self.slot_count) * self.slot_size
+        _LENGTH_SLOT.pack_into(self.shm.buf, offset, len(data))
+        offset += _LENGTH_SLOT.size
+        self.shm.buf[offset : offset + len(data)] = data
+        self._head[0] = head + 1
+
+        if self._waiting[0]:
+            self.wake_up()
+
+        return True
+
+    def wake_up(self):
+        """Wake up the consumer through its FIFO. Ignored if no consumer is listening, or if a
+        wakeup is already pending.
+        """
+        try:
+            if self._fd_doorbell is None:
+                self._fd_doorbell = os.open(
+                    get_path_doorbell(self.name), os.O_WRONLY | os.O_NONBLOCK
+                )
+            os.write(self._fd_doorbell, b"\x00")
+            self.count_wakeups += 1
+        except BlockingIOError:
+            pass
+        except OSError:
+            # Consumer restarted or not listening yet, reopen the FIFO on next wakeup
+            if self._fd_doorbell is not None:
+                os.close(self._fd_doorbell)
+                self._fd_doorbell = None
+
+    def read(self):
+        """Read the oldest datagram from the ring (consumer side).
+
+        Returns:
+            bytes | None: datagram. None if the ring is empty.
+        """
+        tail = int(self._tail[0])
+        if tail == int(self._head[0]):
+            return None
+
+        offset = _OFFSET_SLOTS + (tail % self.slot_count) * self.slot_size
+        (length,) = _LENGTH_SLOT.unpack_from(self.shm.buf, offset)
+        offset += _LENGTH_SLOT.size
+        data = bytes(self.shm.buf[offset : offset + length])
+        self._tail[0] = tail + 1
+
+        return data
+
+    def close(self, unlink: bool = False):
+        """Detach from the shared memory segment.
+
+        Args:
+            unlink (bool, optional): also remove the segment, done by its creator.
+                Defaults to False.
+        """
+        if self._fd_doorbell is not None:
+            os.close(self._fd_doorbell)
+            self._fd_doorbell = None
+        del self._head, self._tail, self._waiting
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class SharedMemoryRingIngest:
+    """
+    Class to receive raw sensor data from a co-located driver through a shared memory ring
+    buffer, bypassing the NATS server. The ring is drained without system calls while data
+    keeps coming, yielding to the event loop every yield_interval datagrams, then the transport
+    waits for a wakeup from the driver, or at most poll_interval in case a wakeup was missed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: IngestHandler,
+        slot_count: int = 1024,
+        slot_size: int = 4096,
+        poll_interval: float = 0.01,
+        yield_interval: int = 64,
+    ):
+        self.name = name
+        self.handler = handler
+        self.slot_count = slot_count
+        self.slot_size = slot_size  # [B]
+        self.poll_interval = poll_interval  # [s]
+        self.yield_interval = yield_interval
+        self.count_received = 0
+        self.count_invalid = 0
+        self.ring: SharedMemoryRing | None = None
+        self._fds_doorbell: tuple[int, int] | None = None
+        self._event_doorbell = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        """Create the ring buffer and its FIFO, and start handling datagrams."""
+        self.ring = SharedMemoryRing(
+            self.name, self.slot_count, self.slot_size, create=True
+        )
+
+        path_doorbell = get_path_doorbell(self.name)
+        if os.path.exists(path_doorbell):
+            os.unlink(path_doorbell)
+        os.mkfifo(path_doorbell)
+        # Write end is kept open, so the FIFO does not report end of file between drivers
+        fd_read = os.open(path_doorbell, os.O_RDONLY | os.O_NONBLOCK)
+        fd_write = os.open(path_doorbell, os.O_WRONLY | os.O_NONBLOCK)
+        self._fds_doorbell = (fd_read, fd_write)
+        asyncio.get_running_loop().add_reader(fd_read, self._event_doorbell.set)
+
+        self._task = asyncio.create_task(self.run())
+        logger.info(f"Listening to raw sensor data on shared memory ring '{self.name}'")
+
+    async def run(self):
+        """Run main loop of the transport, handling datagrams written to the ring."""
+        count_read = 0
+        while True:
+            data = self.ring.read()  # type: ignore
+            if data is None:
+                await self.wait()
+                continue
+
+            # Handlers may not suspend, so other tasks would not run while the ring is not empty
+            count_read += 1
+            if count_read % self.yield_interval == 0:
+                await asyncio.sleep(0)
+
+            stamp_receipt = get_stamp_now()
+            try:
+                sensor_id, payload, content_type, stamp_capture = decode_datagram(data)
+            except (DatagramError, UnicodeDecodeError) as err:
+                self.count_invalid += 1
+                logger.error(f"Invalid datagram on shared memory ring: {err}")
+                continue
+
+            self.count_received += 1
+            await self.handler(
+                sensor_id, payload, content_type, stamp_capture, stamp_receipt
+            )
+
+    async def wait(self):
+        """Wait for the driver to write to the empty ring."""
+        ring: SharedMemoryRing = self.ring  # type: ignore
+        ring.waiting = True
+        # Check again, in case data was written before the flag was seen by the driver
+        if not len(ring):
+            try:
+                await asyncio.wait_for(self._event_doorbell.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        ring.waiting = False
+
+        self._event_doorbell.clear()
+        try:
+            os.read(self._fds_doorbell[0], 4096)  # type: ignore
+        except BlockingIOError:
+            pass
+
+    async def stop(self):
+        """Stop handling datagrams, and remove the ring buffer and its FIFO."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._fds_doorbell is not None:
+            asyncio.get_running_loop().remove_reader(self._fds_doorbell[0])
+            for fd in self._fds_doorbell:
+                os.close(fd)
+            self._fds_doorbell = None
+            os.unlink(get_path_doorbell(self.name))
+
+        if self.ring is not None:
+            self.ring.close(unlink=True)
+            self.ring = None
+
+    def get_stats(self):
+        """Get statistics of the transport.
+
+        Returns:
+            dict: numbers of received and invalid datagrams, and of pending
+                datagrams in the ring.
+        """
+        return {
+            "received": self.count_received,
+            "invalid": self.count_invalid,
+            "pending": len(self.ring) if self.ring is not None else 0,
+        }
+
+
+class SharedMemoryRingSender:
+    """
+    Class to send raw sensor data to a SharedMemoryRingIngest, for use by co-located drivers.
+    The resource tracker of the driver is stopped from removing the ring at exit, unless
+    unregister is disabled because the tracker is shared with the creator of the ring, like in
+    processes spawned by it.
+    """
+
+    def __init__(self, name: str, unregister: bool = True):
+        self.ring = SharedMemoryRing(name, unregister=unregister)
+
+    def send(
+        self,
+        sensor_id: str,
+        payload: bytes,
+        content_type: str | None = CONTENT_TYPE_FRAME,
+        stamp_capture: tuple[float, float] | None = None,
+    ):
+        """Send raw sensor data. Data is dropped if the ring is full.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            payload (bytes): raw sensor data, as published on NATS.
+            content_type (str | None, optional): content type of the payload.
+                Defaults to CONTENT_TYPE_FRAME.
+            stamp_capture (tuple[float, float] | None, optional): monotonic and wall-clock
+                capture times [s]. Defaults to None.
+
+        Returns:
+            bool: True if data was sent, False if the ring is full.
+        """
+        return self.ring.write(
+            encode_datagram(sensor_id, payload, content_type, stamp_capture)
+        )
+
+    def close(self):
+        """Detach from the ring buffer."""
+        self.ring.close()
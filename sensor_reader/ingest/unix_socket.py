@@ -0,0 +1,164 @@
+import asyncio
+import os
+import socket
+from collections.abc import Awaitable, Callable
+
+from loguru import logger
+
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, get_stamp_now
+from sensor_reader.ingest.datagram import (
+    DatagramError,
+    decode_datagram,
+    encode_datagram,
+)
+
+# Callback handling raw sensor data: sensor identifier, payload, content type, capture and
+# receipt times
+IngestHandler = Callable[
+    [str, bytes, str | None, tuple[float, float] | None, tuple[float, float]],
+    Awaitable[None],
+]
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, put: Callable[[bytes], None]):
+        self.put = put
+
+    def datagram_received(self, data: bytes, addr):
+        self.put(data)
+
+    def error_received(self, exc: Exception):
+        logger.error(f"Error on local ingest socket: {exc}")
+
+
+class UnixSocketIngest:
+    """
+    Class to receive raw sensor data from co-located drivers on a Unix domain datagram socket,
+    bypassing the NATS server. Datagrams are handled in order of arrival, and the oldest pending
+    datagrams are dropped if the handler falls behind.
+    """
+
+    def __init__(
+        self,
+        path_socket: str,
+        handler: IngestHandler,
+        size_receive_buffer: int = 4 * 2**20,
+        queue_size: int = 1024,
+    ):
+        self.path_socket = path_socket
+        self.handler = handler
+        self.size_receive_buffer = size_receive_buffer  # [B]
+        self.count_received = 0
+        self.count_invalid = 0
+        self.count_dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._transport: asyncio.DatagramTransport | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        """Bind the socket and start handling received datagrams."""
+        # Remove socket left by a previous run
+        if os.path.exists(self.path_socket):
+            os.unlink(self.path_socket)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.size_receive_buffer)
+        sock.bind(self.path_socket)
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _DatagramProtocol(self.put), sock=sock
+        )
+        self._task = asyncio.create_task(self.run())
+        logger.info(f"Listening to raw sensor data on Unix socket {self.path_socket}")
+
+    def put(self, data: bytes):
+        """Enqueue a received datagram, dropping the oldest pending one if the queue is full.
+
+        Args:
+            data (bytes): received datagram.
+        """
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.count_dropped += 1
+            logger.warning(
+                "Queue of local ingest socket is full, dropping oldest data."
+            )
+
+        self._queue.put_nowait((data, get_stamp_now()))
+
+    async def run(self):
+        """Run main loop of the transport, handling received datagrams."""
+        while True:
+            data, stamp_receipt = await self._queue.get()
+            try:
+                sensor_id, payload, content_type, stamp_capture = decode_datagram(data)
+            except (DatagramError, UnicodeDecodeError) as err:
+                self.count_invalid += 1
+                logger.error(f"Invalid datagram on local ingest socket: {err}")
+                continue
+
+            self.count_received += 1
+            await self.handler(
+                sensor_id, payload, content_type, stamp_capture, stamp_receipt
+            )
+
+    async def stop(self):
+        """Stop handling datagrams, close and remove the socket."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if os.path.exists(self.path_socket):
+            os.unlink(self.path_socket)
+
+    def get_stats(self):
+        """Get statistics of the transport.
+
+        Returns:
+            dict: numbers of received, invalid and dropped datagrams.
+        """
+        return {
+            "received": self.count_received,
+            "invalid": self.count_invalid,
+            "dropped": self.count_dropped,
+        }
+
+
+class UnixSocketSender:
+    """Class to send raw sensor data to a UnixSocketIngest, for use by co-located drivers."""
+
+    def __init__(self, path_socket: str):
+        self.path_socket = path_socket
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.connect(path_socket)
+
+    def send(
+        self,
+        sensor_id: str,
+        payload: bytes,
+        content_type: str | None = CONTENT_TYPE_FRAME,
+        stamp_capture: tuple[float, float] | None = None,
+    ):
+        """Send raw sensor data.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            payload (bytes): raw sensor data, as published on NATS.
+            content_type (str | None, optional): content type of the payload.
+                Defaults to CONTENT_TYPE_FRAME.
+            stamp_capture (tuple[float, float] | None, optional): monotonic and wall-clock
+                capture times [s]. Defaults to None.
+        """
+        self.socket.send(
+            encode_datagram(sensor_id, payload, content_type, stamp_capture)
+        )
+
+    def close(self):
+        """Close the socket."""
+        self.socket.close()
@@ -0,0 +1,246 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+
+
+class SamplingProfiler:
+    """
+    Class to profile CPU usage of a thread by periodically sampling its call stack from a
+    background thread. Overhead depends on the sampling interval, not on the profiled code.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_depth: int = 64):
+        self.thread_id = thread_id
+        self.interval = interval  # [s]
+        self.max_depth = max_depth
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.count_samples = 0
+        self._flag_running = False
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Start sampling thread."""
+        self._flag_running = True
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling thread."""
+        self._flag_running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self):
+        while self._flag_running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._get_stack(frame)] += 1
+                self.count_samples += 1
+            time.sleep(self.interval)
+
+    def _get_stack(self, frame: FrameType | None):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(
+                f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+
+        return tuple(reversed(stack))
+
+    def get_top_functions(self, top: int = 10):
+        """Get functions found most often on sampled stacks.
+
+        Args:
+            top (int, optional): number of functions. Defaults to 10.
+
+        Returns:
+            list[dict]: function names with their fraction of samples spent on the function itself
+                (self) and on the function or its callees (cumulative), sorted by the former.
+        """
+        samples_self: Counter[str] = Counter()
+        samples_cumulative: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            samples_self[stack[-1]] += count
+            for function in set(stack):
+                samples_cumulative[function] += count
+
+        count_samples = max(self.count_samples, 1)
+        return [
+            {
+                "function": function,
+                "self": samples_self[function] / count_samples,
+                "cumulative": samples_cumulative[function] / count_samples,
+            }
+            for function, _ in samples_self.most_common(top)
+        ]
+
+    def dump_folded_stacks(self, path_file: Path):
+        """Write sampled stacks in folded format, usable to build flame graphs.
+
+        Args:
+            path_file (Path): path to output file.
+        """
+        with open(path_file, "w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{';'.join(stack)} {count}\n")
+
+
+class ProfilerSession:
+    """
+    Class to profile CPU usage (deterministic or sampling profiling) and memory allocations
+    (tracemalloc) of the calling thread over a bounded time window.
+    """
+
+    modes = ("deterministic", "sampling")
+
+    def __init__(
+        self,
+        path_dir: str,
+        mode: str = "sampling",
+        memory: bool = True,
+        top: int = 10,
+        sampling_interval: float = 0.005,
+    ):
+        if mode not in self.modes:
+            raise ValueError(f"Unknown profiling mode: {mode}.")
+
+        self.path_dir = Path(path_dir)
+        self.mode = mode
+        self.memory = memory
+        self.top = top
+        self.sampling_interval = sampling_interval  # [s]
+
+        self.time_start: float | None = None
+        self.time_end: float | None = None
+        self._profile: cProfile.Profile | None = None
+        self._sampling_profiler: SamplingProfiler | None = None
+        self._flag_tracemalloc_started = False
+
+    def start(self):
+        """Start profiling."""
+        self.time_start = time.monotonic()
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._flag_tracemalloc_started = True
+
+        if self.mode == "deterministic":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampling_profiler = SamplingProfiler(
+                threading.get_ident(), interval=self.sampling_interval
+            )
+            self._sampling_profiler.start()
+
+    def disable(self):
+        """Stop collecting CPU profiling data. To be called from the profiled thread, as the
+        deterministic profiler is only removed from the calling thread; results can then be
+        written from another thread with stop().
+        """
+        if self.time_end is not None:
+            return
+
+        self.time_end = time.monotonic()
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampling_profiler is not None:
+            self._sampling_profiler.stop()
+
+    def stop(self):
+        """Stop profiling, if not disabled yet, and write results to the output directory.
+
+        Returns:
+            dict: summary of profiling results, including paths to written files, top functions
+                by CPU usage and top memory allocation sites.
+        """
+        self.disable()
+        duration = self.time_end - self.time_start  # type: ignore
+        self.path_dir.mkdir(parents=True, exist_ok=True)
+        file_prefix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        summary: dict = {"mode": self.mode, "duration": duration, "files": []}
+
+        if self._profile is not None:
+            path_file = self.path_dir / f"{file_prefix}_cpu.pstats"
+            self._profile.dump_stats(path_file)
+            summary["files"].append(str(path_file))
+            summary["cpu"] = self._get_top_functions_deterministic(self._profile)
+            self._profile = None
+
+        if self._sampling_profiler is not None:
+            path_file = self.path_dir / f"{file_prefix}_cpu.folded"
+            self._sampling_profiler.dump_folded_stacks(path_file)
+            summary["files"].append(str(path_file))
+            summary["samples"] = self._sampling_profiler.count_samples
+            summary["cpu"] = self._sampling_profiler.get_top_functions(self.top)
+            self._sampling_profiler = None
+
+        if self.memory and tracemalloc.is_tracing():
+            path_file = self.path_dir / f"{file_prefix}_memory.txt"
+            summary["memory"] = self._dump_top_allocations(path_file)
+            summary["files"].append(str(path_file))
+            if self._flag_tracemalloc_started:
+                tracemalloc.stop()
+                self._flag_tracemalloc_started = False
+
+        return summary
+
+    def _get_top_functions_deterministic(self, profile: cProfile.Profile):
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        functions = sorted(
+            stats.stats.items(),  # type: ignore
+            key=lambda item: item[1][3],
+            reverse=True,
+        )
+
+        return [
+            {
+                "function": f"{name} ({Path(filename).name}:{lineno})",
+                "calls": calls,
+                "self": time_self,
+                "cumulative": time_cumulative,
+            }
+            for (filename, lineno, name), (_, calls, time_self, time_cumulative, _) in (
+                functions[: self.top]
+            )
+        ]
+
+    def _dump_top_allocations(self, path_file: Path):
+        size_current, size_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+            ]
+        )
+        statistics = snapshot.statistics("lineno")
+
+        with open(path_file, "w") as file:
+            file.write(f"Current traced memory: {size_current} B\n")
+            file.write(f"Peak traced memory: {size_peak} B\n\n")
+            for statistic in statistics[: self.top * 5]:
+                file.write(f"{statistic}\n")
+
+        return {
+            "current": size_current,
+            "peak": size_peak,
+            "top": [
+                {
+                    "site": str(statistic.traceback[0]),
+                    "size": statistic.size,
+                    "count": statistic.count,
+                }
+                for statistic in statistics[: self.top]
+            ],
+        }
@@ -0,0 +1,123 @@
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    Class to aggregate latencies on fixed, logarithmically spaced buckets, so memory and cost of
+    recording a value do not depend on the number of recorded values.
+    """
+
+    def __init__(
+        self,
+        min_value: float = 1e-6,
+        max_value: float = 100.0,
+        buckets_per_decade: int = 20,
+    ):
+        count_decades = np.log10(max_value / min_value)
+        self.bounds = np.logspace(
+            np.log10(min_value),
+            np.log10(max_value),
+            int(count_decades * buckets_per_decade) + 1,
+        )
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        """Record a latency value.
+
+        Args:
+            value (float): latency [s].
+        """
+        self.counts[np.searchsorted(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Merge another histogram with the same buckets into this one.
+
+        Args:
+            other (LatencyHistogram): histogram to be merged.
+        """
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float):
+        """Get approximate percentile of recorded values, as the upper bound of its bucket.
+
+        Args:
+            q (float): percentile to compute, between 0 and 100.
+
+        Returns:
+            float | None: percentile value [s]. None if there are no recorded values.
+        """
+        if self.count == 0:
+            return None
+
+        index = int(np.searchsorted(np.cumsum(self.counts), q / 100 * self.count))
+        if index >= len(self.bounds):
+            return self.max
+        return min(float(self.bounds[index]), self.max)
+
+    def snapshot(self):
+        """Get a summary of recorded values.
+
+        Returns:
+            dict: count, mean, p50, p90, p99 and max. of recorded values [s].
+        """
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else None,
+        }
+
+
+class ThroughputMeter:
+    """Class to measure rate of events over a sliding time window."""
+
+    def __init__(self, window: float = 10.0):
+        self.window = window  # [s]
+        self.count = 0
+        self._events: deque[tuple[float, int]] = deque()
+
+    def record(self, count: int = 1):
+        """Record new events.
+
+        Args:
+            count (int, optional): number of events. Defaults to 1.
+        """
+        self.count += count
+        self._events.append((time.monotonic(), count))
+        self._remove_old_events()
+
+    def rate(self):
+        """Get rate of events over the sliding window.
+
+        Returns:
+            float: events per second.
+        """
+        self._remove_old_events()
+        return sum(count for _, count in self._events) / self.window
+
+    def _remove_old_events(self):
+        time_limit = time.monotonic() - self.window
+        while self._events and self._events[0][0] < time_limit:
+            self._events.popleft()
+
+    def snapshot(self):
+        """Get a summary of recorded events.
+
+        Returns:
+            dict: total number of events and current rate [events/s].
+        """
+        return {"count": self.count, "rate": self.rate()}
@@ -0,0 +1,105 @@
+import time
+
+from loguru import logger
+
+from sensor_reader.data.frame import Frame, FrameStage
+from sensor_reader.monitoring.stats import LatencyHistogram
+
+
+class LatencyTracer:
+    """
+    Class to aggregate per-stage latencies of frames into histograms, logging sampled traces of
+    slow frames. Latencies between stages in this process use monotonic times; latencies from
+    capture, stamped by the sensor in another process or host, use wall-clock times.
+    """
+
+    def __init__(self, slow_threshold: float = 1.0, log_interval: float = 10.0):
+        self.slow_threshold = slow_threshold  # [s]
+        self.log_interval = log_interval  # [s]
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.count_slow_frames = 0
+        self._time_last_log = -float("inf")
+
+    def record(self, frame: Frame, stage: FrameStage):
+        """Record latencies of a frame which has just been stamped at a given stage: from its
+        previous stamped stage and from its first stamped stage (total).
+
+        Args:
+            frame (Frame): stamped frame.
+            stage (FrameStage): stage at which the frame has been stamped.
+        """
+        stages_stamped = [
+            stage_previous
+            for stage_previous in FrameStage
+            if stage_previous < stage and frame.get_stamp(stage_previous) is not None
+        ]
+        if not stages_stamped:
+            return
+
+        name_stage = stage.name.lower()
+        stage_previous = stages_stamped[-1]
+        self._record(
+            f"{stage_previous.name.lower()}_to_{name_stage}",
+            self.get_latency(frame, stage_previous, stage),
+        )
+
+        latency_total = self.get_latency(frame, stages_stamped[0], stage)
+        if len(stages_stamped) > 1:
+            self._record(f"total_to_{name_stage}", latency_total)
+
+        if latency_total > self.slow_threshold:
+            self.count_slow_frames += 1
+            self._log_slow_frame(frame, stage, latency_total)
+
+    def get_latency(self, frame: Frame, stage_start: FrameStage, stage_end: FrameStage):
+        """Get latency of a frame between two stamped stages.
+
+        Args:
+            frame (Frame): stamped frame.
+            stage_start (FrameStage): start stage.
+            stage_end (FrameStage): end stage.
+
+        Returns:
+            float: latency [s].
+        """
+        # Monotonic times of the sensor are not comparable with the ones of this process
+        index_clock = 1 if stage_start == FrameStage.CAPTURE else 0
+        return float(
+            frame.stamps[stage_end, index_clock]
+            - frame.stamps[stage_start, index_clock]
+        )
+
+    def _record(self, name: str, latency: float):
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+        self.histograms[name].record(latency)
+
+    def _log_slow_frame(self, frame: Frame, stage: FrameStage, latency_total: float):
+        time_now = time.monotonic()
+        if time_now - self._time_last_log < self.log_interval:
+            return
+        self._time_last_log = time_now
+
+        stages = [
+            f"{stage_traced.name.lower()}={frame.get_stamp(stage_traced)[1]:.6f}"  # type: ignore
+            for stage_traced in FrameStage
+            if frame.get_stamp(stage_traced) is not None
+        ]
+        logger.warning(
+            f"Slow frame {frame.sensor_id}#{frame.seq}: {latency_total * 1e3:.3f} ms up to "
+            f"{stage.name.lower()} stage. Trace (wall-clock): {', '.join(stages)}"
+        )
+
+    def snapshot(self):
+        """Get a summary of per-stage latencies.
+
+        Returns:
+            dict: summary of each latency histogram, and number of slow frames.
+        """
+        return {
+            "stages": {
+                name: histogram.snapshot()
+                for name, histogram in self.histograms.items()
+            },
+            "slow_frames": self.count_slow_frames,
+        }
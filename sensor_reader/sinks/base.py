@@ -0,0 +1,184 @@
+import asyncio
+import time
+from datetime import datetime
+
+from loguru import logger
+
+from sensor_reader.data.frame import Frame, FrameStage
+from sensor_reader.monitoring.stats import LatencyHistogram
+from sensor_reader.monitoring.tracing import LatencyTracer
+
+
+class Sink:
+    """
+    Base class of output sinks for sensor data. Each sink owns a bounded queue and runs as an
+    independent task, so a slow or failing sink does not delay the others. Data is written in
+    batches, retrying failed batches with exponential backoff.
+    """
+
+    name = "sink"
+    # Stage at which frames are stamped once written, if any
+    stage_written: FrameStage | None = None
+    # Whether the sink takes every parsed frame on the fast path, instead of the latest frame of
+    # each sensor on each report
+    every_frame = False
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        batch_size: int = 1,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+    ):
+        # Queue bound is checked on put, so it can be changed at runtime
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay  # [s]
+
+        self.count_written = 0
+        self.count_dropped = 0
+        self.count_failed = 0
+        self.latency_write = LatencyHistogram()
+        self.tracer: LatencyTracer | None = None
+        self._task: asyncio.Task | None = None
+
+    async def open(self):
+        """Open resources needed by the sink. Nothing to do by default."""
+
+    async def close(self):
+        """Close resources used by the sink. Nothing to do by default."""
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Write a batch of sensor data to the sink.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        raise NotImplementedError
+
+    def put(self, data: Frame, timestamp: datetime):
+        """Enqueue sensor data to be written by the sink, without blocking the caller.
+        If the queue is full, the oldest enqueued data is dropped.
+
+        Args:
+            data (Frame): sensor data.
+            timestamp (datetime): timestamp of the data.
+        """
+        while self.queue.qsize() >= self.queue_size:
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.count_dropped += 1
+            logger.warning(
+                f"Queue of sink '{self.name}' is full, dropping oldest data."
+            )
+
+        self.queue.put_nowait((data, timestamp))
+
+    def start(self):
+        """Start the sink writing task.
+
+        Returns:
+            asyncio.Task: task running the sink.
+        """
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def run(self):
+        """Run main loop of the sink, writing enqueued data in batches."""
+        await self.open()
+
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            await self.write_batch_with_retries(batch)
+
+            for _ in batch:
+                self.queue.task_done()
+
+    async def write_batch_with_retries(self, batch: list[tuple[Frame, datetime]]):
+        """Write a batch of sensor data, retrying on errors. The batch is discarded if all
+        retries fail.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                time_start = time.perf_counter()
+                await self.write_batch(batch)
+                self.latency_write.record(time.perf_counter() - time_start)
+                self.count_written += len(batch)
+                self.stamp_written(batch)
+                return
+            except Exception as err:
+                logger.error(
+                    f"Sink '{self.name}' failed to write data (attempt {attempt + 1}): {err}"
+                )
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.retry_delay * 2**attempt)
+
+        self.count_failed += len(batch)
+        logger.error(
+            f"Sink '{self.name}' discarded {len(batch)} data after failed retries."
+        )
+
+    def stamp_written(self, batch: list[tuple[Frame, datetime]]):
+        """Stamp frames of a written batch and record their latencies, if the sink has a stage.
+        Frames written again keep the stamp of their first write.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        if self.stage_written is None:
+            return
+
+        for frame, _ in batch:
+            if frame.stamp_once(self.stage_written) and self.tracer is not None:
+                self.tracer.record(frame, self.stage_written)
+
+    def get_stats(self):
+        """Get statistics of the sink.
+
+        Returns:
+            dict: queue depth and bound, batch size, written/dropped/failed data counters and
+                write latencies of the sink.
+        """
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue_size,
+            "batch_size": self.batch_size,
+            "written": self.count_written,
+            "dropped": self.count_dropped,
+            "failed": self.count_failed,
+            "latency_write": self.latency_write.snapshot(),
+        }
+
+    async def stop(self, timeout: float = 5.0):
+        """Stop the sink after writing pending data.
+
+        Args:
+            timeout (float, optional): max. time to wait for pending data to be written [s].
+                Defaults to 5.0.
+        """
+        if self._task is None:
+            return
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Sink '{self.name}' stopped with {self.queue.qsize()} pending data."
+            )
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        await self.close()
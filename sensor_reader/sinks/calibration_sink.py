@@ -0,0 +1,77 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+import numpy as np
+from loguru import logger
+
+from sensor_reader.analytics.calibration import CalibrationStore
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.sinks.base import Sink
+
+
+class CalibrationSink(Sink):
+    """
+    Class to convert sensor data to temperatures with the calibration of each sensor, publish
+    them and store them next to raw frames, if a database client is set. Frames of sensors
+    without a calibration are skipped.
+    """
+
+    name = "calibrated"
+
+    def __init__(
+        self,
+        store: CalibrationStore,
+        publish: Callable[[Frame, np.ndarray], Awaitable[None]],
+        db_client: PostgresDbClient | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.store = store
+        self.publish = publish
+        self.db_client = db_client
+        self.count_calibrated = 0
+        self.count_uncalibrated = 0
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Calibrate, publish and store a batch of sensor data.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        calibrated = []
+        for frame, timestamp in batch:
+            calibration = self.store.get(frame.sensor_id)
+            if calibration is None:
+                self.count_uncalibrated += 1
+                continue
+
+            try:
+                temperatures = calibration.apply(frame.values)
+            except ValueError as err:
+                self.count_uncalibrated += 1
+                logger.warning(
+                    f"Frame of sensor '{frame.sensor_id}' not calibrated: {err}"
+                )
+                continue
+
+            await self.publish(frame, temperatures)
+            calibrated.append((frame, temperatures, timestamp))
+        self.count_calibrated += len(calibrated)
+
+        if self.db_client is not None and calibrated:
+            await asyncio.to_thread(self.db_client.save_calibrated_batch, calibrated)
+
+    def get_stats(self):
+        """Get statistics of the sink, including calibrated frames and calibration files.
+
+        Returns:
+            dict: statistics of the sink.
+        """
+        return {
+            **super().get_stats(),
+            "calibrated": self.count_calibrated,
+            "uncalibrated": self.count_uncalibrated,
+            "calibrations": self.store.get_stats(),
+        }
@@ -0,0 +1,54 @@
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import TextIO
+
+from sensor_reader.data.frame import Frame
+from sensor_reader.sinks.base import Sink
+
+
+class FileSink(Sink):
+    """Class to append sensor data to a local file, one JSON record per line."""
+
+    name = "file"
+
+    def __init__(self, path_file: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path_file = Path(path_file)
+        self._file: TextIO | None = None
+
+    async def open(self):
+        """Open output file in append mode."""
+        self.path_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path_file, "a")
+
+    async def close(self):
+        """Close output file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Append a batch of sensor data to the output file.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        lines = "".join(
+            json.dumps(
+                {
+                    "sensor_id": frame.sensor_id,
+                    "seq": frame.seq,
+                    "value": frame.values.tolist(),
+                    "timestamp": timestamp.isoformat(),
+                }
+            )
+            + "\n"
+            for frame, timestamp in batch
+        )
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: str):
+        self._file.write(lines)  # type: ignore
+        self._file.flush()  # type: ignore
@@ -0,0 +1,24 @@
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from sensor_reader.data.frame import Frame
+from sensor_reader.sinks.base import Sink
+
+
+class NatsSink(Sink):
+    """Class to publish sensor data to a NATS topic."""
+
+    name = "nats"
+
+    def __init__(self, publish: Callable[[Frame], Awaitable[None]], **kwargs):
+        super().__init__(**kwargs)
+        self.publish = publish
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Publish a batch of sensor data.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        for data, _ in batch:
+            await self.publish(data)
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from datetime import datetime
+
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.db.pixel_history import (
+    FilePixelHistoryStore,
+    PixelBlock,
+    PixelBlockBuilder,
+)
+from sensor_reader.sinks.base import Sink
+
+
+class PixelHistorySink(Sink):
+    """
+    Class to maintain a pixel-major history of sensor data, alongside the frame store. Every
+    parsed frame is grouped per sensor into blocks, stored once closed (block full, or sink stopped). Open blocks
+    are also stored every flush interval, replacing their previous version, so they can be
+    queried and are not lost if the app stops unexpectedly.
+    """
+
+    name = "pixels"
+    every_frame = True
+
+    def __init__(
+        self,
+        store: PostgresDbClient | FilePixelHistoryStore,
+        block_duration: float = 3600.0,
+        block_size: int = 3600,
+        flush_interval: float = 60.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.store = store
+        self.builder = PixelBlockBuilder(block_duration, block_size)
+        self.flush_interval = flush_interval  # [s]
+        self._blocks_pending: list[PixelBlock] = []
+        self._batch_added: list | None = None
+        self._time_flush = time.monotonic()
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Add a batch of sensor data to open blocks, and store blocks closed by it, along with
+        open blocks at the end of the flush interval.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        # Frames of a retried batch are already in their blocks
+        if batch is not self._batch_added:
+            for frame, timestamp in batch:
+                self._blocks_pending += self.builder.add(frame, timestamp.timestamp())
+            self._batch_added = batch
+
+        if time.monotonic() - self._time_flush >= self.flush_interval:
+            self._blocks_pending += self.builder.snapshot()
+            self._time_flush = time.monotonic()
+
+        await self.save_pending_blocks()
+
+    async def save_pending_blocks(self):
+        """Store pending blocks, kept pending if storing fails."""
+        if self._blocks_pending:
+            await asyncio.to_thread(self.store.save_pixel_blocks, self._blocks_pending)
+            self._blocks_pending = []
+
+    async def close(self):
+        """Close and store open blocks."""
+        self._blocks_pending += self.builder.flush()
+        await self.save_pending_blocks()
@@ -0,0 +1,29 @@
+import asyncio
+from datetime import datetime
+
+from sensor_reader.data.frame import Frame, FrameStage
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.db.frame_log import FrameLogDbClient
+from sensor_reader.sinks.base import Sink
+
+
+class PostgresSink(Sink):
+    """
+    Class to store sensor data on a PostgreSQL database, or on an embedded frame log. Blocking
+    database calls run on a worker thread to keep the event loop free.
+    """
+
+    name = "postgres"
+    stage_written = FrameStage.COMMIT
+
+    def __init__(self, db_client: PostgresDbClient | FrameLogDbClient, **kwargs):
+        super().__init__(**kwargs)
+        self.db_client = db_client
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Store a batch of sensor data in a single transaction.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        await asyncio.to_thread(self.db_client.save_data_batch, batch)
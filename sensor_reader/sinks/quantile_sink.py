@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+from loguru import logger
+
+from sensor_reader.analytics.quantiles import PixelQuantileSketch
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.sinks.base import Sink
+
+
+class QuantileSink(Sink):
+    """
+    Class to maintain quantile sketches of the values of each pixel of each sensor, updated with
+    batches of every parsed frame. Sketches accumulated over each time window are periodically stored,
+    if a database client is set.
+    """
+
+    name = "quantiles"
+    every_frame = True
+
+    def __init__(
+        self,
+        db_client: PostgresDbClient | None = None,
+        relative_accuracy: float = 0.01,
+        snapshot_interval: float = 60.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.db_client = db_client
+        self.relative_accuracy = relative_accuracy
+        self.snapshot_interval = snapshot_interval  # [s]
+
+        # Sketches of each sensor since start, and over current window
+        self.sketches: dict[str, PixelQuantileSketch] = {}
+        self.sketches_window: dict[str, PixelQuantileSketch] = {}
+        self.time_window_start = datetime.now().astimezone()
+        self._time_snapshot = time.monotonic()
+        self._batch_added: list | None = None
+        # Snapshots and queries run on worker threads, and share the database connection
+        self._lock_db = threading.Lock()
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Update sketches with a batch of sensor data, and store them at the end of a window.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        # Frames of a batch retried after a failed snapshot are already in the sketches
+        frames_sensors: dict[str, list[np.ndarray]] = defaultdict(list)
+        if batch is not self._batch_added:
+            for frame, _ in batch:
+                frames_sensors[frame.sensor_id].append(frame.values)
+            self._batch_added = batch
+
+        for sensor_id, frames in frames_sensors.items():
+            sketch = self.sketches.get(sensor_id)
+            if sketch is None:
+                sketch = PixelQuantileSketch(len(frames[0]), self.relative_accuracy)
+                self.sketches[sensor_id] = sketch
+                self.sketches_window[sensor_id] = PixelQuantileSketch(
+                    len(frames[0]), self.relative_accuracy
+                )
+
+            frames = [values for values in frames if len(values) == sketch.count_pixels]
+            if not frames:
+                logger.warning(
+                    f"Frames of sensor '{sensor_id}' do not match its number of pixels."
+                )
+                continue
+            values = np.stack(frames)
+            sketch.update(values)
+            self.sketches_window[sensor_id].update(values)
+
+        if (
+            self.db_client is not None
+            and time.monotonic() - self._time_snapshot >= self.snapshot_interval
+        ):
+            await self.save_snapshot()
+
+    async def save_snapshot(self):
+        """Store sketches of the current window and start a new window."""
+        time_window_end = datetime.now().astimezone()
+        sketches = {
+            sensor_id: sketch.copy()
+            for sensor_id, sketch in self.sketches_window.items()
+            if sketch.count
+        }
+        if sketches:
+            await asyncio.to_thread(
+                self._save_sketches, sketches, self.time_window_start, time_window_end
+            )
+
+        for sketch in self.sketches_window.values():
+            sketch.reset()
+        self.time_window_start = time_window_end
+        self._time_snapshot = time.monotonic()
+
+    async def get_stored_sketch(
+        self, sensor_id: str, time_start: datetime, time_end: datetime
+    ):
+        """Get the quantile sketch of a sensor over a time range, merging stored sketches of
+        the time windows overlapping the range.
+
+        Args:
+            sensor_id (str): identifier of the sensor.
+            time_start (datetime): start of the time range.
+            time_end (datetime): end of the time range.
+
+        Raises:
+            ValueError: sketches are not stored.
+
+        Returns:
+            tuple[PixelQuantileSketch | None, datetime | None, datetime | None]: merged sketch,
+                with start of the first and end of the last merged window. None if no sketches
+                are stored in range.
+        """
+        if self.db_client is None:
+            raise ValueError("Quantile sketches are not stored.")
+
+        return await asyncio.to_thread(
+            self._get_sketch, sensor_id, time_start, time_end
+        )
+
+    async def close(self):
+        """Store sketches of the last window."""
+        if self.db_client is not None:
+            await self.save_snapshot()
+
+    def _save_sketches(self, sketches: dict, time_start: datetime, time_end: datetime):
+        with self._lock_db:
+            self.db_client.save_quantile_sketches(  # type: ignore
+                sketches, time_start, time_end
+            )
+
+    def _get_sketch(self, sensor_id: str, time_start: datetime, time_end: datetime):
+        with self._lock_db:
+            return self.db_client.get_quantile_sketch(  # type: ignore
+                sensor_id, time_start, time_end
+            )
@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from loguru import logger
+
+from sensor_reader.analytics.heatmap import HeatmapRenderer
+from sensor_reader.data.frame import Frame
+from sensor_reader.sinks.base import Sink
+
+
+class RenderSink(Sink):
+    """
+    Class to render sensor data as heatmap images and publish them, at most once per interval
+    for each sensor. Only the latest frame of each sensor in a batch is rendered.
+    """
+
+    name = "render"
+
+    def __init__(
+        self,
+        renderer: HeatmapRenderer,
+        publish: Callable[[Frame, bytes, str], Awaitable[None]],
+        interval: float = 1.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.renderer = renderer
+        self.publish = publish
+        self.interval = interval  # [s]
+        self.count_rendered = 0
+        self._time_published: dict[str, float] = {}
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Render and publish the latest frame of each sensor of a batch, if its interval has
+        elapsed since its last published image.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        frames_latest = {frame.sensor_id: frame for frame, _ in batch}
+
+        for sensor_id, frame in frames_latest.items():
+            time_now = time.monotonic()
+            if time_now - self._time_published.get(sensor_id, -self.interval) < (
+                self.interval
+            ):
+                continue
+
+            try:
+                image = await asyncio.to_thread(self.renderer.render, frame.values)
+            except ValueError as err:
+                logger.warning(f"Frame of sensor '{sensor_id}' not rendered: {err}")
+                continue
+
+            await self.publish(frame, image, self.renderer.content_type)
+            self._time_published[sensor_id] = time_now
+            self.count_rendered += 1
+
+    def get_stats(self):
+        """Get statistics of the sink, including rendered images and image cache.
+
+        Returns:
+            dict: statistics of the sink.
+        """
+        return {
+            **super().get_stats(),
+            "rendered": self.count_rendered,
+            "cache": self.renderer.get_stats(),
+        }
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sensor_reader.data.frame import Frame
+from sensor_reader.data.shared_frames import LatestFrameWriter
+from sensor_reader.sinks.base import Sink
+
+
+class SharedMemorySink(Sink):
+    """
+    Class to publish the latest frame of each sensor in shared memory, for co-located consumers
+    (see LatestFrameReader). Frames are taken as they are parsed, not on each report, and only
+    the latest frame of each sensor in a batch is written.
+    """
+
+    name = "shm"
+    every_frame = True
+
+    def __init__(self, prefix: str = "sensor_reader", **kwargs):
+        super().__init__(**kwargs)
+        self.writer = LatestFrameWriter(prefix)
+
+    async def close(self):
+        """Remove shared memory segments."""
+        self.writer.close()
+
+    async def write_batch(self, batch: list[tuple[Frame, datetime]]):
+        """Publish the latest frame of each sensor of a batch.
+
+        Args:
+            batch (list[tuple[Frame, datetime]]): batch of sensor data and their timestamps.
+        """
+        frames_latest = {frame.sensor_id: frame for frame, _ in batch}
+        for frame in frames_latest.values():
+            self.writer.write(frame)
@@ -0,0 +1,344 @@
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+
+import nats
+from loguru import logger
+from nats.aio.msg import Msg
+from nats.errors import NoRespondersError, TimeoutError
+
+from sensor_reader.app import TOPIC_RAW_DATA_SHARDS, AppSensorReader, get_shard_mapping
+from sensor_reader.data.custom_types import AppCommand, AppCommandActions, NatsUrl
+
+
+def run_worker(
+    app_kwargs: dict,
+    shard_index: int,
+    shard_count: int,
+    on_standby: bool = False,
+    tuning_params: dict | None = None,
+    log_level: str = "INFO",
+):
+    """Entry point of a worker process, running an AppSensorReader on a shard of the sensors.
+
+    Args:
+        app_kwargs (dict): arguments of AppSensorReader.
+        shard_index (int): index of the shard of the sensors handled by the worker.
+        shard_count (int): number of shards (workers).
+        on_standby (bool, optional): start the worker on standby. Defaults to False.
+        tuning_params (dict | None, optional): performance parameters set at runtime, applied on
+            start (see TuningParams). Defaults to None.
+        log_level (str, optional): level of logging messages. Defaults to "INFO".
+    """
+    logger.configure(handlers=[{"sink": sys.stderr, "level": log_level}])
+
+    app_sensor_reader = AppSensorReader(
+        **app_kwargs,
+        shard_index=shard_index,
+        shard_count=shard_count,
+        on_standby=on_standby,
+    )
+    if tuning_params:
+        app_sensor_reader.apply_tuning_params(
+            AppCommand(action=AppCommandActions.SET, params=tuning_params).params  # type: ignore
+        )
+
+    asyncio.run(app_sensor_reader.run())
+
+
+class Supervisor:
+    """
+    Class to run AppSensorReader in several worker processes, each one handling a shard of the
+    sensors by hash of their identifier. Workers only subscribe to the data of their shard, which
+    the NATS server partitions with the subject mapping of get_shard_mapping. Commands received
+    on the app command topic are forwarded to all workers, crashed workers are restarted and
+    their statistics are aggregated.
+    """
+
+    def __init__(
+        self,
+        count_workers: int,
+        app_kwargs: dict,
+        log_level: str = "INFO",
+        command_timeout: float = 5.0,
+        restart_backoff: float = 1.0,
+        restart_backoff_max: float = 30.0,
+        interval_monitor: float = 0.5,
+    ):
+        self.topic_command = "app_command"
+        self.uri_message_server = NatsUrl(url="nats://localhost:4222")
+        self.flag_exit = False
+
+        self.count_workers = count_workers
+        self.app_kwargs = app_kwargs
+        self.log_level = log_level
+        self.command_timeout = command_timeout  # [s]
+        self.interval_monitor = interval_monitor  # [s]
+
+        # Worker processes, started with 'spawn' so that no event loop or connection is inherited
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: list[BaseProcess | None] = [None] * count_workers
+
+        # Restart policy of crashed workers, with exponential backoff on repeated crashes
+        self.restart_backoff = restart_backoff  # [s]
+        self.restart_backoff_max = restart_backoff_max  # [s]
+        self.count_restarts = [0] * count_workers
+        self.count_crashes = [0] * count_workers
+        self.time_started = [0.0] * count_workers
+        self.time_restart = [0.0] * count_workers
+
+        # App state set by commands, given to restarted workers
+        self.flag_on_standby = False
+        self.tuning_params: dict = {}
+
+        self.time_start = time.monotonic()
+
+    def get_worker_kwargs(self, index: int):
+        """Get arguments of AppSensorReader for a worker, with per-worker output paths.
+
+        Args:
+            index (int): index of the worker.
+
+        Returns:
+            dict: arguments of AppSensorReader.
+        """
+        app_kwargs = dict(self.app_kwargs)
+
+        path_file_sink = Path(app_kwargs.get("path_file_sink", "sensor_data.jsonl"))
+        app_kwargs["path_file_sink"] = str(
+            path_file_sink.with_name(
+                f"{path_file_sink.stem}.worker_{index}{path_file_sink.suffix}"
+            )
+        )
+        path_profiling_dir = Path(app_kwargs.get("path_profiling_dir", "profiling"))
+        app_kwargs["path_profiling_dir"] = str(path_profiling_dir / f"worker_{index}")
+
+        return app_kwargs
+
+    def start_worker(self, index: int):
+        """Start a worker process.
+
+        Args:
+            index (int): index of the worker.
+        """
+        worker = self.context.Process(
+            target=run_worker,
+            args=(self.get_worker_kwargs(index), index, self.count_workers),
+            kwargs={
+                "on_standby": self.flag_on_standby,
+                "tuning_params": self.tuning_params,
+                "log_level": self.log_level,
+            },
+            name=f"sensor_reader_worker_{index}",
+            daemon=True,
+        )
+        worker.start()
+        self.workers[index] = worker
+        self.time_started[index] = time.monotonic()
+        logger.info(f"Started worker {index} (pid {worker.pid}).")
+
+    def monitor_workers(self):
+        """Restart crashed workers, waiting longer after each consecutive crash."""
+        if self.flag_exit:
+            return
+
+        time_now = time.monotonic()
+        for index, worker in enumerate(self.workers):
+            if worker is None or worker.is_alive():
+                continue
+
+            # Schedule restart on first check after the crash
+            if self.time_restart[index] <= self.time_started[index]:
+                if time_now - self.time_started[index] > self.restart_backoff_max:
+                    self.count_crashes[index] = 0
+                delay = min(
+                    self.restart_backoff * 2 ** self.count_crashes[index],
+                    self.restart_backoff_max,
+                )
+                self.count_crashes[index] += 1
+                self.time_restart[index] = time_now + delay
+                logger.error(
+                    f"Worker {index} exited with code {worker.exitcode}. "
+                    f"Restarting in {delay:.1f} s."
+                )
+
+            if time_now >= self.time_restart[index]:
+                self.count_restarts[index] += 1
+                self.start_worker(index)
+
+    async def connect_to_message_server(self):
+        """Connect to NATS server and subscribe to the app command topic."""
+        self.nats_client = await nats.connect(self.uri_message_server.url)
+        self.sub_app_command = await self.nats_client.subscribe(
+            self.topic_command, cb=self.handler_command_messages
+        )
+
+    async def handler_command_messages(self, msg: Msg):
+        """Callback to forward command messages to all workers and reply with their results.
+
+        Args:
+            msg (Msg): command message (see AppSensorReader.handler_command_messages). Statistics
+                of all workers are aggregated for AppCommandActions.STATS, results of other
+                commands are returned per worker.
+        """
+        data = msg.data.decode()
+        try:
+            command = AppCommand.from_message(data)
+        except ValueError as err:
+            logger.error(f"Invalid command received: {data}. Error: {err}")
+            await self.reply_command(msg, {"status": "error", "error": str(err)})
+            return
+
+        # Keep state set by commands for restarted workers
+        match command.action:
+            case AppCommandActions.START:
+                self.flag_on_standby = False
+            case AppCommandActions.STOP:
+                self.flag_on_standby = True
+            case AppCommandActions.EXIT:
+                self.flag_exit = True
+            case AppCommandActions.SET:
+                self.tuning_params.update(
+                    command.params.model_dump(exclude_none=True)  # type: ignore
+                )
+
+        responses = await self.forward_command(msg.data)
+
+        response: dict = {
+            "status": (
+                "ok"
+                if all(r is not None and r["status"] == "ok" for r in responses)
+                else "error"
+            )
+        }
+        if command.action == AppCommandActions.STATS:
+            response["stats"] = self.aggregate_stats(responses)
+        else:
+            response["workers"] = responses
+
+        await self.reply_command(msg, response)
+
+    async def forward_command(self, data: bytes):
+        """Send a command to all workers and wait for their results.
+
+        Args:
+            data (bytes): payload of the command message.
+
+        Returns:
+            list[dict | None]: result of the command on each worker. None if the worker did not
+                respond.
+        """
+
+        async def request(index: int):
+            try:
+                response = await self.nats_client.request(
+                    f"{self.topic_command}.worker.{index}",
+                    data,
+                    timeout=self.command_timeout,
+                )
+                return json.loads(response.data.decode())
+            except (TimeoutError, NoRespondersError):
+                logger.warning(f"Worker {index} did not respond to command.")
+                return None
+
+        return list(
+            await asyncio.gather(*(request(i) for i in range(self.count_workers)))
+        )
+
+    async def reply_command(self, msg: Msg, response: dict):
+        """Reply to a command message, if it was sent as a request.
+
+        Args:
+            msg (Msg): command message.
+            response (dict): result of the command.
+        """
+        if msg.reply:
+            await self.nats_client.publish(msg.reply, json.dumps(response).encode())
+
+    def aggregate_stats(self, responses: list[dict | None]):
+        """Aggregate statistics of all workers: throughput and sink counters are summed up, and
+        statistics of each worker are kept along with its restarts.
+
+        Args:
+            responses (list[dict | None]): results of the stats command on each worker.
+
+        Returns:
+            dict: aggregated statistics.
+        """
+        throughput: dict[str, dict[str, float]] = {}
+        sinks: dict[str, dict[str, int]] = {}
+        workers = []
+        for index, response in enumerate(responses):
+            worker = self.workers[index]
+            stats = response["stats"] if response is not None else None
+            workers.append(
+                {
+                    "alive": worker is not None and worker.is_alive(),
+                    "restarts": self.count_restarts[index],
+                    "stats": stats,
+                }
+            )
+            if stats is None:
+                continue
+
+            for name, snapshot in stats["throughput"].items():
+                total = throughput.setdefault(name, {"count": 0, "rate": 0.0})
+                total["count"] += snapshot["count"]
+                total["rate"] += snapshot["rate"]
+            for name, sink_stats in stats["sinks"].items():
+                total = sinks.setdefault(
+                    name, {"queue_depth": 0, "written": 0, "dropped": 0, "failed": 0}
+                )
+                for key in total:
+                    total[key] += sink_stats[key]
+
+        return {
+            "uptime": time.monotonic() - self.time_start,
+            "on_standby": self.flag_on_standby,
+            "count_workers": self.count_workers,
+            "throughput": throughput,
+            "sinks": sinks,
+            "workers": workers,
+        }
+
+    async def run(self):
+        """Run main loop of the supervisor: start workers and restart them if they crash."""
+        await self.connect_to_message_server()
+        logger.info(
+            "Sensor data is partitioned over workers by the NATS server, which must be "
+            f"configured with subject mappings {get_shard_mapping(self.count_workers)}. "
+            f"Other consumers of sensor data receive it on {TOPIC_RAW_DATA_SHARDS}.*.*."
+        )
+
+        for index in range(self.count_workers):
+            self.start_worker(index)
+
+        while not self.flag_exit:
+            self.monitor_workers()
+            await asyncio.sleep(self.interval_monitor)
+
+        await self.close()
+        logger.info("All workers closed, exiting")
+
+    async def close(self, timeout: float = 10.0):
+        """Wait for workers to exit, terminating them after a timeout, and disconnect from NATS.
+
+        Args:
+            timeout (float, optional): max. time to wait for each worker to exit [s].
+                Defaults to 10.0.
+        """
+        self.flag_exit = True
+        for worker in self.workers:
+            if worker is None:
+                continue
+            await asyncio.to_thread(worker.join, timeout)
+            if worker.is_alive():
+                logger.warning(f"Worker {worker.name} did not exit, terminating it.")
+                worker.terminate()
+
+        await self.sub_app_command.unsubscribe()
+        await self.nats_client.drain()
@@ -0,0 +1,221 @@
+import bisect
+import os
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+# File layout:
+#   header: magic, format version, wall-clock start time [s]
+#   records: time offset from start [ns], subject, headers and payload lengths, then their data
+#   index: time offset and file position of every N-th record, for fast seeking
+#   footer: index position, number of index entries and records, magic
+MAGIC_HEADER = b"SRCAP\x00\x00\x01"
+MAGIC_FOOTER = b"SRIDX\x00\x00\x01"
+STRUCT_HEADER = struct.Struct("<8sd")
+STRUCT_RECORD = struct.Struct("<qHHI")
+STRUCT_INDEX_ENTRY = struct.Struct("<qQ")
+STRUCT_FOOTER = struct.Struct("<QQQ8s")
+
+
+class CaptureFileError(ValueError):
+    """Error raised when a capture file is not valid."""
+
+
+class CaptureRecord(NamedTuple):
+    """Class to define a message recorded in a capture file."""
+
+    time_offset: int  # [ns] since capture start
+    subject: str
+    headers: dict[str, str]
+    payload: bytes
+
+
+def encode_headers(headers: dict[str, str] | None):
+    """Encode message headers as 'key: value' lines.
+
+    Args:
+        headers (dict[str, str] | None): message headers.
+
+    Returns:
+        bytes: encoded headers.
+    """
+    if not headers:
+        return b""
+    return "".join(f"{key}: {value}\n" for key, value in headers.items()).encode()
+
+
+def decode_headers(data: bytes):
+    """Decode message headers encoded as 'key: value' lines.
+
+    Args:
+        data (bytes): encoded headers.
+
+    Returns:
+        dict[str, str]: message headers.
+    """
+    headers = {}
+    for line in data.decode().splitlines():
+        key, _, value = line.partition(": ")
+        headers[key] = value
+
+    return headers
+
+
+class CaptureWriter:
+    """Class to write messages with their timing to a compact, indexed binary capture file."""
+
+    def __init__(self, path_file: str, index_interval: int = 256):
+        self.path_file = Path(path_file)
+        self.index_interval = index_interval
+        self.count_records = 0
+        self._index: list[tuple[int, int]] = []
+        self._file: BinaryIO | None = None
+        self._time_start_ns = 0
+
+    def open(self):
+        """Create capture file and write its header."""
+        self.path_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path_file, "wb")
+        self._time_start_ns = time.monotonic_ns()
+        self._file.write(STRUCT_HEADER.pack(MAGIC_HEADER, time.time()))
+
+    def write(
+        self,
+        subject: str,
+        payload: bytes,
+        headers: dict[str, str] | None = None,
+        time_ns: int | None = None,
+    ):
+        """Write a message to the capture file.
+
+        Args:
+            subject (str): subject of the message.
+            payload (bytes): payload of the message.
+            headers (dict[str, str] | None, optional): headers of the message. Defaults to None.
+            time_ns (int | None, optional): monotonic time of the message [ns]. Current time is used
+                if not set. Defaults to None.
+        """
+        if time_ns is None:
+            time_ns = time.monotonic_ns()
+        time_offset = time_ns - self._time_start_ns
+        if self.count_records % self.index_interval == 0:
+            self._index.append((time_offset, self._file.tell()))  # type: ignore
+
+        subject_encoded = subject.encode()
+        headers_encoded = encode_headers(headers)
+        self._file.write(  # type: ignore
+            STRUCT_RECORD.pack(
+                time_offset, len(subject_encoded), len(headers_encoded), len(payload)
+            )
+            + subject_encoded
+            + headers_encoded
+            + payload
+        )
+        self.count_records += 1
+
+    def close(self):
+        """Write index and footer, and close the capture file."""
+        if self._file is None:
+            return
+
+        position_index = self._file.tell()
+        for entry in self._index:
+            self._file.write(STRUCT_INDEX_ENTRY.pack(*entry))
+        self._file.write(
+            STRUCT_FOOTER.pack(
+                position_index, len(self._index), self.count_records, MAGIC_FOOTER
+            )
+        )
+        self._file.close()
+        self._file = None
+
+
+class CaptureReader:
+    """
+    Class to read messages from a capture file. Files without index, like ones from interrupted
+    recordings, are read sequentially up to their last complete record.
+    """
+
+    def __init__(self, path_file: str):
+        self.path_file = Path(path_file)
+        self._file: BinaryIO = open(self.path_file, "rb")
+
+        data_header = self._file.read(STRUCT_HEADER.size)
+        if len(data_header) < STRUCT_HEADER.size or not data_header.startswith(
+            MAGIC_HEADER
+        ):
+            self._file.close()
+            raise CaptureFileError(f"Not a capture file: {self.path_file}")
+        _, self.time_start = STRUCT_HEADER.unpack(data_header)
+
+        self.index: list[tuple[int, int]] = []
+        self.count_records: int | None = None
+        self._position_end = self._read_footer()
+
+    def _read_footer(self):
+        size_file = os.path.getsize(self.path_file)
+        if size_file < STRUCT_HEADER.size + STRUCT_FOOTER.size:
+            return size_file
+
+        self._file.seek(size_file - STRUCT_FOOTER.size)
+        position_index, count_index, count_records, magic = STRUCT_FOOTER.unpack(
+            self._file.read(STRUCT_FOOTER.size)
+        )
+        if magic != MAGIC_FOOTER:
+            return size_file
+
+        self._file.seek(position_index)
+        data_index = self._file.read(count_index * STRUCT_INDEX_ENTRY.size)
+        self.index = list(STRUCT_INDEX_ENTRY.iter_unpack(data_index))
+        self.count_records = count_records
+
+        return position_index
+
+    def __iter__(self):
+        return self.read()
+
+    def read(self, time_offset_start: int = 0) -> Iterator[CaptureRecord]:
+        """Read records, starting from a given time offset.
+
+        Args:
+            time_offset_start (int, optional): time offset since capture start of the first record
+                to be read [ns]. Defaults to 0.
+
+        Yields:
+            CaptureRecord: recorded message.
+        """
+        # Jump to the closest indexed record before requested start
+        position = STRUCT_HEADER.size
+        index_entry = bisect.bisect_right(self.index, (time_offset_start, 2**64)) - 1
+        if index_entry >= 0:
+            position = self.index[index_entry][1]
+
+        self._file.seek(position)
+        while position + STRUCT_RECORD.size <= self._position_end:
+            (
+                time_offset,
+                size_subject,
+                size_headers,
+                size_payload,
+            ) = STRUCT_RECORD.unpack(self._file.read(STRUCT_RECORD.size))
+            size_data = size_subject + size_headers + size_payload
+            position += STRUCT_RECORD.size + size_data
+            if position > self._position_end:
+                break
+
+            data = self._file.read(size_data)
+            if time_offset < time_offset_start:
+                continue
+
+            yield CaptureRecord(
+                time_offset,
+                data[:size_subject].decode(),
+                decode_headers(data[size_subject : size_subject + size_headers]),
+                data[size_subject + size_headers :],
+            )
+
+    def close(self):
+        """Close the capture file."""
+        self._file.close()
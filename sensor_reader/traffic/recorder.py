@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import time
+
+import fire
+import nats
+from loguru import logger
+from nats.aio.msg import Msg
+
+from sensor_reader.data.custom_types import NatsUrl
+from sensor_reader.traffic.capture_file import CaptureWriter
+
+
+class TrafficRecorder:
+    """Class to record raw sensor traffic from a NATS server to a capture file."""
+
+    def __init__(
+        self,
+        path_file: str,
+        uri_message_server: str = "nats://localhost:4222",
+        subjects: list[str] | None = None,
+    ):
+        self.uri_message_server = NatsUrl(url=uri_message_server)
+        self.subjects = subjects or ["sensors", "sensors.*"]
+        self.writer = CaptureWriter(path_file)
+        self.subscriptions: list = []
+
+    async def start(self):
+        """Connect to NATS server and start recording messages of set subjects."""
+        self.nats_client = await nats.connect(self.uri_message_server.url)
+        self.writer.open()
+
+        for subject in self.subjects:
+            self.subscriptions.append(
+                await self.nats_client.subscribe(subject, cb=self.handler_messages)
+            )
+        logger.info(f"Recording subjects {self.subjects} to {self.writer.path_file}")
+
+    async def handler_messages(self, msg: Msg):
+        """Callback to write received messages to the capture file.
+
+        Args:
+            msg (Msg): received message.
+        """
+        self.writer.write(msg.subject, msg.data, msg.headers, time.monotonic_ns())
+
+    async def stop(self):
+        """Stop recording and close the capture file."""
+        for subscription in self.subscriptions:
+            await subscription.unsubscribe()
+        self.subscriptions = []
+        await self.nats_client.drain()
+
+        self.writer.close()
+        logger.info(
+            f"Recorded {self.writer.count_records} messages to {self.writer.path_file}"
+        )
+
+    async def run(self, duration: float | None = None):
+        """Record messages for a given duration, or until cancelled.
+
+        Args:
+            duration (float | None, optional): recording duration [s]. Records until cancelled
+                if not set. Defaults to None.
+        """
+        await self.start()
+        try:
+            await asyncio.sleep(duration if duration is not None else float("inf"))
+        finally:
+            await self.stop()
+
+
+def main(
+    path_file: str,
+    duration: float | None = None,
+    uri_message_server: str = "nats://localhost:4222",
+    subjects: str | tuple[str, ...] = ("sensors", "sensors.*"),
+    log_level: str = "INFO",
+):
+    """Record raw sensor traffic to a capture file.
+
+    Args:
+        path_file (str): path to output capture file.
+        duration (float | None, optional): recording duration [s]. Records until interrupted if
+            not set. Defaults to None.
+        uri_message_server (str, optional): URI of NATS server. Defaults to "nats://localhost:4222".
+        subjects (str | tuple[str, ...], optional): subjects to be recorded, as a comma-separated
+            string or a tuple. Data of sensors partitioned over workers is received on
+            "sensors.shard.*.*" instead of "sensors.*". Defaults to ("sensors", "sensors.*").
+        log_level (str, optional): level of logging messages. Defaults to "INFO".
+    """
+    logger.configure(handlers=[{"sink": sys.stderr, "level": log_level}])
+
+    recorder = TrafficRecorder(
+        path_file,
+        uri_message_server,
+        subjects.split(",") if isinstance(subjects, str) else list(subjects),
+    )
+    try:
+        asyncio.run(recorder.run(duration))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,158 @@
+import asyncio
+import sys
+import time
+
+import fire
+import nats
+from loguru import logger
+
+from sensor_reader.data.custom_types import NatsUrl
+from sensor_reader.data.frame import (
+    FrameStage,
+    format_stamp,
+    get_stamp_header,
+    get_stamp_now,
+)
+from sensor_reader.traffic.capture_file import CaptureReader
+
+
+class TrafficReplayer:
+    """
+    Class to republish traffic from a capture file to a NATS server, keeping its original
+    inter-arrival pattern at a given speed factor, or as fast as possible.
+    """
+
+    def __init__(
+        self,
+        path_file: str,
+        uri_message_server: str = "nats://localhost:4222",
+        speed: float = 1.0,
+        restamp_capture: bool = True,
+    ):
+        self.path_file = path_file
+        self.uri_message_server = NatsUrl(url=uri_message_server)
+        self.speed = speed  # Speed factor, 0 to replay as fast as possible
+        self.restamp_capture = restamp_capture
+        self.header_capture = get_stamp_header(FrameStage.CAPTURE)
+
+    async def connect(self):
+        """Connect to NATS server."""
+        self.nats_client = await nats.connect(self.uri_message_server.url)
+
+    async def replay(self, time_offset_start: float = 0.0, loops: int = 1):
+        """Replay recorded messages.
+
+        Args:
+            time_offset_start (float, optional): time since capture start from which messages are
+                replayed [s]. Defaults to 0.0.
+            loops (int, optional): number of times the capture is replayed. Defaults to 1.
+
+        Returns:
+            dict: number of replayed messages, replay duration [s] and rate [messages/s].
+        """
+        reader = CaptureReader(self.path_file)
+        count_messages = 0
+        time_start = time.monotonic()
+
+        try:
+            for _ in range(loops):
+                count_messages += await self._replay_once(
+                    reader, int(time_offset_start * 1e9)
+                )
+        finally:
+            reader.close()
+        await self.nats_client.flush()
+
+        duration = time.monotonic() - time_start
+        summary = {
+            "messages": count_messages,
+            "duration": duration,
+            "rate": count_messages / duration if duration > 0 else None,
+        }
+        logger.info(f"Replay finished: {summary}")
+
+        return summary
+
+    async def _replay_once(self, reader: CaptureReader, time_offset_start: int):
+        count_messages = 0
+        time_start = time.monotonic()
+        time_offset_first: int | None = None
+
+        for record in reader.read(time_offset_start):
+            if time_offset_first is None:
+                time_offset_first = record.time_offset
+
+            # Wait until the message is due, given its original offset and the speed factor
+            if self.speed > 0:
+                delay = (record.time_offset - time_offset_first) / 1e9 / self.speed
+                time_wait = time_start + delay - time.monotonic()
+                if time_wait > 0:
+                    await asyncio.sleep(time_wait)
+            elif count_messages % 1000 == 0:
+                # Give control back to the event loop so published data is flushed
+                await asyncio.sleep(0)
+
+            headers = record.headers
+            if self.restamp_capture and self.header_capture in headers:
+                headers[self.header_capture] = format_stamp(get_stamp_now())
+
+            await self.nats_client.publish(
+                record.subject, record.payload, headers=headers or None
+            )
+            count_messages += 1
+
+        return count_messages
+
+    async def close(self):
+        """Disconnect from NATS server."""
+        await self.nats_client.drain()
+
+    async def run(self, time_offset_start: float = 0.0, loops: int = 1):
+        """Connect, replay recorded messages and disconnect.
+
+        Args:
+            time_offset_start (float, optional): time since capture start from which messages are
+                replayed [s]. Defaults to 0.0.
+            loops (int, optional): number of times the capture is replayed. Defaults to 1.
+
+        Returns:
+            dict: number of replayed messages, replay duration [s] and rate [messages/s].
+        """
+        await self.connect()
+        try:
+            return await self.replay(time_offset_start, loops)
+        finally:
+            await self.close()
+
+
+def main(
+    path_file: str,
+    speed: float = 1.0,
+    time_offset_start: float = 0.0,
+    loops: int = 1,
+    restamp_capture: bool = True,
+    uri_message_server: str = "nats://localhost:4222",
+    log_level: str = "INFO",
+):
+    """Replay raw sensor traffic from a capture file.
+
+    Args:
+        path_file (str): path to capture file.
+        speed (float, optional): speed factor of the replay, 0 to replay as fast as possible.
+            Defaults to 1.0.
+        time_offset_start (float, optional): time since capture start from which messages are
+            replayed [s]. Defaults to 0.0.
+        loops (int, optional): number of times the capture is replayed. Defaults to 1.
+        restamp_capture (bool, optional): replace recorded capture timestamps with replay time,
+            so latencies of replayed frames are meaningful. Defaults to True.
+        uri_message_server (str, optional): URI of NATS server. Defaults to "nats://localhost:4222".
+        log_level (str, optional): level of logging messages. Defaults to "INFO".
+    """
+    logger.configure(handlers=[{"sink": sys.stderr, "level": log_level}])
+
+    replayer = TrafficReplayer(path_file, uri_message_server, speed, restamp_capture)
+    asyncio.run(replayer.run(time_offset_start, loops))
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,148 @@
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from sensor_reader.data.custom_types import AggregateQuery
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.aggregate_queries import AggregateQueryService
+from sensor_reader.db.db_client import PostgresDbClient, create_db_client
+from sensor_reader.monitoring.stats import LatencyHistogram
+
+QUERIES = {
+    "hourly_mean": AggregateQuery(aggregate="mean", bucket=3600),
+    "daily_max_pixels": AggregateQuery(aggregate="max", per_pixel=True, bucket=86400),
+}
+
+
+def fill_history(db_client, sensor_id: str, count_frames: int, frame_size: int):
+    """Store frames of a sensor evenly spread over the last day.
+
+    Args:
+        db_client (PostgresDbClient | FrameLogDbClient): connected database client.
+        sensor_id (str): identifier of the sensor.
+        count_frames (int): number of stored frames.
+        frame_size (int): number of pixels per frame.
+    """
+    rng = np.random.default_rng(0)
+    time_start = datetime.now().astimezone() - timedelta(days=1)
+    interval = timedelta(days=1) / count_frames
+    for index in range(0, count_frames, 1000):
+        db_client.save_data_batch(
+            [
+                (
+                    Frame(
+                        rng.integers(0, 2**16, size=frame_size, dtype=np.uint16),
+                        sensor_id,
+                        seq,
+                    ),
+                    time_start + interval * seq,
+                )
+                for seq in range(index, min(index + 1000, count_frames))
+            ]
+        )
+
+
+def measure_query(service_factory, sensor_id: str, query: AggregateQuery, count: int):
+    """Measure latencies of repeated queries.
+
+    Args:
+        service_factory (Callable): function creating the query service of each query, or
+            returning the same service for all queries.
+        sensor_id (str): identifier of the sensor.
+        query (AggregateQuery): aggregate query.
+        count (int): number of queries.
+
+    Returns:
+        LatencyHistogram: latencies of the queries.
+    """
+    latencies = LatencyHistogram()
+    for _ in range(count):
+        service = service_factory()
+        time_start = time.perf_counter()
+        service.query(sensor_id, query)
+        latencies.record(time.perf_counter() - time_start)
+
+    return latencies
+
+
+def run_benchmark(db_client, count_frames: int, frame_size: int, count_queries: int):
+    """Compare latencies of aggregate queries without cache, and with cached past buckets.
+
+    Args:
+        db_client (PostgresDbClient | FrameLogDbClient): connected database client.
+        count_frames (int): number of frames stored over the last day.
+        frame_size (int): number of pixels per frame.
+        count_queries (int): number of queries per measurement.
+    """
+    sensor_id = f"benchmark_aggregates_{datetime.now().timestamp()}"
+    fill_history(db_client, sensor_id, count_frames, frame_size)
+    try:
+        compare_queries(db_client, sensor_id, count_queries)
+    finally:
+        # Frames of the benchmark are removed from the database server
+        if isinstance(db_client, PostgresDbClient):
+            db_client.cursor.execute(
+                f"DELETE FROM {db_client.table_name} WHERE sensor_id = %s",
+                (sensor_id,),
+            )
+            db_client.db_conn.commit()  # type: ignore
+
+
+def compare_queries(db_client, sensor_id: str, count_queries: int):
+    # Newest bucket is recomputed on every query
+    service_cached = AggregateQueryService(db_client, refresh_interval=0.0)
+    print(
+        f"{'query':>17} {'uncached p50':>13} {'cached p50':>11} {'hits':>6} {'misses':>7}"
+    )
+    for name, query in QUERIES.items():
+        latencies_uncached = measure_query(
+            lambda: AggregateQueryService(db_client), sensor_id, query, count_queries
+        )
+        latencies_cached = measure_query(
+            lambda: service_cached, sensor_id, query, count_queries
+        )
+        stats = service_cached.get_stats()
+        print(
+            f"{name:>17} {latencies_uncached.percentile(50) * 1e3:>11.2f}ms "
+            f"{latencies_cached.percentile(50) * 1e3:>9.2f}ms "
+            f"{stats['hits']:>6} {stats['misses']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--uri_db_server",
+        type=str,
+        default=None,
+        help="URI to database server. A temporary frame log is used if not set",
+    )
+    parser.add_argument("--count_frames", type=int, default=86400)
+    parser.add_argument("--frame_size", type=int, default=64)
+    parser.add_argument("--count_queries", type=int, default=20)
+    args = parser.parse_args()
+
+    path_dir = None
+    uri_db_server = args.uri_db_server
+    if uri_db_server is None:
+        path_dir = tempfile.mkdtemp(prefix="sensor_reader_aggregates_")
+        uri_db_server = f"file://{path_dir}"
+    try:
+        db_client = create_db_client(uri_db_server)
+        _, error = db_client.connect()
+        if error is not None:
+            raise SystemExit(f"Cannot connect to database: {error}")
+        db_client.setup_data_structure()
+        try:
+            run_benchmark(
+                db_client, args.count_frames, args.frame_size, args.count_queries
+            )
+        finally:
+            db_client.disconnect()
+    finally:
+        if path_dir is not None:
+            shutil.rmtree(path_dir, ignore_errors=True)
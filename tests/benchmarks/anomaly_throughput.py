@@ -0,0 +1,63 @@
+import argparse
+import time
+
+import numpy as np
+
+from sensor_reader.analytics.anomalies import PixelAnomalyDetector
+from sensor_reader.monitoring.stats import LatencyHistogram
+
+
+def run_benchmark(count_sensors: int, frame_size: int, count_rounds: int):
+    """Measure cost per frame of anomaly detection, with frames of many sensors interleaved
+    as they arrive on the fast path.
+
+    Args:
+        count_sensors (int): number of sensors.
+        frame_size (int): number of pixels per frame.
+        count_rounds (int): number of frames per sensor.
+    """
+    rng = np.random.default_rng(0)
+    frames = rng.normal(1000, 10, size=(100, frame_size)).astype(np.uint16)
+    sensor_ids = [f"ir_{index:05d}" for index in range(count_sensors)]
+
+    detector = PixelAnomalyDetector(count_pixels=frame_size)
+    for sensor_id in sensor_ids:
+        detector.update(sensor_id, frames[0])
+
+    latencies = LatencyHistogram()
+    count_reports = 0
+    time_start = time.perf_counter()
+    for index in range(1, count_rounds + 1):
+        values = frames[index % len(frames)]
+        for sensor_id in sensor_ids:
+            time_frame = time.perf_counter()
+            anomalies = detector.update(sensor_id, values)
+            latencies.record(time.perf_counter() - time_frame)
+            count_reports += anomalies is not None
+    duration = time.perf_counter() - time_start
+    count_frames = count_sensors * count_rounds
+
+    print(
+        f"{count_sensors:>8} {frame_size:>6} {count_frames / duration:>10.0f} "
+        f"{latencies.snapshot()['mean'] * 1e6:>8.1f}us "
+        f"{latencies.percentile(99) * 1e6:>8.1f}us "
+        f"{detector.get_stats()['memory'] / 2**20:>8.1f}MB {count_reports:>8}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sensor_counts", type=int, nargs="+", default=[10, 1000, 10000]
+    )
+    parser.add_argument("--frame_sizes", type=int, nargs="+", default=[64, 768])
+    parser.add_argument("--count_rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'sensors':>8} {'frame':>6} {'frames/s':>10} {'mean':>10} {'p99':>10} "
+        f"{'memory':>10} {'reports':>8}"
+    )
+    for frame_size in args.frame_sizes:
+        for count_sensors in args.sensor_counts:
+            run_benchmark(count_sensors, frame_size, args.count_rounds)
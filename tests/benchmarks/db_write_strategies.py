@@ -0,0 +1,295 @@
+import argparse
+import io
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from pytest_postgresql.executors import PostgreSQLExecutor
+
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.copy_binary import build_copy_frames, format_array_text
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.monitoring.stats import LatencyHistogram
+
+_COLUMNS = "(value, sensor_id, seq, timestamp)"
+
+
+def start_postgres(path_pg_ctl: str, path_dir: Path, port: int, fsync: bool):
+    """Start a throwaway PostgreSQL server, with the credentials used by PostgresDbClient.
+
+    Args:
+        path_pg_ctl (str): path to pg_ctl executable.
+        path_dir (Path): directory of the server data, socket and log.
+        port (int): port of the server.
+        fsync (bool): flush commits to disk, as a production server does.
+
+    Returns:
+        PostgreSQLExecutor: running server.
+    """
+    db_client = PostgresDbClient(f"127.0.0.1:{port}")
+    executor = PostgreSQLExecutor(
+        executable=path_pg_ctl,
+        host="127.0.0.1",
+        port=port,
+        datadir=str(path_dir / "data"),
+        unixsocketdir=str(path_dir),
+        logfile=str(path_dir / "postgresql.log"),
+        startparams="-w",
+        dbname=db_client.db_name,
+        user=db_client.username,
+        password=db_client.password,
+        # Executor disables fsync by default
+        postgres_options=f"-c fsync={'on' if fsync else 'off'}",
+    )
+    executor.start()
+
+    return executor
+
+
+def write_row(db_client: PostgresDbClient, batch: list[tuple[Frame, datetime]]):
+    # One INSERT and commit per frame, as done by PostgresDbClient.save_data
+    for frame, timestamp in batch:
+        db_client.save_data(frame, timestamp)
+
+
+def write_executemany(db_client: PostgresDbClient, batch: list[tuple[Frame, datetime]]):
+    db_client.cursor.executemany(
+        f"INSERT INTO {db_client.table_name} {_COLUMNS} "
+        "VALUES (%s::INT[], %s, %s, %s)",
+        [db_client._get_row(frame, timestamp) for frame, timestamp in batch],
+    )
+    db_client.db_conn.commit()  # type: ignore
+
+
+def write_execute_values(
+    db_client: PostgresDbClient, batch: list[tuple[Frame, datetime]]
+):
+    execute_values(
+        db_client.cursor,
+        f"INSERT INTO {db_client.table_name} {_COLUMNS} VALUES %s",
+        [db_client._get_row(frame, timestamp) for frame, timestamp in batch],
+        template="(%s::INT[], %s, %s, %s)",
+        page_size=len(batch),
+    )
+    db_client.db_conn.commit()  # type: ignore
+
+
+def write_copy_text(db_client: PostgresDbClient, batch: list[tuple[Frame, datetime]]):
+    buffer = io.StringIO(
+        "".join(
+            f"{format_array_text(frame.values)}\t{frame.sensor_id}\t{frame.seq}\t"
+            f"{timestamp.isoformat()}\n"
+            for frame, timestamp in batch
+        )
+    )
+    db_client.cursor.copy_expert(
+        f"COPY {db_client.table_name} {_COLUMNS} FROM STDIN", buffer
+    )
+    db_client.db_conn.commit()  # type: ignore
+
+
+def write_copy_binary(db_client: PostgresDbClient, batch: list[tuple[Frame, datetime]]):
+    # Binary COPY, as done by PostgresDbClient.save_data_batch
+    db_client.save_data_batch(batch)
+
+
+def write_unlogged_staging(
+    db_client: PostgresDbClient, batch: list[tuple[Frame, datetime]]
+):
+    # Binary COPY into an unlogged table, then moved to the logged table in the same transaction
+    table_staging = f"{db_client.table_name}_staging"
+    db_client.cursor.copy_expert(
+        f"COPY {table_staging} {_COLUMNS} FROM STDIN WITH (FORMAT binary)",
+        build_copy_frames(batch),
+    )
+    db_client.cursor.execute(
+        f"INSERT INTO {db_client.table_name} {_COLUMNS} "
+        f"SELECT {_COLUMNS[1:-1]} FROM {table_staging}; TRUNCATE {table_staging};"
+    )
+    db_client.db_conn.commit()  # type: ignore
+
+
+STRATEGIES = {
+    "row": write_row,
+    "executemany": write_executemany,
+    "execute_values": write_execute_values,
+    "copy_text": write_copy_text,
+    "copy_binary": write_copy_binary,
+    "unlogged_staging": write_unlogged_staging,
+}
+
+# Encoding of frames sent by each write strategy, all stored as INT[]: array literals adapted by
+# the server, or arrays in binary format
+ENCODINGS = {
+    "row": "text",
+    "executemany": "text",
+    "execute_values": "text",
+    "copy_text": "text",
+    "copy_binary": "binary",
+    "unlogged_staging": "binary",
+}
+
+
+def get_wal_lsn(db_client: PostgresDbClient):
+    db_client.cursor.execute("SELECT pg_current_wal_lsn()")
+    lsn = db_client.cursor.fetchone()[0]  # type: ignore
+    db_client.db_conn.commit()  # type: ignore
+    return lsn
+
+
+def measure_strategy(
+    db_client: PostgresDbClient,
+    strategy: str,
+    batches: list[list[tuple[Frame, datetime]]],
+):
+    """Write batches of frames with a write strategy, on an empty table.
+
+    Args:
+        db_client (PostgresDbClient): connected database client.
+        strategy (str): name of the write strategy.
+        batches (list[list[tuple[Frame, datetime]]]): batches of frames and their timestamps.
+
+    Returns:
+        tuple[float, LatencyHistogram, int]: written rows per second, latencies of each batch
+            write until commit and WAL volume per row [B].
+    """
+    db_client.cursor.execute(f"TRUNCATE {db_client.table_name}; CHECKPOINT;")
+    db_client.db_conn.commit()  # type: ignore
+
+    write = STRATEGIES[strategy]
+    latencies = LatencyHistogram()
+    count_rows = sum(len(batch) for batch in batches)
+
+    lsn_start = get_wal_lsn(db_client)
+    time_start = time.perf_counter()
+    for batch in batches:
+        time_batch = time.perf_counter()
+        write(db_client, batch)
+        latencies.record(time.perf_counter() - time_batch)
+    duration = time.perf_counter() - time_start
+
+    db_client.cursor.execute(
+        "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s)", (lsn_start,)
+    )
+    wal_bytes = int(db_client.cursor.fetchone()[0])  # type: ignore
+    db_client.db_conn.commit()  # type: ignore
+
+    return count_rows / duration, latencies, wal_bytes // count_rows
+
+
+def build_batches(count_rows: int, batch_size: int, frame_size: int):
+    rng = np.random.default_rng(0)
+    timestamp = datetime.now(timezone.utc)
+    frames = [
+        (
+            Frame(
+                rng.integers(0, 2**16, size=frame_size, dtype=np.uint16), "ir_01", seq
+            ),
+            timestamp,
+        )
+        for seq in range(count_rows)
+    ]
+    return [frames[i : i + batch_size] for i in range(0, count_rows, batch_size)]
+
+
+def run_benchmark(
+    db_client: PostgresDbClient,
+    strategies: list[str],
+    batch_sizes: list[int],
+    frame_sizes: list[int],
+    count_rows: int,
+):
+    """Compare write strategies across batch sizes and frame sizes.
+
+    Args:
+        db_client (PostgresDbClient): connected database client.
+        strategies (list[str]): names of the write strategies.
+        batch_sizes (list[int]): numbers of frames written per transaction.
+        frame_sizes (list[int]): numbers of pixels per frame.
+        count_rows (int): number of frames written per measurement.
+    """
+    db_client.setup_data_structure()
+    db_client.cursor.execute(
+        f"CREATE UNLOGGED TABLE IF NOT EXISTS {db_client.table_name}_staging "
+        "(value INT[], timestamp TIMESTAMPTZ, sensor_id TEXT, seq BIGINT)"
+    )
+    db_client.db_conn.commit()  # type: ignore
+
+    print(
+        f"{'frame':>6} {'batch':>6} {'strategy':>17} {'INT[]':>7} {'rows/s':>10} "
+        f"{'commit p50':>11} {'commit p99':>11} {'WAL/row':>9}"
+    )
+    for frame_size in frame_sizes:
+        for batch_size in batch_sizes:
+            batches = build_batches(count_rows, batch_size, frame_size)
+            for strategy in strategies:
+                rate, latencies, wal_per_row = measure_strategy(
+                    db_client, strategy, batches
+                )
+                print(
+                    f"{frame_size:>6} {batch_size:>6} {strategy:>17} "
+                    f"{ENCODINGS[strategy]:>7} {rate:>10.0f} "
+                    f"{latencies.percentile(50) * 1e3:>9.3f}ms "
+                    f"{latencies.percentile(99) * 1e3:>9.3f}ms {wal_per_row:>8}B"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--path_pg_ctl",
+        type=str,
+        default=shutil.which("pg_ctl"),
+        help="Path to pg_ctl executable of the throwaway server",
+    )
+    parser.add_argument("--port", type=int, default=8432)
+    parser.add_argument(
+        "--no_fsync", action="store_true", help="Disable fsync on throwaway server"
+    )
+    parser.add_argument(
+        "--strategies",
+        type=str,
+        nargs="+",
+        default=list(STRATEGIES),
+        choices=STRATEGIES,
+    )
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--frame_sizes", type=int, nargs="+", default=[64, 1024])
+    parser.add_argument("--count_rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    executor = None
+    path_dir = Path(tempfile.mkdtemp(prefix="sensor_reader_db_"))
+    try:
+        if args.path_pg_ctl is None:
+            raise SystemExit("pg_ctl not found, set --path_pg_ctl.")
+        executor = start_postgres(
+            args.path_pg_ctl, path_dir, args.port, not args.no_fsync
+        )
+
+        db_client = PostgresDbClient(f"127.0.0.1:{args.port}")
+        _, error = db_client.connect()
+        if error is not None:
+            raise SystemExit(f"Cannot connect to database: {error}")
+        try:
+            run_benchmark(
+                db_client,
+                args.strategies,
+                args.batch_sizes,
+                args.frame_sizes,
+                args.count_rows,
+            )
+        except psycopg2.Error:
+            db_client.db_conn.rollback()  # type: ignore
+            raise
+        finally:
+            db_client.disconnect()
+    finally:
+        if executor is not None:
+            executor.stop()
+        shutil.rmtree(path_dir, ignore_errors=True)
@@ -0,0 +1,131 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, Frame
+
+
+def parse_list(raw_data: str):
+    """Parse raw data into a list of ints, as done before frames were array-backed."""
+    raw_data = raw_data[1:-1].replace("\n", ",").replace("  ", ",")
+
+    index = 0
+    data_parsed = []
+    while index <= len(raw_data) - 1:
+        if raw_data[index] in [" ", "[", "]", ",", "\n"]:
+            index += 1
+            continue
+
+        index_last_digit = index
+        while (
+            index_last_digit + 1 <= len(raw_data) - 1
+            and raw_data[index_last_digit + 1].isnumeric()
+        ):
+            index_last_digit += 1
+
+        data_parsed.append(int(raw_data[index : index_last_digit + 1]))
+        index = index_last_digit + 1
+
+    return data_parsed
+
+
+def measure_memory(build, count_frames: int):
+    """Measure memory held by a number of frames.
+
+    Args:
+        build (Callable): function building a frame from its index.
+        count_frames (int): number of frames to be held.
+
+    Returns:
+        float: memory per frame [B].
+    """
+    tracemalloc.start()
+    frames = [build(index) for index in range(count_frames)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del frames
+
+    return size / count_frames
+
+
+def measure_throughput(process, payloads: list, duration: float = 2.0):
+    """Measure throughput of a frame processing function.
+
+    Args:
+        process (Callable): function processing one payload.
+        payloads (list): input payloads, processed cyclically.
+        duration (float, optional): duration of the measurement [s]. Defaults to 2.0.
+
+    Returns:
+        float: processed frames per second.
+    """
+    count = 0
+    time_start = time.perf_counter()
+    while time.perf_counter() - time_start < duration:
+        for payload in payloads:
+            process(payload)
+        count += len(payloads)
+
+    return count / (time.perf_counter() - time_start)
+
+
+def run_benchmark(frame_size: int, count_frames: int, duration: float):
+    """Compare list-based and array-backed frames on memory and parse/publish throughput.
+
+    Args:
+        frame_size (int): number of pixels per frame.
+        count_frames (int): number of frames held for memory measurement.
+        duration (float): duration of each throughput measurement [s].
+    """
+    rng = np.random.default_rng(0)
+    arrays = [
+        rng.integers(0, 2**16, size=frame_size, dtype=np.uint16) for _ in range(100)
+    ]
+    payloads_text = [np.array2string(array, threshold=frame_size) for array in arrays]
+    payloads_binary = [array.tobytes() for array in arrays]
+
+    memory_list = measure_memory(
+        lambda index: parse_list(payloads_text[index % 100]), count_frames
+    )
+    memory_frame = measure_memory(
+        lambda index: Frame.from_payload(
+            payloads_text[index % 100].encode(), "ir_01", index
+        ),
+        count_frames,
+    )
+
+    throughput_list = measure_throughput(
+        lambda payload: str(parse_list(payload)).encode(), payloads_text, duration
+    )
+    throughput_text = measure_throughput(
+        lambda payload: Frame.from_payload(payload.encode(), "ir_01", 0).to_bytes(),
+        payloads_text,
+        duration,
+    )
+    throughput_binary = measure_throughput(
+        lambda payload: Frame.from_payload(
+            payload, "ir_01", 0, CONTENT_TYPE_FRAME
+        ).to_bytes(),
+        payloads_binary,
+        duration,
+    )
+
+    print(f"Frame size: {frame_size} pixels")
+    print(f"  Memory per frame, list[int]:      {memory_list:10.0f} B")
+    print(f"  Memory per frame, uint16 buffer:  {memory_frame:10.0f} B")
+    print(f"  Parse + encode, list[int]:        {throughput_list:10.0f} frames/s")
+    print(f"  Parse + encode, Frame from text:  {throughput_text:10.0f} frames/s")
+    print(f"  Parse + encode, Frame from bytes: {throughput_binary:10.0f} frames/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frame_sizes", type=int, nargs="+", default=[64, 1024])
+    parser.add_argument("--count_frames", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for frame_size in args.frame_sizes:
+        run_benchmark(frame_size, args.count_frames, args.duration)
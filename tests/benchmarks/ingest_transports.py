@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import nats
+import numpy as np
+from loguru import logger
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import (
+    CONTENT_TYPE_FRAME,
+    Frame,
+    FrameStage,
+    get_stamp_now,
+)
+from sensor_reader.ingest.shm_ring import SharedMemoryRingIngest, SharedMemoryRingSender
+from sensor_reader.ingest.unix_socket import UnixSocketIngest, UnixSocketSender
+from sensor_reader.monitoring.stats import LatencyHistogram
+
+TRANSPORTS = ["nats", "unix", "shm"]
+
+
+def get_cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_producer(
+    transport: str,
+    address: str,
+    count_frames: int,
+    frame_size: int,
+    freq: float,
+    ready,
+    start,
+    results,
+):
+    """Send frames stamped with their capture time on a transport, as a co-located driver.
+
+    Args:
+        transport (str): name of the transport.
+        address (str): NATS URL, path to the Unix socket or name of the ring buffer.
+        count_frames (int): number of frames to be sent.
+        frame_size (int): number of pixels per frame.
+        freq (float): frequency at which frames are sent [Hz].
+        ready (Event): set once the producer is connected.
+        start (Event): waited for before sending frames.
+        results (Queue): receives the CPU time of the producer over sent frames [s].
+    """
+    logger.remove()
+    rng = np.random.default_rng(0)
+    frames = [
+        Frame(rng.integers(0, 2**16, size=frame_size, dtype=np.uint16), "ir_01", seq)
+        for seq in range(count_frames)
+    ]
+
+    async def send_nats():
+        nats_client = await nats.connect(address)
+        ready.set()
+        await asyncio.to_thread(start.wait)
+        cpu_start = get_cpu_time()
+        for frame in frames:
+            frame.stamp(FrameStage.CAPTURE)
+            await nats_client.publish(
+                "sensors.ir_01", frame.to_bytes(), headers=frame.get_headers()
+            )
+            await nats_client.flush()
+            await asyncio.sleep(1 / freq)
+        cpu_time = get_cpu_time() - cpu_start
+        await nats_client.close()
+        return cpu_time
+
+    def send_local():
+        sender = (
+            UnixSocketSender(address)
+            if transport == "unix"
+            # Resource tracker is inherited from the consumer, which created the ring
+            else SharedMemoryRingSender(address, unregister=False)
+        )
+        ready.set()
+        start.wait()
+        cpu_start = get_cpu_time()
+        for frame in frames:
+            sender.send(
+                frame.sensor_id, frame.to_bytes(), CONTENT_TYPE_FRAME, get_stamp_now()
+            )
+            time.sleep(1 / freq)
+        cpu_time = get_cpu_time() - cpu_start
+        sender.close()
+        return cpu_time
+
+    results.put(asyncio.run(send_nats()) if transport == "nats" else send_local())
+
+
+async def measure_transport(
+    transport: str, count_frames: int, frame_size: int, freq: float
+):
+    """Receive frames from a producer process on a transport, and parse them in the app.
+
+    Args:
+        transport (str): name of the transport.
+        count_frames (int): number of frames to be sent.
+        frame_size (int): number of pixels per frame.
+        freq (float): frequency at which frames are sent [Hz].
+
+    Returns:
+        tuple[LatencyHistogram, float, float]: latencies from capture to parsing, and CPU time
+            per frame of the consumer and of the producer [s].
+    """
+    app_sensor_reader = AppSensorReader(0.0, "127.0.0.1:5432", sinks=["file"])
+    latencies = LatencyHistogram()
+    ingest_raw_data = app_sensor_reader.ingest_raw_data
+
+    async def ingest_and_record(*args):
+        await ingest_raw_data(*args)
+        frame = app_sensor_reader.last_sensor_frames[args[0]]
+        latencies.record(
+            frame.get_stamp(FrameStage.PARSE)[0]  # type: ignore
+            - frame.get_stamp(FrameStage.CAPTURE)[0]  # type: ignore
+        )
+
+    # Handler of NATS messages looks ingest_raw_data up on the instance
+    app_sensor_reader.ingest_raw_data = ingest_and_record  # type: ignore
+
+    nats_client = None
+    ingest = None
+    path_dir = tempfile.mkdtemp(prefix="sensor_reader_ingest_")
+    match transport:
+        case "nats":
+            address = app_sensor_reader.uri_message_server.url
+            nats_client = await nats.connect(address)
+            app_sensor_reader.nats_client = nats_client
+            await nats_client.subscribe(
+                "sensors.*", cb=app_sensor_reader.handler_raw_data_messages
+            )
+        case "unix":
+            address = str(Path(path_dir) / "ingest.sock")
+            ingest = UnixSocketIngest(address, ingest_and_record)
+        case "shm":
+            address = f"sensor_reader_{uuid.uuid4().hex[:8]}"
+            ingest = SharedMemoryRingIngest(address, ingest_and_record)
+    if ingest is not None:
+        await ingest.start()
+
+    context = multiprocessing.get_context("spawn")
+    ready, start, results = context.Event(), context.Event(), context.Queue()
+    producer = context.Process(
+        target=run_producer,
+        args=(
+            transport,
+            address,
+            count_frames,
+            frame_size,
+            freq,
+            ready,
+            start,
+            results,
+        ),
+    )
+    producer.start()
+    await asyncio.to_thread(ready.wait)
+
+    cpu_start = get_cpu_time()
+    start.set()
+    time_end = time.monotonic() + count_frames / freq + 10
+    while latencies.count < count_frames and time.monotonic() < time_end:
+        await asyncio.sleep(0.01)
+    cpu_consumer = get_cpu_time() - cpu_start
+    cpu_producer = await asyncio.to_thread(results.get)
+    producer.join()
+
+    if ingest is not None:
+        await ingest.stop()
+    if nats_client is not None:
+        await nats_client.close()
+    if latencies.count < count_frames:
+        logger.warning(f"{transport}: {count_frames - latencies.count} frames lost")
+
+    return latencies, cpu_consumer / count_frames, cpu_producer / count_frames
+
+
+def run_benchmark(
+    transports: list[str], count_frames: int, frame_size: int, freq: float
+):
+    """Compare latency and CPU cost of raw data transports from a co-located driver.
+
+    Args:
+        transports (list[str]): names of the transports.
+        count_frames (int): number of frames sent per transport.
+        frame_size (int): number of pixels per frame.
+        freq (float): frequency at which frames are sent [Hz].
+    """
+    print(
+        f"{count_frames} frames of {frame_size} pixels at {freq:.0f} Hz, "
+        f"{multiprocessing.cpu_count()} CPUs available (NATS server CPU not included)"
+    )
+    print(
+        f"{'transport':>9} {'p50':>9} {'p99':>9} {'max':>9} "
+        f"{'consumer CPU':>13} {'producer CPU':>13}"
+    )
+    for transport in transports:
+        latencies, cpu_consumer, cpu_producer = asyncio.run(
+            measure_transport(transport, count_frames, frame_size, freq)
+        )
+        snapshot = latencies.snapshot()
+        print(
+            f"{transport:>9} {latencies.percentile(50) * 1e6:>7.0f}us "
+            f"{latencies.percentile(99) * 1e6:>7.0f}us {snapshot['max'] * 1e6:>7.0f}us "
+            f"{cpu_consumer * 1e6:>9.1f}us/f {cpu_producer * 1e6:>9.1f}us/f"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--transports", type=str, nargs="+", default=TRANSPORTS, choices=TRANSPORTS
+    )
+    parser.add_argument("--count_frames", type=int, default=2000)
+    parser.add_argument("--frame_size", type=int, default=64)
+    parser.add_argument("--freq", type=float, default=500.0)
+    args = parser.parse_args()
+
+    logger.remove()
+    run_benchmark(args.transports, args.count_frames, args.frame_size, args.freq)
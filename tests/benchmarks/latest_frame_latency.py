@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+import uuid
+
+import nats
+import numpy as np
+
+from sensor_reader.data.frame import Frame, FrameStage
+from sensor_reader.data.shared_frames import LatestFrameReader, LatestFrameWriter
+from sensor_reader.monitoring.stats import LatencyHistogram
+from tests.benchmarks.ingest_transports import get_cpu_time
+
+TRANSPORTS = ["nats", "shm"]
+URL_NATS = "nats://localhost:4222"
+TOPIC_PUBLISHING = "publishing"
+
+
+def record_frame(frame: Frame, latencies: LatencyHistogram):
+    # Frame is only parsed, as a consumer would, before its latency is recorded
+    latencies.record(time.monotonic() - frame.get_stamp(FrameStage.PUBLISH)[0])  # type: ignore
+
+
+def run_reader(
+    transport: str,
+    prefix: str,
+    count_frames: int,
+    duration: float,
+    poll_interval: float,
+    ready,
+    results,
+):
+    """Read frames published by the app on a transport, as a co-located consumer.
+
+    Args:
+        transport (str): name of the transport.
+        prefix (str): prefix of shared memory segments.
+        count_frames (int): number of published frames.
+        duration (float): max. duration of the reading [s].
+        poll_interval (float): interval between reads of shared memory [s].
+        ready (Event): set once the reader is ready to read frames.
+        results (Queue): receives latencies from publication to reading, the number of read
+            frames and the CPU time of the reader [s].
+    """
+    latencies = LatencyHistogram()
+
+    async def read_nats():
+        nats_client = await nats.connect(URL_NATS)
+        done = asyncio.Event()
+
+        async def handler(msg):
+            frame = Frame.from_message(msg.data, msg.headers)
+            record_frame(frame, latencies)
+            if frame.seq == count_frames - 1:
+                done.set()
+
+        await nats_client.subscribe(TOPIC_PUBLISHING, cb=handler)
+        await nats_client.flush()
+        ready.set()
+        cpu_start = get_cpu_time()
+        try:
+            await asyncio.wait_for(done.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+        cpu_time = get_cpu_time() - cpu_start
+        await nats_client.close()
+        return cpu_time
+
+    def read_shm():
+        # Resource tracker is inherited from the writer
+        reader = LatestFrameReader("ir_01", prefix, unregister=False)
+        ready.set()
+        cpu_start = get_cpu_time()
+        time_end = time.monotonic() + duration
+        while time.monotonic() < time_end:
+            frame = reader.read_new()
+            if frame is None:
+                time.sleep(poll_interval)
+                continue
+            record_frame(frame, latencies)
+            if frame.seq == count_frames - 1:
+                break
+        cpu_time = get_cpu_time() - cpu_start
+        reader.close()
+        return cpu_time
+
+    cpu_time = asyncio.run(read_nats()) if transport == "nats" else read_shm()
+    results.put((latencies, cpu_time))
+
+
+async def publish_frames(
+    transport: str, prefix: str, count_frames: int, frame_size: int, freq: float
+):
+    """Publish frames of a sensor at a given frequency, as AppSensorReader sinks do.
+
+    Args:
+        transport (str): name of the transport.
+        prefix (str): prefix of shared memory segments.
+        count_frames (int): number of frames to be published.
+        frame_size (int): number of pixels per frame.
+        freq (float): frequency at which frames are published [Hz].
+
+    Returns:
+        float: CPU time of the publisher [s].
+    """
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 2**16, size=frame_size, dtype=np.uint16)
+    nats_client = await nats.connect(URL_NATS) if transport == "nats" else None
+    writer = LatestFrameWriter(prefix)
+
+    cpu_start = get_cpu_time()
+    for seq in range(count_frames):
+        frame = Frame(values, "ir_01", seq)
+        if nats_client is not None:
+            frame.stamp(FrameStage.PUBLISH)
+            await nats_client.publish(
+                TOPIC_PUBLISHING, frame.to_bytes(), headers=frame.get_headers()
+            )
+            await nats_client.flush()
+        else:
+            writer.write(frame)
+        await asyncio.sleep(1 / freq)
+    cpu_time = get_cpu_time() - cpu_start
+
+    if nats_client is not None:
+        await nats_client.close()
+    # Let the reader see the last frame before its segment is removed
+    await asyncio.sleep(0.5)
+    writer.close()
+
+    return cpu_time
+
+
+def run_benchmark(
+    transports: list[str],
+    count_frames: int,
+    frame_size: int,
+    freq: float,
+    poll_interval: float,
+):
+    """Compare latency and CPU cost of latest-frame publication to a co-located consumer.
+
+    Args:
+        transports (list[str]): names of the transports.
+        count_frames (int): number of frames published per transport.
+        frame_size (int): number of pixels per frame.
+        freq (float): frequency at which frames are published [Hz].
+        poll_interval (float): interval between reads of shared memory [s].
+    """
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{count_frames} frames of {frame_size} pixels at {freq:.0f} Hz, shared memory read "
+        f"every {poll_interval * 1e6:.0f}us, {multiprocessing.cpu_count()} CPUs available "
+        "(NATS server CPU not included)"
+    )
+    print(
+        f"{'transport':>9} {'read':>6} {'p50':>9} {'p99':>9} {'max':>9} "
+        f"{'reader CPU':>11} {'writer CPU':>11}"
+    )
+    for transport in transports:
+        prefix = f"sensor_reader_bench_{uuid.uuid4().hex[:8]}"
+        ready, results = context.Event(), context.Queue()
+        duration = count_frames / freq + 10
+        reader = context.Process(
+            target=run_reader,
+            args=(
+                transport,
+                prefix,
+                count_frames,
+                duration,
+                poll_interval,
+                ready,
+                results,
+            ),
+        )
+        reader.start()
+        ready.wait()
+
+        cpu_writer = asyncio.run(
+            publish_frames(transport, prefix, count_frames, frame_size, freq)
+        )
+        latencies, cpu_reader = results.get(timeout=duration)
+        reader.join()
+
+        print(
+            f"{transport:>9} {latencies.count:>6} "
+            f"{latencies.percentile(50) * 1e6:>7.0f}us "
+            f"{latencies.percentile(99) * 1e6:>7.0f}us {latencies.max * 1e6:>7.0f}us "
+            f"{cpu_reader / count_frames * 1e6:>7.1f}us/f "
+            f"{cpu_writer / count_frames * 1e6:>7.1f}us/f"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--transports", type=str, nargs="+", default=TRANSPORTS, choices=TRANSPORTS
+    )
+    parser.add_argument("--count_frames", type=int, default=2000)
+    parser.add_argument("--frame_size", type=int, default=64)
+    parser.add_argument("--freq", type=float, default=500.0)
+    parser.add_argument("--poll_interval", type=float, default=0.0001)
+    args = parser.parse_args()
+
+    run_benchmark(
+        args.transports,
+        args.count_frames,
+        args.frame_size,
+        args.freq,
+        args.poll_interval,
+    )
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+import numpy as np
+from loguru import logger
+from nats.aio.msg import Msg
+
+from sensor_reader.app import TOPIC_RAW_DATA_SHARDS, AppSensorReader, get_shard
+
+
+class StubNatsClient:
+    """NATS client discarding published messages, to benchmark the app alone."""
+
+    async def publish(self, subject: str, payload: bytes = b"", headers=None):
+        pass
+
+
+def build_messages(
+    shard_index: int,
+    shard_count: int,
+    count_sensors: int,
+    count_frames: int,
+    frame_size: int,
+):
+    """Build raw data messages of the sensors of a shard, as published by the mock sensor and
+    delivered by the NATS server on the partitioned subject of the shard.
+
+    Args:
+        shard_index (int): index of the shard.
+        shard_count (int): number of shards.
+        count_sensors (int): number of sensors, each one publishing on its own subject.
+        count_frames (int): number of frames per sensor.
+        frame_size (int): number of pixels per frame.
+
+    Returns:
+        list[Msg]: raw data messages.
+    """
+    rng = np.random.default_rng(0)
+    payloads = [
+        np.array2string(
+            rng.integers(0, 100, size=frame_size, dtype=np.uint16),
+            threshold=frame_size,
+        ).encode()
+        for _ in range(100)
+    ]
+    return [
+        Msg(
+            _client=None,  # type: ignore
+            subject=f"{TOPIC_RAW_DATA_SHARDS}.{shard_index}.ir_{sensor:03d}",
+            data=payloads[(frame * count_sensors + sensor) % 100],
+        )
+        for frame in range(count_frames)
+        for sensor in range(count_sensors)
+        if get_shard(f"ir_{sensor:03d}", shard_count) == shard_index
+    ]
+
+
+def run_worker(args: tuple[int, int, int, int, int]):
+    """Handle the raw data messages of the shard of a worker.
+
+    Args:
+        args (tuple[int, int, int, int, int]): shard index, shard count, number of sensors,
+            frames per sensor and pixels per frame.
+
+    Returns:
+        tuple[float, int]: handling time [s] and number of handled frames.
+    """
+    shard_index, shard_count, count_sensors, count_frames, frame_size = args
+    logger.remove()
+    messages = build_messages(
+        shard_index, shard_count, count_sensors, count_frames, frame_size
+    )
+
+    app_sensor_reader = AppSensorReader(
+        0.0,
+        "127.0.0.1:5432",
+        alert_threshold=90,
+        sinks=["file"],
+        shard_index=shard_index,
+        shard_count=shard_count,
+    )
+    app_sensor_reader.sensor_data_array_length = frame_size
+    app_sensor_reader.nats_client = StubNatsClient()
+
+    async def handle_messages():
+        for msg in messages:
+            await app_sensor_reader.handler_raw_data_messages(msg)
+
+    time_start = time.perf_counter()
+    asyncio.run(handle_messages())
+    return time.perf_counter() - time_start, app_sensor_reader.throughput_received.count
+
+
+def run_benchmark(
+    counts_workers: list[int], count_sensors: int, count_frames: int, frame_size: int
+):
+    """Measure throughput of raw data handling (parsing and hot-spot detection) sharded over an
+    increasing number of workers. Each worker handles prebuilt messages of its shard in its own
+    process: the supervisor, the NATS server, command forwarding and the storage loop are not
+    run.
+
+    Args:
+        counts_workers (list[int]): numbers of worker processes to be benchmarked.
+        count_sensors (int): number of sensors.
+        count_frames (int): number of frames per sensor.
+        frame_size (int): number of pixels per frame.
+    """
+    context = multiprocessing.get_context("spawn")
+    count_messages = count_sensors * count_frames
+    print(
+        f"Raw data handling of {count_messages} frames of {frame_size} pixels from "
+        f"{count_sensors} sensors, {multiprocessing.cpu_count()} CPUs available"
+    )
+
+    throughput_single = None
+    for count_workers in counts_workers:
+        with context.Pool(count_workers) as pool:
+            results = pool.map(
+                run_worker,
+                [
+                    (index, count_workers, count_sensors, count_frames, frame_size)
+                    for index in range(count_workers)
+                ],
+            )
+        assert sum(count for _, count in results) == count_messages
+
+        # Workers run concurrently, throughput is bound by the slowest one
+        throughput = count_messages / max(duration for duration, _ in results)
+        throughput_single = throughput_single or throughput
+        print(
+            f"  {count_workers:2d} workers: {throughput:10.0f} frames/s "
+            f"(x{throughput / throughput_single:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts_workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--count_sensors", type=int, default=64)
+    parser.add_argument("--count_frames", type=int, default=200)
+    parser.add_argument("--frame_size", type=int, default=64)
+    args = parser.parse_args()
+
+    run_benchmark(
+        args.counts_workers, args.count_sensors, args.count_frames, args.frame_size
+    )
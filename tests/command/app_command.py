@@ -1,18 +1,20 @@
 import argparse
 import asyncio
+import json
 
 import nats
 
 
-async def send_command(uri_nats_server: str, app_command: str):
-    """Send command action to corresponding topic on NATS server.
+def build_command(app_command: str, params: dict | None = None):
+    """Build payload of a command message.
 
     Args:
-        uri_nats_server (str): URI of destination NATS server.
         app_command (str): command to be sent.
-    """
-    nats_client = await nats.connect(uri_nats_server)
+        params (dict | None, optional): parameters of the command. Defaults to None.
 
+    Returns:
+        str: payload of the command message.
+    """
     match app_command:
         case "start":
             app_command = str(0)
@@ -20,14 +22,93 @@ async def send_command(uri_nats_server: str, app_command: str):
             app_command = str(1)
         case "exit":
             app_command = str(2)
+        case _:
+            app_command = json.dumps({"action": app_command, "params": params or {}})
+
+    return app_command
+
+
+async def send_command(
+    uri_nats_server: str, app_command: str, params: dict | None = None
+):
+    """Send command action to corresponding topic on NATS server.
+
+    Args:
+        uri_nats_server (str): URI of destination NATS server.
+        app_command (str): command to be sent.
+        params (dict | None, optional): parameters of the command. Defaults to None.
+    """
+    nats_client = await nats.connect(uri_nats_server)
+
+    app_command = build_command(app_command, params)
 
     await nats_client.publish("app_command", app_command.encode())
     await nats_client.drain()
 
 
+async def request_command(
+    uri_nats_server: str,
+    app_command: str,
+    params: dict | None = None,
+    timeout: float = 5.0,
+):
+    """Send command action as a request and wait for the app response.
+
+    Args:
+        uri_nats_server (str): URI of destination NATS server.
+        app_command (str): command to be sent.
+        params (dict | None, optional): parameters of the command. Defaults to None.
+        timeout (float, optional): max. time to wait for the response [s]. Defaults to 5.0.
+
+    Returns:
+        dict: response of the app.
+    """
+    nats_client = await nats.connect(uri_nats_server)
+
+    app_command = build_command(app_command, params)
+
+    response = await nats_client.request(
+        "app_command", app_command.encode(), timeout=timeout
+    )
+    await nats_client.drain()
+
+    return json.loads(response.data.decode())
+
+
+def parse_params(params: list[str]):
+    """Parse command parameters given as 'key=value' strings.
+
+    Args:
+        params (list[str]): parameters of the command.
+
+    Returns:
+        dict: parsed parameters.
+    """
+    params_parsed = {}
+    for param in params:
+        key, value = param.split("=", 1)
+        try:
+            params_parsed[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params_parsed[key] = value
+
+    return params_parsed
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("app_command", type=str, help="Root directory of the dataset")
+    parser.add_argument(
+        "app_command",
+        type=str,
+        help="Command to be sent: start, stop, exit, set, stats, profile_start or profile_stop",
+    )
+    parser.add_argument(
+        "params",
+        type=str,
+        nargs="*",
+        help="Parameters of the command, like freq_report_data=0.5 (set) or mode=sampling "
+        "duration=30 memory=true (profile_start)",
+    )
     parser.add_argument(
         "--uri_nats_server",
         type=str,
@@ -35,5 +116,18 @@ if __name__ == "__main__":
         required=False,
         default="nats://localhost:4222",
     )
+    parser.add_argument(
+        "--request",
+        action="store_true",
+        help="Wait for the app response (always done for 'stats' and 'profile_stop' commands)",
+    )
     args = parser.parse_args()
-    asyncio.run(send_command(args.uri_nats_server, args.app_command))
+
+    params = parse_params(args.params)
+    if args.request or args.app_command in ["stats", "profile_stop"]:
+        response = asyncio.run(
+            request_command(args.uri_nats_server, args.app_command, params)
+        )
+        print(json.dumps(response, indent=2))
+    else:
+        asyncio.run(send_command(args.uri_nats_server, args.app_command, params))
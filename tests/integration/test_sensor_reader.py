@@ -12,7 +12,8 @@ from tests.mocks.sensor_infrared import SensorInfrared
 
 class Helpers:
     async def handle_published_data(self, msg: Msg):
-        self.data = msg.data.decode()
+        self.data = msg.data
+        self.headers = msg.headers
 
 
 @pytest.fixture
@@ -197,7 +198,8 @@ class TestSensorReader:
         await asyncio.sleep(1)
 
         # Check data was received and has good format
-        assert len(app_sensor_reader.last_sensor_data) == len(raw_sensor_data)
+        last_sensor_data = app_sensor_reader.last_sensor_frames["default"]
+        assert len(last_sensor_data) == len(raw_sensor_data)
 
         # Disconnect and exit
         await app_sensor_reader.disconnect_from_message_server()
@@ -254,10 +256,12 @@ class TestSensorReader:
         sub_publishing = await app_sensor_reader.nats_client.subscribe(
             app_sensor_reader.topic_publishing, cb=helpers.handle_published_data
         )
-        await app_sensor_reader.publish_sensor_data(app_sensor_reader.last_sensor_data)
+        last_sensor_data = app_sensor_reader.last_sensor_frames["default"]
+        await app_sensor_reader.publish_sensor_data(last_sensor_data)
 
         await asyncio.sleep(1)
-        assert helpers.data == str(app_sensor_reader.last_sensor_data)
+        assert helpers.data == last_sensor_data.to_bytes()
+        assert helpers.headers == last_sensor_data.get_headers()
 
         # Unsubscribe publishing topic
         await sub_publishing.unsubscribe()
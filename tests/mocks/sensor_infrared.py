@@ -6,6 +6,12 @@ from loguru import logger
 from nats.errors import ConnectionClosedError, NoServersError, TimeoutError
 
 from sensor_reader.data.custom_types import NatsUrl
+from sensor_reader.data.frame import (
+    FrameStage,
+    format_stamp,
+    get_stamp_header,
+    get_stamp_now,
+)
 
 
 class SensorInfrared:
@@ -32,6 +38,7 @@ class SensorInfrared:
         self._last_data = np.random.randint(
             min_range_value, max_range_value + 1, size=64, dtype=np.uint16
         )
+        self._stamp_capture = get_stamp_now()
         self._uri_message_server = NatsUrl(url=uri_message_server)
         self._topic_raw_data = "sensors"
         self._freq_update_data = 1.0
@@ -63,6 +70,7 @@ class SensorInfrared:
         self._last_data = np.random.randint(
             self._min_value_range, self._max_value_range + 1, size=64, dtype=np.uint16
         )
+        self._stamp_capture = get_stamp_now()
         logger.debug(f"New sensor data generated: {self._last_data}")
 
     def get_data(self):
@@ -81,5 +89,9 @@ class SensorInfrared:
 
     async def publish_data(self):
         await self.nats_client.publish(
-            self._topic_raw_data, str(self._last_data).encode()
+            self._topic_raw_data,
+            str(self._last_data).encode(),
+            headers={
+                get_stamp_header(FrameStage.CAPTURE): format_stamp(self._stamp_capture)
+            },
         )
@@ -0,0 +1,168 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import numpy as np
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.custom_types import AggregateQuery
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.aggregate_queries import AggregateQueryService, get_runs
+from sensor_reader.db.aggregates import aggregate_frames
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.db.frame_log import FrameLogDbClient
+
+HOUR = 3600
+
+
+def build_batch(sensor_id: str, time_start: datetime, count_frames: int):
+    # Frames every 20 minutes, with pixel values increasing with time
+    return [
+        (
+            Frame(np.arange(4, dtype=np.uint16) + seq, sensor_id, seq),
+            time_start + timedelta(minutes=20 * seq),
+        )
+        for seq in range(count_frames)
+    ]
+
+
+def connect_frame_log(path):
+    db_client = FrameLogDbClient(f"file://{path}")
+    db_client.connect()
+    db_client.setup_data_structure()
+    return db_client
+
+
+class TestAggregateFrames:
+    def test_buckets(self):
+        timestamps = np.array([0, 1800, 3600, 3700, 9000], dtype=np.float64)
+        values = np.array([[1, 5], [3, 1], [2, 2], [4, 0], [7, 7]])
+
+        means = aggregate_frames(timestamps, values, "mean", True, HOUR)
+        maxima = aggregate_frames(timestamps, values, "max", False, HOUR)
+        means_sensor = aggregate_frames(timestamps, values, "mean", False, HOUR)
+
+        assert [bucket.count for bucket in means] == [2, 2, 1]
+        assert [bucket.values for bucket in means] == [[2, 3], [3, 1], [7, 7]]
+        assert [bucket.values for bucket in maxima] == [[5], [4], [7]]
+        assert [bucket.values for bucket in means_sensor] == [[2.5], [2], [7]]
+        assert maxima[2].time_start == datetime.fromtimestamp(2 * HOUR, timezone.utc)
+
+    def test_no_frames(self):
+        assert aggregate_frames(np.empty(0), np.empty((0, 4)), "mean", True, 60) == []
+
+    def test_get_runs(self):
+        assert get_runs([1, 2, 3, 7, 9, 10]) == [[1, 2, 3], [7], [9, 10]]
+
+
+class TestAggregateQueryService:
+    def test_cached_buckets(self, tmp_path):
+        db_client = connect_frame_log(tmp_path)
+        # Frames over the last 3 hours, up to the start of the current hour, so all 4 buckets
+        # of the range hold frames whatever the time of the run
+        time_hour = datetime.fromtimestamp(
+            datetime.now().timestamp() // HOUR * HOUR, timezone.utc
+        )
+        time_start = time_hour - timedelta(hours=3)
+        db_client.save_data_batch(build_batch("ir_01", time_start, 10))
+
+        service = AggregateQueryService(
+            mock.MagicMock(wraps=db_client), refresh_interval=0.0
+        )
+        query = AggregateQuery(
+            time_start=time_start, time_end=time_hour + timedelta(hours=1)
+        )
+        buckets = service.query("ir_01", query)
+
+        assert len(buckets) == 4
+        assert sum(bucket.count for bucket in buckets) == 10
+        assert service.db_client.get_aggregates.call_count == 1
+
+        # Only the bucket still receiving frames is recomputed
+        assert service.query("ir_01", query) == buckets
+        assert service.db_client.get_aggregates.call_count == 2
+        assert service.db_client.get_aggregates.call_args.args[4] == time_hour
+
+        stats = service.get_stats()
+        assert stats["queries"] == 2
+        assert stats["misses"] == 4 + 1
+        assert stats["hits"] == 3
+
+        # Queries of another aggregate are cached separately
+        service.query("ir_01", AggregateQuery(aggregate="max", time_start=time_start))
+        assert service.db_client.get_aggregates.call_count == 3
+
+    def test_lru_eviction(self, tmp_path):
+        db_client = connect_frame_log(tmp_path)
+        time_start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        db_client.save_data_batch(build_batch("ir_01", time_start, 12))
+        service = AggregateQueryService(db_client, cache_size=2)
+
+        query = AggregateQuery(
+            time_start=time_start, time_end=time_start + timedelta(hours=4)
+        )
+        buckets = service.query("ir_01", query)
+
+        assert len(buckets) == 4
+        assert service.get_stats()["cached"] == 2
+
+    def test_too_many_buckets(self, tmp_path):
+        service = AggregateQueryService(connect_frame_log(tmp_path), max_buckets=24)
+
+        with pytest.raises(ValueError):
+            service.query("ir_01", AggregateQuery(bucket=60))
+
+    def test_postgres_aggregates(self, tmp_path):
+        db_client = PostgresDbClient("127.0.0.1:5432")
+        db_client.connect()
+        db_client.setup_data_structure()
+
+        # Sensor identifier unique to this test run, as the table is not cleaned up
+        sensor_id = f"test_aggregates_{datetime.now().timestamp()}"
+        time_start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        batch = build_batch(sensor_id, time_start, 10)
+        db_client.save_data_batch(batch)
+        db_client_log = connect_frame_log(tmp_path)
+        db_client_log.save_data_batch(batch)
+
+        for aggregate in ["mean", "min", "max"]:
+            for per_pixel in [False, True]:
+                args = (aggregate, per_pixel, HOUR, time_start, batch[-1][1])
+                buckets = db_client.get_aggregates(sensor_id, *args)
+
+                assert buckets == db_client_log.get_aggregates(sensor_id, *args)
+        db_client.disconnect()
+
+
+class TestAggregateQueries:
+    @pytest.mark.asyncio
+    async def test_handler(self, tmp_path):
+        app_sensor_reader = AppSensorReader(
+            5, f"file://{tmp_path}", aggregate_queries=True
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        app_sensor_reader.db_client_aggregates.connect()  # type: ignore
+        time_start = datetime.now(timezone.utc) - timedelta(hours=2)
+        app_sensor_reader.db_client_aggregates.save_data_batch(  # type: ignore
+            build_batch("ir_01", time_start, 3)
+        )
+
+        for data, expected_status in [
+            ({"aggregate": "max", "per_pixel": True, "bucket": 86400}, "ok"),
+            ({"aggregate": "median"}, "error"),
+        ]:
+            msg = Msg(
+                _client=None,  # type: ignore
+                subject="aggregates.ir_01",
+                reply="reply_aggregates",
+                data=json.dumps(data).encode(),
+            )
+            await app_sensor_reader.handler_aggregate_queries(msg)
+
+            _, payload = app_sensor_reader.nats_client.publish.call_args.args
+            response = json.loads(payload.decode())
+            assert response["status"] == expected_status
+
+        assert app_sensor_reader.get_stats()["aggregates"]["queries"] == 1
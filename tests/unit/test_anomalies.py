@@ -0,0 +1,119 @@
+import json
+from unittest import mock
+
+import numpy as np
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.analytics.anomalies import PixelAnomalyDetector
+from sensor_reader.app import AppSensorReader
+
+
+def get_noisy_frames(count_frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(1000, 5, size=(count_frames, 64)).astype(np.uint16)
+
+
+class TestPixelAnomalyDetector:
+    def test_spike_after_warmup(self):
+        detector = PixelAnomalyDetector(threshold=5, warmup=20)
+
+        for values in get_noisy_frames(50):
+            assert detector.update("ir_01", values) is None
+
+        frame = get_noisy_frames(1, seed=1)[0]
+        frame[10] = 1200
+        anomalies = detector.update("ir_01", frame)
+
+        assert anomalies is not None
+        assert anomalies.pixels == [10]
+        assert anomalies.values == [1200]
+        assert anomalies.z_scores[0] > 5
+        assert anomalies.stuck_pixels == []
+
+    def test_no_anomalies_during_warmup(self):
+        detector = PixelAnomalyDetector(threshold=5, warmup=20)
+
+        for values in get_noisy_frames(5):
+            detector.update("ir_01", values)
+        frame = get_noisy_frames(1, seed=1)[0]
+        frame[10] = 1200
+
+        assert detector.update("ir_01", frame) is None
+
+    def test_anomaly_does_not_corrupt_history(self):
+        detector = PixelAnomalyDetector(threshold=5, warmup=20)
+
+        for values in get_noisy_frames(50):
+            detector.update("ir_01", values)
+        frame = get_noisy_frames(1, seed=1)[0]
+        frame[10] = 60000
+        detector.update("ir_01", frame)
+
+        # A second spike is still detected after the first one
+        frame[10] = 1200
+        anomalies = detector.update("ir_01", frame)
+
+        assert anomalies is not None
+        assert anomalies.pixels == [10]
+
+    def test_stuck_pixel(self):
+        detector = PixelAnomalyDetector(threshold=5, stuck_frames=10)
+
+        frames = get_noisy_frames(30)
+        frames[:, 3] = 1000
+        reports = [detector.update("ir_01", values) for values in frames]
+
+        # Stuck pixel is reported once, at its stuck_frames-th identical frame
+        stuck = [
+            i for i, report in enumerate(reports) if report and report.stuck_pixels
+        ]
+        assert stuck == [9]
+        assert reports[9].stuck_pixels == [3]
+
+    def test_sensors_beyond_initial_capacity(self):
+        detector = PixelAnomalyDetector(threshold=5, warmup=5, initial_capacity=2)
+
+        sensor_ids = [f"ir_{i:02d}" for i in range(5)]
+        for values in get_noisy_frames(10):
+            for i, sensor_id in enumerate(sensor_ids):
+                # Each sensor has its own level, kept after growing arrays
+                detector.update(sensor_id, values + 100 * i)
+
+        frame = get_noisy_frames(1, seed=1)[0] + 400
+        assert detector.update("ir_04", frame) is None
+        assert detector.update("ir_00", frame) is not None
+        assert detector.get_stats()["sensors"] == 5
+
+    def test_frame_length_mismatch(self):
+        detector = PixelAnomalyDetector()
+
+        with pytest.raises(ValueError):
+            detector.update("ir_01", np.zeros(16, dtype=np.uint16))
+
+
+class TestAnomaliesFastPath:
+    @pytest.mark.asyncio
+    async def test_publish_anomalies(self):
+        app_sensor_reader = AppSensorReader(
+            5, "127.0.0.1:5432", anomaly_threshold=5, anomaly_warmup=20
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        app_sensor_reader.db_client = mock.MagicMock()
+
+        frames = get_noisy_frames(31)
+        frames[-1, 10] = 1200
+        for values in frames:
+            msg = Msg(_client=None, subject="sensors.ir_01", data=str(values).encode())
+            await app_sensor_reader.handler_raw_data_messages(msg)
+
+        app_sensor_reader.nats_client.publish.assert_called_once()
+        subject, payload = app_sensor_reader.nats_client.publish.call_args.args
+        message = json.loads(payload.decode())
+        assert subject == "anomalies.ir_01"
+        assert message["seq"] == 30
+        assert message["pixels"] == [10]
+
+        stats = app_sensor_reader.get_stats()
+        assert stats["latency"]["anomalies"]["count"] == 31
+        assert stats["anomalies"]["sensors"] == 1
@@ -0,0 +1,90 @@
+import json
+from unittest import mock
+
+import pytest
+from nats.aio.msg import Msg
+from pydantic import ValidationError
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.custom_types import AppCommand, AppCommandActions
+from tests.command.app_command import build_command, parse_params
+
+
+class TestAppCommand:
+    @pytest.mark.parametrize(
+        "app_command, params, expected_action",
+        [
+            ("start", None, AppCommandActions.START),
+            ("stop", None, AppCommandActions.STOP),
+            ("exit", None, AppCommandActions.EXIT),
+            ("set", {"freq_report_data": 0.5}, AppCommandActions.SET),
+            ("stats", None, AppCommandActions.STATS),
+        ],
+    )
+    def test_command_parsing(self, app_command, params, expected_action):
+        command = AppCommand.from_message(build_command(app_command, params))
+
+        assert command.action == expected_action
+
+    @pytest.mark.parametrize(
+        "bad_command",
+        [
+            "7",
+            '{"action": "unknown"}',
+            '{"action": "set", "params": {"sink_batch_size": 0}}',
+            "not a command",
+        ],
+    )
+    def test_bad_command_parsing(self, bad_command):
+        with pytest.raises((ValueError, ValidationError)):
+            AppCommand.from_message(bad_command)
+
+    def test_params_parsing(self):
+        params = parse_params(["freq_report_data=0.5", "sink_batch_size=10"])
+
+        assert params == {"freq_report_data": 0.5, "sink_batch_size": 10}
+
+    @pytest.mark.asyncio
+    async def test_set_and_stats_commands(self):
+        freq_read_data = 5
+        uri_db_server = "127.0.0.1:5432"
+
+        app_sensor_reader = AppSensorReader(freq_read_data, uri_db_server)
+        app_sensor_reader.nats_client = mock.AsyncMock()
+
+        # Tune parameters at runtime
+        params = {"freq_report_data": 0.5, "sink_batch_size": 10, "sink_queue_size": 50}
+        msg = Msg(
+            _client=None,
+            subject="app_command",
+            reply="reply_set",
+            data=build_command("set", params).encode(),
+        )
+        await app_sensor_reader.handler_command_messages(msg)
+
+        assert app_sensor_reader.freq_report_data == 0.5
+        assert all(sink.batch_size == 10 for sink in app_sensor_reader.sinks)
+        assert all(sink.queue_size == 50 for sink in app_sensor_reader.sinks)
+
+        subject_reply, payload = app_sensor_reader.nats_client.publish.call_args.args
+        response = json.loads(payload.decode())
+        assert subject_reply == "reply_set"
+        assert response["status"] == "ok"
+        assert response["params"]["sink_batch_size"] == 10
+
+        # Request statistics snapshot
+        msg = Msg(
+            _client=None,
+            subject="app_command",
+            reply="reply_stats",
+            data=build_command("stats").encode(),
+        )
+        await app_sensor_reader.handler_command_messages(msg)
+
+        subject_reply, payload = app_sensor_reader.nats_client.publish.call_args.args
+        response = json.loads(payload.decode())
+        assert subject_reply == "reply_stats"
+        assert set(response["stats"]["sinks"]) == {"nats", "postgres"}
+        assert response["stats"]["sinks"]["nats"]["queue_depth"] == 0
+        assert "received" in response["stats"]["throughput"]
+        assert "parse" in response["stats"]["latency"]
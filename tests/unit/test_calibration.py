@@ -0,0 +1,168 @@
+import json
+import os
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from sensor_reader.analytics.calibration import (
+    CONTENT_TYPE_TEMPERATURES,
+    Calibration,
+    CalibrationParams,
+    CalibrationStore,
+)
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.sinks.calibration_sink import CalibrationSink
+
+# Linear curve from 0 to 65535 counts, mapped to -40 to 300 degrees
+CURVE = [(0, -40.0), (65535, 300.0)]
+
+
+def write_calibration(path, **params):
+    path.write_text(json.dumps({"curve": CURVE, **params}))
+    # Bump modification time, as rewrites may happen within the timestamp resolution
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestCalibration:
+    def test_lookup_table(self):
+        calibration = Calibration(CalibrationParams(curve=CURVE), count_pixels=3)
+
+        temperatures = calibration.apply(np.array([0, 32768, 65535], dtype=np.uint16))
+
+        assert temperatures.dtype == np.float32
+        np.testing.assert_allclose(
+            temperatures, [-40.0, -40 + 340 * 32768 / 65535, 300.0], rtol=1e-6
+        )
+
+    def test_gain_offset_and_clamping(self):
+        params = CalibrationParams(
+            gain=[1.0, 2.0, 1.0, 1.0],
+            offset=[0.0, 0.0, 100.0, -100.0],
+            curve=[(100, 0.0), (200, 100.0)],
+        )
+        calibration = Calibration(params, count_pixels=4)
+
+        temperatures = calibration.apply(np.array([150, 75, 50, 50], dtype=np.uint16))
+
+        # Corrected counts 150, 150, 150 and -100, clamped to the ends of the curve
+        np.testing.assert_allclose(temperatures, [50.0, 50.0, 50.0, 0.0])
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"curve": [(0, 0.0)]},
+            {"curve": [(100, 0.0), (100, 10.0)]},
+            {"curve": CURVE, "gain": [1.0, 1.0]},
+        ],
+    )
+    def test_bad_params(self, params):
+        with pytest.raises(ValueError):
+            Calibration(CalibrationParams(**params), count_pixels=4)
+
+
+class TestCalibrationStore:
+    def test_sensor_and_default_files(self, tmp_path):
+        write_calibration(tmp_path / "default.json")
+        write_calibration(tmp_path / "ir_01.json", offset=100.0)
+        store = CalibrationStore(str(tmp_path), count_pixels=64)
+
+        calibration_default = store.get("ir_02")
+
+        assert store.get("ir_01") is not calibration_default
+        assert store.get("ir_03") is calibration_default
+        assert store.get_stats() == {"sensors": 3, "files": 2, "loads": 2, "errors": 0}
+
+    def test_sensor_file_names(self, tmp_path):
+        path_dir = tmp_path / "calibration"
+        path_dir.mkdir()
+        write_calibration(tmp_path / "outside.json")
+
+        # Files outside the calibration directory are never read
+        store = CalibrationStore(str(path_dir))
+        assert store.get("../outside") is None
+        assert store.get("/" + str(tmp_path / "outside")) is None
+
+    def test_no_calibration(self, tmp_path):
+        store = CalibrationStore(str(tmp_path))
+
+        assert store.get("ir_01") is None
+
+    def test_hot_reload(self, tmp_path):
+        path = tmp_path / "ir_01.json"
+        write_calibration(path)
+        store = CalibrationStore(str(tmp_path), count_pixels=4, reload_interval=0.0)
+        values = np.full(4, 1000, dtype=np.uint16)
+        temperatures = store.get("ir_01").apply(values)  # type: ignore
+
+        write_calibration(path, offset=1000.0)
+        assert store.get("ir_01").apply(values)[0] > temperatures[0]  # type: ignore
+
+        # Invalid file keeps previous calibration
+        path.write_text("not a calibration")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+        assert store.get("ir_01") is not None
+        assert store.get_stats()["errors"] == 1
+
+
+class TestCalibrationSink:
+    @pytest.mark.asyncio
+    async def test_publish_and_store(self, tmp_path):
+        write_calibration(tmp_path / "ir_01.json")
+        db_client = PostgresDbClient("127.0.0.1:5432")
+        db_client.connect()
+        db_client.setup_data_structure()
+
+        publish = mock.AsyncMock()
+        sink = CalibrationSink(
+            CalibrationStore(str(tmp_path)), publish, db_client, batch_size=10
+        )
+        # Sequence number unique to this test run, as the table is not cleaned up
+        seq = int(datetime.now().timestamp() * 1e6)
+        values = np.arange(64, dtype=np.uint16) * 1000
+        batch = [
+            (Frame(values, "ir_01", seq), datetime.now()),
+            (Frame(values, "ir_02", seq), datetime.now()),
+        ]
+        await sink.write_batch(batch)
+
+        db_client.cursor.execute(
+            f"SELECT value FROM {db_client.table_name_calibrated} "
+            "WHERE sensor_id = 'ir_01' AND seq = %s",
+            (seq,),
+        )
+        rows = db_client.cursor.fetchall()
+        db_client.disconnect()
+
+        publish.assert_called_once()
+        frame, temperatures = publish.call_args.args
+        assert frame.sensor_id == "ir_01"
+        assert len(rows) == 1
+        np.testing.assert_allclose(rows[0][0], temperatures, rtol=1e-6)
+        assert sink.get_stats()["uncalibrated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_app_publishes_calibrated(self, tmp_path):
+        write_calibration(tmp_path / "default.json")
+        app_sensor_reader = AppSensorReader(
+            5,
+            "127.0.0.1:5432",
+            sinks=["calibrated"],
+            path_calibration_dir=str(tmp_path),
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+
+        values = np.full(64, 65535, dtype=np.uint16)
+        await app_sensor_reader.sinks[0].write_batch(
+            [(Frame(values, "ir_01", 0), datetime.now())]
+        )
+
+        subject, payload = app_sensor_reader.nats_client.publish.call_args.args
+        headers = app_sensor_reader.nats_client.publish.call_args.kwargs["headers"]
+        assert subject == "calibrated.ir_01"
+        assert headers["Content-Type"] == CONTENT_TYPE_TEMPERATURES
+        np.testing.assert_array_equal(np.frombuffer(payload, dtype="<f4"), 300.0)
@@ -1,8 +1,12 @@
+from datetime import datetime
+
+import numpy as np
 import psycopg2
 import pytest
 from psycopg2.extensions import connection
 from pydantic import ValidationError
 
+from sensor_reader.data.frame import Frame
 from sensor_reader.db.db_client import PostgresDbClient
 
 
@@ -53,3 +57,33 @@ class TestDbClient:
             assert error_code == expected_error_code
         else:
             assert isinstance(error_code, expected_error_code)
+
+    def test_save_frames(self):
+        db_client = PostgresDbClient("127.0.0.1:5432")
+        db_client.connect()
+        db_client.setup_data_structure()
+
+        # Sensor identifier unique to this test run, as the table is not cleaned up
+        sensor_id = f"test_db_client_{datetime.now().timestamp()}"
+        values = np.array([0, 1, 256, 65535], dtype=np.uint16)
+        timestamp = datetime(2026, 1, 1, 12, 30, 15, 123456)
+        db_client.save_data(Frame(values, sensor_id, 0), timestamp)
+        db_client.save_data_batch(
+            [(Frame(values[::-1].copy(), sensor_id, seq), timestamp) for seq in [1, 2]]
+        )
+
+        db_client.cursor.execute(
+            f"SELECT value, seq, timestamp FROM {db_client.table_name} "
+            "WHERE sensor_id = %s ORDER BY seq",
+            (sensor_id,),
+        )
+        rows = db_client.cursor.fetchall()
+        db_client.disconnect()
+
+        assert [row[0] for row in rows] == [
+            values.tolist(),
+            values[::-1].tolist(),
+            values[::-1].tolist(),
+        ]
+        assert [row[1] for row in rows] == [0, 1, 2]
+        assert all(row[2] == timestamp.astimezone() for row in rows)
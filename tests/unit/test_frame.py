@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from sensor_reader.data.frame import (
+    CONTENT_TYPE_FRAME,
+    Frame,
+    FrameParseError,
+    FrameStage,
+    parse_stamp,
+)
+
+
+class TestFrame:
+    @pytest.mark.parametrize(
+        "payload, expected_values",
+        [
+            (str(np.arange(64, dtype=np.uint16) * 1000).encode(), np.arange(64) * 1000),
+            (str(list(range(10))).encode(), np.arange(10)),
+            (b"[1 2\n 3]", np.array([1, 2, 3])),
+            (b"[]", np.array([])),
+        ],
+    )
+    def test_parse_text(self, payload, expected_values):
+        frame = Frame.from_payload(payload, "ir_01", 0)
+
+        assert frame.values.dtype == np.uint16
+        assert frame.values.flags.c_contiguous
+        np.testing.assert_array_equal(frame.values, expected_values)
+
+    @pytest.mark.parametrize("payload", [b"[1 2 x]", b"[1, -2, 3]", b"[70000]"])
+    def test_bad_text(self, payload):
+        with pytest.raises(FrameParseError):
+            Frame.from_payload(payload, "ir_01", 0)
+
+    def test_binary_roundtrip(self):
+        values = np.random.randint(0, 2**16, size=64, dtype=np.uint16)
+        frame = Frame(values, "ir_01", 7)
+        frame.stamp(FrameStage.CAPTURE, (12.5, 1700000000.5))
+        frame.stamp(FrameStage.PARSE)
+
+        frame_parsed = Frame.from_payload(
+            frame.to_bytes(), "ir_01", 7, content_type=CONTENT_TYPE_FRAME
+        )
+        np.testing.assert_array_equal(frame_parsed.values, values)
+
+        frame_decoded = Frame.from_message(frame.to_bytes(), frame.get_headers())
+        np.testing.assert_array_equal(frame_decoded.values, values)
+        assert frame_decoded.sensor_id == "ir_01"
+        assert frame_decoded.seq == 7
+        assert frame_decoded.get_stamp(FrameStage.CAPTURE) == (12.5, 1700000000.5)
+        for stage in [FrameStage.RECEIPT, FrameStage.PARSE]:
+            assert frame_decoded.get_stamp(stage) == frame.get_stamp(stage)
+        assert frame_decoded.get_stamp(FrameStage.COMMIT) is None
+        assert frame_decoded.timestamp == 1700000000.5
+
+        with pytest.raises(FrameParseError):
+            Frame.from_payload(b"\x00", "ir_01", 0, content_type=CONTENT_TYPE_FRAME)
+
+    def test_slots(self):
+        frame = Frame(np.zeros(64, dtype=np.uint16), "ir_01", 0)
+
+        assert not hasattr(frame, "__dict__")
+        assert len(frame) == 64
+
+    @pytest.mark.parametrize(
+        "value, expected_stamp",
+        [("1.5 1700000000.25", (1.5, 1700000000.25)), ("1.5", None), (None, None)],
+    )
+    def test_parse_stamp(self, value, expected_stamp):
+        assert parse_stamp(value) == expected_stamp
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import Frame
+from sensor_reader.db.db_client import PostgresDbClient, create_db_client
+from sensor_reader.db.frame_log import FrameLogDbClient
+from sensor_reader.sinks.postgres_sink import PostgresSink
+
+
+def build_batch(sensor_id: str, seqs: range, time_start: datetime, size: int = 8):
+    return [
+        (
+            Frame(np.full(size, seq, dtype=np.uint16), sensor_id, seq),
+            time_start + timedelta(seconds=seq),
+        )
+        for seq in seqs
+    ]
+
+
+@pytest.fixture
+def db_client(tmp_path):
+    db_client = FrameLogDbClient(
+        f"file://{tmp_path}/log?segment_records=4&index_interval=2"
+    )
+    _, error = db_client.connect()
+    assert error is None
+    db_client.setup_data_structure()
+    yield db_client
+    db_client.disconnect()
+
+
+class TestFrameLog:
+    def test_uri_parsing(self, tmp_path):
+        db_client = create_db_client(f"file://{tmp_path}?retention=3600&sync=1")
+        assert isinstance(db_client, FrameLogDbClient)
+        assert (db_client.path_dir, db_client.retention, db_client.sync) == (
+            tmp_path,
+            3600.0,
+            True,
+        )
+        assert isinstance(create_db_client("127.0.0.1:5432"), PostgresDbClient)
+
+        with pytest.raises(ValueError):
+            FrameLogDbClient(f"file://{tmp_path}?segment_size=4")
+        with pytest.raises(ValidationError):
+            FrameLogDbClient(f"http://{tmp_path}")
+
+    def test_range_read(self, db_client):
+        time_start = datetime(2024, 5, 1, 12).astimezone()
+        db_client.save_data_batch(build_batch("ir_01", range(10), time_start))
+        db_client.save_data_batch(build_batch("ir_02", range(3), time_start))
+        for frame, timestamp in build_batch("ir_01", range(10, 12), time_start):
+            db_client.save_data(frame, timestamp)
+
+        # Full segments are rotated
+        assert len(list((db_client.path_dir / "ir_01").glob("*.log"))) == 3
+
+        timestamps, seqs, values = db_client.get_frames(
+            "ir_01",
+            time_start + timedelta(seconds=3),
+            time_start + timedelta(seconds=9),
+        )
+        np.testing.assert_array_equal(seqs, np.arange(3, 10))
+        np.testing.assert_allclose(
+            timestamps, time_start.timestamp() + np.arange(3, 10)
+        )
+        np.testing.assert_array_equal(values[:, 0], np.arange(3, 10))
+        assert values.shape == (7, 8)
+
+        # Ranges within a segment are read as views on the log
+        _, seqs, values = db_client.get_frames(
+            "ir_01",
+            time_start + timedelta(seconds=4.5),
+            time_start + timedelta(seconds=6),
+        )
+        np.testing.assert_array_equal(seqs, [5, 6])
+        assert isinstance(values.base, np.memmap) or isinstance(values, np.memmap)
+
+        _, seqs, _ = db_client.get_frames(
+            "ir_02", time_start, time_start + timedelta(hours=1)
+        )
+        np.testing.assert_array_equal(seqs, [0, 1, 2])
+        _, seqs, values = db_client.get_frames(
+            "ir_01", time_start - timedelta(hours=1), time_start - timedelta(seconds=1)
+        )
+        assert len(seqs) == 0 and len(values) == 0
+
+    def test_out_of_order(self, db_client):
+        time_start = datetime(2024, 5, 1, 12).astimezone()
+        batch = build_batch("ir_01", range(3), time_start)
+        batch[2] = (batch[2][0], time_start)
+        db_client.save_data_batch(batch)
+
+        timestamps, _, _ = db_client.get_frames(
+            "ir_01", time_start, time_start + timedelta(seconds=10)
+        )
+        np.testing.assert_allclose(timestamps - time_start.timestamp(), [0, 1, 1])
+        assert db_client.count_reordered == 1
+
+    def test_resume(self, db_client):
+        time_start = datetime(2024, 5, 1, 12).astimezone()
+        db_client.save_data_batch(build_batch("ir_01", range(2), time_start))
+        db_client.disconnect()
+
+        # Last segment is appended to after a restart
+        db_client.connect()
+        db_client.save_data_batch(build_batch("ir_01", range(2, 4), time_start))
+        assert len(list((db_client.path_dir / "ir_01").glob("*.log"))) == 1
+        _, seqs, _ = db_client.get_frames(
+            "ir_01", time_start, time_start + timedelta(seconds=10)
+        )
+        np.testing.assert_array_equal(seqs, [0, 1, 2, 3])
+
+        # Frames of another size are stored in a new segment
+        db_client.save_data_batch(
+            build_batch("ir_01", range(4, 5), time_start, size=16)
+        )
+        assert len(list((db_client.path_dir / "ir_01").glob("*.log"))) == 2
+        with pytest.raises(ValueError):
+            db_client.get_frames(
+                "ir_01", time_start, time_start + timedelta(seconds=10)
+            )
+
+    def test_expiry(self, db_client):
+        db_client.retention = 3600.0
+        time_old = datetime.now().astimezone() - timedelta(hours=2)
+        db_client.save_data_batch(build_batch("ir_01", range(8), time_old))
+        db_client.save_data_batch(
+            build_batch("ir_01", range(8, 10), datetime.now().astimezone())
+        )
+
+        # Segments older than retention are removed once a newer one is started
+        paths_file = sorted((db_client.path_dir / "ir_01").glob("*.log"))
+        assert len(paths_file) == 2
+        assert db_client.count_expired == 1
+        _, seqs, _ = db_client.get_frames(
+            "ir_01", time_old, datetime.now().astimezone() + timedelta(minutes=1)
+        )
+        np.testing.assert_array_equal(seqs, [4, 5, 6, 7, 8, 9])
+
+    def test_sensor_dir_names(self, db_client):
+        time_start = datetime(2024, 5, 1, 12).astimezone()
+        for sensor_id in ["..", "../ir_01", "/tmp/ir_01"]:
+            db_client.save_data_batch(build_batch(sensor_id, range(2), time_start))
+
+            _, seqs, _ = db_client.get_frames(
+                sensor_id, time_start, time_start + timedelta(seconds=10)
+            )
+            np.testing.assert_array_equal(seqs, [0, 1])
+
+        # Logs of all sensors stay within the storage directory
+        assert sorted(path.name for path in db_client.path_dir.iterdir()) == [
+            "_.",
+            "_._ir_01",
+            "_tmp_ir_01",
+        ]
+        assert not list(db_client.path_dir.parent.glob("*.log"))
+
+    def test_app_frame_log(self, tmp_path):
+        uri_db_server = f"file://{tmp_path}/log"
+        app_sensor_reader = AppSensorReader(5, uri_db_server, sinks=["postgres"])
+        assert isinstance(app_sensor_reader.db_client, FrameLogDbClient)
+        assert isinstance(app_sensor_reader.sinks[0], PostgresSink)
+
+        with pytest.raises(ValueError):
+            AppSensorReader(5, uri_db_server, sinks=["pixels"])
@@ -0,0 +1,81 @@
+import io
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from sensor_reader.analytics.heatmap import (
+    HeatmapRenderer,
+    get_colormap_lut,
+    get_interpolation_matrix,
+)
+from sensor_reader.data.frame import Frame
+from sensor_reader.sinks.render_sink import RenderSink
+
+
+class TestHeatmap:
+    def test_interpolation(self):
+        matrix = get_interpolation_matrix(8, 32)
+
+        # Rows are convex combinations, and constant frames stay constant
+        np.testing.assert_allclose(matrix.sum(axis=1), 1)
+        assert (matrix >= 0).all()
+        frame = np.full((8, 8), 7.0)
+        np.testing.assert_allclose(matrix @ frame @ matrix.T, 7.0)
+
+    @pytest.mark.parametrize("image_format", ["png", "jpeg"])
+    def test_render(self, image_format):
+        renderer = HeatmapRenderer(scale=4, image_format=image_format)
+        values = np.arange(64, dtype=np.uint16) * 100
+
+        image = Image.open(io.BytesIO(renderer.render(values)))
+        assert image.format == image_format.upper()
+        assert image.size == (32, 32)
+
+        # Min. and max. values are mapped to colormap ends
+        pixels = renderer.colorize(values)
+        lut = get_colormap_lut("inferno")
+        np.testing.assert_array_equal(pixels[0, 0], lut[0])
+        np.testing.assert_array_equal(pixels[-1, -1], lut[255])
+
+        with pytest.raises(ValueError):
+            renderer.render(np.zeros(16, dtype=np.uint16))
+
+    def test_render_cache(self):
+        renderer = HeatmapRenderer(cache_size=2)
+        frames = [np.full(64, value, dtype=np.uint16) for value in range(3)]
+
+        image = renderer.render(frames[0])
+        with mock.patch.object(renderer, "encode") as encode:
+            assert renderer.render(frames[0].copy()) is image
+            encode.assert_not_called()
+
+        renderer.render(frames[1])
+        renderer.render(frames[2])
+        assert renderer.get_stats() == {"cached": 2, "hits": 1, "misses": 3}
+
+    @pytest.mark.asyncio
+    async def test_render_sink_throttling(self):
+        publish = mock.AsyncMock()
+        sink = RenderSink(HeatmapRenderer(scale=2), publish, interval=60.0)
+        values = np.arange(64, dtype=np.uint16)
+
+        # Only the latest frame of each sensor is rendered, once per interval
+        await sink.write_batch(
+            [
+                (Frame(values, "ir_01", 0), datetime.now()),
+                (Frame(values, "ir_01", 1), datetime.now()),
+                (Frame(values, "ir_02", 0), datetime.now()),
+            ]
+        )
+        await sink.write_batch([(Frame(values, "ir_01", 2), datetime.now())])
+
+        published = [
+            (call.args[0].sensor_id, call.args[0].seq)
+            for call in publish.call_args_list
+        ]
+        assert published == [("ir_01", 1), ("ir_02", 0)]
+        assert publish.call_args.args[2] == "image/png"
+        assert sink.get_stats()["rendered"] == 2
@@ -0,0 +1,110 @@
+import json
+from unittest import mock
+
+import numpy as np
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.analytics.hot_spots import HotSpotDetector
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import Frame
+
+
+class TestHotSpotDetector:
+    def test_no_hot_spots(self):
+        detector = HotSpotDetector(threshold=100)
+
+        assert detector.detect(np.zeros(64, dtype=np.uint16)) == []
+
+    def test_connected_regions(self):
+        detector = HotSpotDetector(threshold=100)
+
+        frame = np.zeros((8, 8), dtype=np.uint16)
+        # Diagonal region (8-connectivity) on top-left corner
+        frame[0, 0], frame[1, 1], frame[2, 2] = 150, 120, 110
+        # Isolated square region on bottom-right corner
+        frame[6:8, 6:8] = 300
+
+        hot_spots = detector.detect(frame.ravel())
+
+        assert len(hot_spots) == 2
+        assert hot_spots[0].size == 4
+        assert hot_spots[0].max_value == 300
+        assert hot_spots[0].centroid_row == pytest.approx(6.5)
+        assert hot_spots[0].centroid_col == pytest.approx(6.5)
+        assert hot_spots[1].size == 3
+        assert hot_spots[1].max_value == 150
+        assert hot_spots[1].mean_value == pytest.approx(380 / 3)
+
+    def test_min_region_size(self):
+        detector = HotSpotDetector(threshold=100, min_region_size=2)
+
+        frame = np.zeros((8, 8), dtype=np.uint16)
+        frame[0, 0] = 200
+        frame[5, 5:7] = 200
+
+        hot_spots = detector.detect(frame)
+
+        assert len(hot_spots) == 1
+        assert hot_spots[0].size == 2
+
+
+class TestAlertsFastPath:
+    @pytest.mark.parametrize(
+        "subject, expected_subject_alerts",
+        [
+            ("sensors", "alerts.default"),
+            ("sensors.ir_01", "alerts.ir_01"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_alert_published(self, subject, expected_subject_alerts):
+        freq_read_data = 5
+        uri_db_server = "127.0.0.1:5432"
+
+        app_sensor_reader = AppSensorReader(
+            freq_read_data, uri_db_server, alert_threshold=100
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        app_sensor_reader.db_client = mock.MagicMock()
+
+        raw_sensor_data = np.zeros(64, dtype=np.uint16)
+        raw_sensor_data[10] = 500
+        msg = Msg(_client=None, subject=subject, data=str(raw_sensor_data).encode())
+
+        await app_sensor_reader.handler_raw_data_messages(msg)
+
+        # Alert is published without waiting for the storage loop
+        app_sensor_reader.nats_client.publish.assert_called_once()
+        app_sensor_reader.db_client.save_data.assert_not_called()
+
+        subject_alerts, payload = app_sensor_reader.nats_client.publish.call_args.args
+        alert = json.loads(payload.decode())
+        assert subject_alerts == expected_subject_alerts
+        assert alert["hot_spots"][0]["max_value"] == 500
+        assert app_sensor_reader.last_alert_latency is not None
+
+    @pytest.mark.asyncio
+    async def test_alert_latency_budget(self, caplog):
+        app_sensor_reader = AppSensorReader(
+            5, "127.0.0.1:5432", alert_threshold=100, alert_latency_budget=0.005
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+
+        values = np.zeros(64, dtype=np.uint16)
+        values[10] = 500
+        # Alerts published 2 ms, then 50 ms, after frame arrival
+        with mock.patch("sensor_reader.app.time") as time_app:
+            time_app.monotonic.return_value = 100.0
+            for latency in [0.002, 0.05]:
+                await app_sensor_reader.detect_hot_spots(
+                    Frame(values, "ir_01", 0), 100.0 - latency
+                )
+
+        assert app_sensor_reader.last_alert_latency == pytest.approx(0.05)
+        assert app_sensor_reader.count_alerts_over_budget == 1
+        assert [
+            record.message
+            for record in caplog.records
+            if "exceeds budget" in record.message
+        ] == ["Alert latency 50.000 ms exceeds budget of 5.000 ms."]
@@ -0,0 +1,196 @@
+import asyncio
+import uuid
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, Frame, get_stamp_now
+from sensor_reader.ingest.datagram import (
+    DatagramError,
+    decode_datagram,
+    encode_datagram,
+)
+from sensor_reader.ingest.shm_ring import (
+    SharedMemoryRing,
+    SharedMemoryRingIngest,
+    SharedMemoryRingSender,
+)
+from sensor_reader.ingest.unix_socket import UnixSocketIngest, UnixSocketSender
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.received = []
+        self.event = asyncio.Event()
+
+    async def __call__(
+        self, sensor_id, payload, content_type, stamp_capture, stamp_receipt
+    ):
+        self.received.append((sensor_id, payload, content_type, stamp_capture))
+        self.event.set()
+
+    async def wait(self, count: int):
+        while len(self.received) < count:
+            self.event.clear()
+            await asyncio.wait_for(self.event.wait(), 2)
+
+
+class TestIngest:
+    def test_datagram(self):
+        payload = Frame(np.arange(64, dtype=np.uint16), "ir_01", 0).to_bytes()
+        stamp_capture = get_stamp_now()
+
+        data = encode_datagram("ir_01", payload, CONTENT_TYPE_FRAME, stamp_capture)
+        assert decode_datagram(data) == (
+            "ir_01",
+            payload,
+            CONTENT_TYPE_FRAME,
+            stamp_capture,
+        )
+
+        # Text payload without capture time
+        data = encode_datagram("ir_02", b"[1, 2, 3]", None)
+        assert decode_datagram(data) == ("ir_02", b"[1, 2, 3]", None, None)
+
+        with pytest.raises(DatagramError):
+            decode_datagram(data[:10])
+
+    @pytest.mark.asyncio
+    async def test_unix_socket(self, tmp_path):
+        handler = RecordingHandler()
+        ingest = UnixSocketIngest(str(tmp_path / "ingest.sock"), handler)
+        await ingest.start()
+
+        sender = UnixSocketSender(ingest.path_socket)
+        sender.socket.send(b"\x00")
+        for index in range(3):
+            sender.send(f"ir_{index}", bytes([index] * 128))
+        await handler.wait(3)
+        sender.close()
+        await ingest.stop()
+
+        assert [received[0] for received in handler.received] == [
+            "ir_0",
+            "ir_1",
+            "ir_2",
+        ]
+        assert handler.received[1][1] == bytes([1] * 128)
+        assert ingest.get_stats() == {"received": 3, "invalid": 1, "dropped": 0}
+
+    def test_unix_socket_full_queue(self, tmp_path):
+        ingest = UnixSocketIngest(
+            str(tmp_path / "ingest.sock"), RecordingHandler(), queue_size=2
+        )
+
+        # Oldest datagrams are dropped while the handler falls behind
+        for index in range(3):
+            ingest.put(bytes([index]))
+
+        assert ingest.get_stats()["dropped"] == 1
+        assert [ingest._queue.get_nowait()[0] for _ in range(2)] == [b"\x01", b"\x02"]
+
+    def test_shm_ring(self):
+        name = f"sensor_reader_test_{uuid.uuid4().hex[:8]}"
+        ring = SharedMemoryRing(name, slot_count=4, slot_size=64, create=True)
+        # Resource tracker is shared with the creator of the ring
+        writer = SharedMemoryRing(name, unregister=False)
+        assert (writer.slot_count, writer.slot_size) == (4, 64)
+
+        # Datagrams are read in order, and dropped while the ring is full
+        for index in range(5):
+            assert writer.write(bytes([index] * 10)) == (index < 4)
+        assert writer.count_dropped == 1
+        assert len(ring) == 4
+        assert ring.read() == bytes([0] * 10)
+        assert writer.write(b"wrapped")
+        assert [ring.read() for _ in range(4)] == [
+            bytes([1] * 10),
+            bytes([2] * 10),
+            bytes([3] * 10),
+            b"wrapped",
+        ]
+        assert ring.read() is None
+
+        with pytest.raises(ValueError):
+            writer.write(bytes(61))
+
+        writer.close()
+        ring.close(unlink=True)
+
+    @pytest.mark.asyncio
+    async def test_shm_ring_ingest(self):
+        handler = RecordingHandler()
+        ingest = SharedMemoryRingIngest(
+            f"sensor_reader_test_{uuid.uuid4().hex[:8]}", handler, poll_interval=0.001
+        )
+        await ingest.start()
+
+        sender = SharedMemoryRingSender(ingest.name, unregister=False)
+        stamp_capture = get_stamp_now()
+        for index in range(3):
+            assert sender.send(
+                "ir_01", bytes([index] * 128), stamp_capture=stamp_capture
+            )
+        await handler.wait(3)
+        sender.close()
+        await ingest.stop()
+
+        assert [received[1][0] for received in handler.received] == [0, 1, 2]
+        assert handler.received[0][3] == stamp_capture
+        assert ingest.get_stats()["received"] == 3
+
+    @pytest.mark.asyncio
+    async def test_shm_ring_ingest_yields(self):
+        handler = RecordingHandler()
+        ingest = SharedMemoryRingIngest(
+            f"sensor_reader_test_{uuid.uuid4().hex[:8]}", handler, yield_interval=2
+        )
+        await ingest.start()
+
+        sender = SharedMemoryRingSender(ingest.name, unregister=False)
+        for index in range(6):
+            sender.send("ir_01", bytes([index] * 128))
+
+        # Other tasks run while the ring is drained, though the handler never suspends
+        async def count_handled():
+            return len(handler.received)
+
+        task_probe = asyncio.create_task(count_handled())
+        await handler.wait(6)
+        sender.close()
+        await ingest.stop()
+
+        assert await task_probe < 6
+
+    @pytest.mark.asyncio
+    async def test_app_local_ingest(self, tmp_path):
+        app_sensor_reader = AppSensorReader(
+            5,
+            "127.0.0.1:5432",
+            sinks=["file"],
+            local_ingest="unix",
+            local_ingest_address=str(tmp_path / "ingest.sock"),
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        await app_sensor_reader.local_ingest.start()  # type: ignore
+
+        # Frames sent on the local transport are parsed like those received on NATS
+        values = np.arange(64, dtype=np.uint16)
+        sender = UnixSocketSender(str(tmp_path / "ingest.sock"))
+        sender.send("ir_01", Frame(values, "ir_01", 0).to_bytes(), CONTENT_TYPE_FRAME)
+        for _ in range(100):
+            if "ir_01" in app_sensor_reader.last_sensor_frames:
+                break
+            await asyncio.sleep(0.01)
+        sender.close()
+        await app_sensor_reader.local_ingest.stop()  # type: ignore
+
+        frame = app_sensor_reader.last_sensor_frames["ir_01"]
+        assert frame.sensor_id == "ir_01"
+        np.testing.assert_array_equal(frame.values, values)
+        assert app_sensor_reader.get_stats()["local_ingest"]["received"] == 1
+
+        with pytest.raises(ValueError):
+            AppSensorReader(5, "127.0.0.1:5432", sinks=["file"], local_ingest="tcp")
@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, Frame, get_stamp_now
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.db.pixel_history import (
+    FilePixelHistoryStore,
+    PixelBlock,
+    PixelBlockBuilder,
+)
+from sensor_reader.sinks.pixel_history_sink import PixelHistorySink
+
+
+def build_frames(count_frames: int, time_start: float, sensor_id: str = "ir_01"):
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 2**16, size=(count_frames, 64), dtype=np.uint16)
+    timestamps = time_start + 0.1 * np.arange(count_frames)
+    frames = [Frame(row, sensor_id, seq) for seq, row in enumerate(values)]
+
+    return frames, timestamps, values
+
+
+class TestPixelHistory:
+    def test_block_encoding(self):
+        _, timestamps, values = build_frames(50, 1.7e9)
+        block = PixelBlock("ir_01", timestamps, np.ascontiguousarray(values.T))
+
+        decoded = [PixelBlock.decode_pixel(chunk) for chunk in block.encode_pixels()]
+        np.testing.assert_array_equal(np.stack(decoded), values.T)
+        np.testing.assert_allclose(
+            PixelBlock.decode_timestamps(block.encode_timestamps()),
+            timestamps,
+            atol=1e-6,
+        )
+
+        # Slowly varying series compress well
+        block = PixelBlock("ir_01", timestamps, np.full((64, 50), 300, dtype=np.uint16))
+        assert all(len(chunk) < 50 for chunk in block.encode_pixels())
+
+    def test_block_builder(self):
+        frames, timestamps, values = build_frames(25, 1000.0)
+        builder = PixelBlockBuilder(block_duration=1.0, block_size=4)
+
+        blocks = []
+        for frame, timestamp in zip(frames, timestamps):
+            blocks += builder.add(frame, timestamp)
+        blocks += builder.flush()
+
+        # Blocks are closed on each second and after 4 frames
+        assert [block.count_frames for block in blocks] == [4, 4, 2] * 2 + [4, 1]
+        np.testing.assert_array_equal(
+            np.concatenate([block.values for block in blocks], axis=1), values.T
+        )
+        assert all(block.values.flags.c_contiguous for block in blocks)
+
+        # Frames already added are skipped
+        assert builder.add(frames[-1], timestamps[-1] + 10.0) == []
+        assert builder.flush() == [] and builder.count_skipped == 1
+
+    def test_block_builder_snapshot(self):
+        frames, timestamps, values = build_frames(6, 1000.0)
+        builder = PixelBlockBuilder(block_duration=10.0)
+        for frame, timestamp in zip(frames[:4], timestamps[:4]):
+            builder.add(frame, timestamp)
+
+        # Open blocks are built with their frames so far, and kept open
+        blocks = builder.snapshot()
+        assert builder.snapshot() == []
+        for frame, timestamp in zip(frames[4:], timestamps[4:]):
+            builder.add(frame, timestamp)
+        blocks += builder.flush()
+
+        assert [block.count_frames for block in blocks] == [4, 6]
+        np.testing.assert_array_equal(blocks[1].values, values.T)
+        assert builder.snapshot() == []
+
+    def test_file_store(self, tmp_path):
+        frames, timestamps, values = build_frames(100, 1.7e9)
+        builder = PixelBlockBuilder(block_duration=3.0)
+        blocks = []
+        for frame, timestamp in zip(frames, timestamps):
+            blocks += builder.add(frame, timestamp)
+        blocks += builder.flush()
+
+        store = FilePixelHistoryStore(str(tmp_path))
+        store.save_pixel_blocks(blocks)
+
+        time_start = datetime.fromtimestamp(timestamps[20])
+        time_end = datetime.fromtimestamp(timestamps[70])
+        timestamps_read, values_read = store.get_pixel_history(
+            "ir_01", [37, 2], time_start, time_end
+        )
+
+        np.testing.assert_allclose(timestamps_read, timestamps[20:71], atol=1e-6)
+        np.testing.assert_array_equal(values_read, values[20:71, [37, 2]].T)
+
+        # Unknown sensor and out of range pixels
+        timestamps_read, values_read = store.get_pixel_history(
+            "ir_02", [37], time_start, time_end
+        )
+        assert timestamps_read.size == 0 and values_read.shape == (1, 0)
+        with pytest.raises(ValueError):
+            store.get_pixel_history("ir_01", [64], time_start, time_end)
+
+    def test_file_store_open_blocks(self, tmp_path):
+        frames, timestamps, values = build_frames(10, 1.7e9)
+        builder = PixelBlockBuilder(block_duration=3600.0)
+        store = FilePixelHistoryStore(str(tmp_path))
+        time_start = datetime.fromtimestamp(timestamps[0])
+        time_end = datetime.fromtimestamp(timestamps[-1])
+
+        # Stored versions of an open block replace each other
+        for index, (frame, timestamp) in enumerate(zip(frames, timestamps)):
+            builder.add(frame, timestamp)
+            if index in [3, 6]:
+                store.save_pixel_blocks(builder.snapshot())
+        _, values_read = store.get_pixel_history("ir_01", [5], time_start, time_end)
+        np.testing.assert_array_equal(values_read, values[:7, [5]].T)
+
+        store.save_pixel_blocks(builder.flush())
+        _, values_read = store.get_pixel_history("ir_01", [5], time_start, time_end)
+        np.testing.assert_array_equal(values_read, values[:, [5]].T)
+        assert len(list((tmp_path / "ir_01").iterdir())) == 1
+
+    def test_file_store_sensor_dir_names(self, tmp_path):
+        frames, timestamps, values = build_frames(10, 1.7e9, sensor_id="../ir_01")
+        builder = PixelBlockBuilder(block_duration=3600.0)
+        store = FilePixelHistoryStore(str(tmp_path / "history"))
+        for frame, timestamp in zip(frames, timestamps):
+            builder.add(frame, timestamp)
+        store.save_pixel_blocks(builder.flush())
+
+        _, values_read = store.get_pixel_history(
+            "../ir_01",
+            [5],
+            datetime.fromtimestamp(timestamps[0]),
+            datetime.fromtimestamp(timestamps[-1]),
+        )
+        np.testing.assert_array_equal(values_read, values[:, [5]].T)
+        assert [path.name for path in tmp_path.iterdir()] == ["history"]
+
+    @pytest.mark.asyncio
+    async def test_app_pixel_history(self, tmp_path):
+        app_sensor_reader = AppSensorReader(
+            0, "127.0.0.1:5432", sinks=["pixels"], pixel_history_store=str(tmp_path)
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        time_start = datetime.now()
+
+        # Every frame of every sensor is added once, whatever the number of reports
+        for seq in range(3):
+            for sensor_id in ["ir_01", "ir_02"]:
+                await app_sensor_reader.ingest_raw_data(
+                    sensor_id,
+                    Frame(np.full(64, seq, dtype=np.uint16), sensor_id, 0).to_bytes(),
+                    CONTENT_TYPE_FRAME,
+                    None,
+                    get_stamp_now(),
+                )
+            for _ in range(2):
+                await app_sensor_reader.process_sensor_data()
+        sink = app_sensor_reader.sinks[0]
+        sink.start()
+        await sink.stop()
+
+        for sensor_id in ["ir_01", "ir_02"]:
+            _, values_read = sink.store.get_pixel_history(  # type: ignore
+                sensor_id, [0], time_start, datetime.now()
+            )
+            np.testing.assert_array_equal(values_read, [[0, 1, 2]])
+
+    @pytest.mark.asyncio
+    async def test_sink_with_postgres_store(self):
+        db_client = PostgresDbClient("127.0.0.1:5432")
+        db_client.connect()
+        db_client.setup_data_structure()
+
+        # Sensor identifier unique to this test run, as the table is not cleaned up
+        sensor_id = f"test_pixels_{datetime.now().timestamp()}"
+        time_start = datetime.now().timestamp()
+        frames, timestamps, values = build_frames(30, time_start, sensor_id)
+
+        sink = PixelHistorySink(
+            db_client, block_duration=3600.0, block_size=8, batch_size=5
+        )
+        for frame, timestamp in zip(frames, timestamps):
+            sink.put(frame, datetime.fromtimestamp(timestamp))
+        sink.start()
+        await sink.stop()
+
+        timestamps_read, values_read = db_client.get_pixel_history(
+            sensor_id,
+            [0, 63],
+            datetime.fromtimestamp(time_start) - timedelta(seconds=1),
+            datetime.fromtimestamp(time_start) + timedelta(seconds=60),
+        )
+        db_client.disconnect()
+
+        assert sink.count_written == 30
+        np.testing.assert_allclose(timestamps_read, timestamps, atol=1e-6)
+        np.testing.assert_array_equal(values_read, values[:, [0, 63]].T)
+
+    @pytest.mark.asyncio
+    async def test_sink_flushes_open_blocks(self):
+        db_client = PostgresDbClient("127.0.0.1:5432")
+        db_client.connect()
+        db_client.setup_data_structure()
+
+        # Sensor identifier unique to this test run, as the table is not cleaned up
+        sensor_id = f"test_pixels_open_{datetime.now().timestamp()}"
+        time_start = datetime.now().timestamp()
+        frames, timestamps, values = build_frames(30, time_start, sensor_id)
+        batch = [
+            (frame, datetime.fromtimestamp(timestamp))
+            for frame, timestamp in zip(frames, timestamps)
+        ]
+
+        def get_pixel_history():
+            return db_client.get_pixel_history(
+                sensor_id,
+                [7],
+                datetime.fromtimestamp(time_start) - timedelta(seconds=1),
+                datetime.fromtimestamp(time_start) + timedelta(seconds=60),
+            )[1]
+
+        sink = PixelHistorySink(db_client, block_duration=3600.0, flush_interval=0.0)
+        await sink.write_batch(batch[:10])
+        values_open = get_pixel_history()
+        await sink.write_batch(batch[10:])
+        await sink.close()
+        values_closed = get_pixel_history()
+        db_client.disconnect()
+
+        np.testing.assert_array_equal(values_open, values[:10, [7]].T)
+        np.testing.assert_array_equal(values_closed, values[:, [7]].T)
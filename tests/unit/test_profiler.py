@@ -0,0 +1,129 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.monitoring.profiler import ProfilerSession
+from tests.command.app_command import build_command
+
+
+def busy_function():
+    total = 0
+    for value in range(5000):
+        total += value**2
+    return total
+
+
+async def wait_published(publish: mock.AsyncMock):
+    for _ in range(100):
+        if publish.called:
+            return
+        await asyncio.sleep(0.02)
+
+
+class TestProfiler:
+    @pytest.mark.parametrize(
+        "mode, expected_file_suffix",
+        [("deterministic", "_cpu.pstats"), ("sampling", "_cpu.folded")],
+    )
+    def test_profiler_session(self, mode, expected_file_suffix, tmp_path):
+        profiler_session = ProfilerSession(
+            str(tmp_path), mode=mode, sampling_interval=0.001
+        )
+        profiler_session.start()
+        buffers = [bytearray(1024) for _ in range(100)]
+        for _ in range(5):
+            busy_function()
+        summary = profiler_session.stop()
+
+        assert summary["mode"] == mode
+        assert any(file.endswith(expected_file_suffix) for file in summary["files"])
+        assert all(Path(file).exists() for file in summary["files"])
+        assert any("busy_function" in entry["function"] for entry in summary["cpu"])
+        assert summary["memory"]["peak"] >= len(buffers) * 1024
+
+    @pytest.mark.asyncio
+    async def test_write_from_another_thread(self, tmp_path):
+        profiler_session = ProfilerSession(str(tmp_path), mode="deterministic")
+        profiler_session.start()
+        busy_function()
+
+        profiler_session.disable()
+        assert sys.getprofile() is None
+        summary = await asyncio.to_thread(profiler_session.stop)
+
+        assert any("busy_function" in entry["function"] for entry in summary["cpu"])
+
+    def test_bad_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            ProfilerSession(str(tmp_path), mode="unknown")
+
+    @pytest.mark.asyncio
+    async def test_profiling_commands(self, tmp_path):
+        freq_read_data = 5
+        uri_db_server = "127.0.0.1:5432"
+
+        app_sensor_reader = AppSensorReader(
+            freq_read_data, uri_db_server, path_profiling_dir=str(tmp_path)
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+
+        # Profiling session is stopped automatically after set duration
+        msg = Msg(
+            _client=None,
+            subject="app_command",
+            data=build_command("profile_start", {"duration": 0.1}).encode(),
+        )
+        await app_sensor_reader.handler_command_messages(msg)
+        assert app_sensor_reader.profiler_session is not None
+
+        await asyncio.sleep(0.3)
+        assert app_sensor_reader.profiler_session is None
+
+        await wait_published(app_sensor_reader.nats_client.publish)
+        subject, payload = app_sensor_reader.nats_client.publish.call_args.args
+        assert subject == "profiling"
+        assert json.loads(payload.decode())["mode"] == "sampling"
+
+        # Stopping without a running session replies with an error
+        msg = Msg(
+            _client=None,
+            subject="app_command",
+            reply="reply_stop",
+            data=build_command("profile_stop").encode(),
+        )
+        await app_sensor_reader.handler_command_messages(msg)
+
+        subject, payload = app_sensor_reader.nats_client.publish.call_args.args
+        assert subject == "reply_stop"
+        assert json.loads(payload.decode())["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_profiling_timeout_error(self, tmp_path, caplog):
+        app_sensor_reader = AppSensorReader(
+            5, "127.0.0.1:5432", path_profiling_dir=str(tmp_path)
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        app_sensor_reader.nats_client.publish.side_effect = ConnectionError("closed")
+
+        msg = Msg(
+            _client=None,
+            subject="app_command",
+            data=build_command("profile_start", {"duration": 0.1}).encode(),
+        )
+        await app_sensor_reader.handler_command_messages(msg)
+        await asyncio.sleep(0.1)
+        await wait_published(app_sensor_reader.nats_client.publish)
+        await asyncio.sleep(0.05)
+
+        # Failure of the session stopped after its duration is logged
+        assert app_sensor_reader.profiler_session is None
+        assert any(
+            "Cannot stop profiling session" in record.message
+            for record in caplog.records
+        )
@@ -0,0 +1,203 @@
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import psycopg2
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.analytics.quantiles import PixelQuantileSketch
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, Frame, get_stamp_now
+from sensor_reader.db.db_client import PostgresDbClient
+from sensor_reader.sinks.quantile_sink import QuantileSink
+
+
+def build_values(count_frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, 2**16, size=(count_frames, 64)).astype(np.uint16)
+
+
+class TestQuantiles:
+    def test_sketch_accuracy(self):
+        values = build_values(5000)
+        sketch = PixelQuantileSketch(64, relative_accuracy=0.01)
+        for index in range(0, len(values), 100):
+            sketch.update(values[index : index + 100])
+
+        qs = [0.01, 0.5, 0.99]
+        expected = np.quantile(values, qs, axis=0, method="lower")
+        assert sketch.count == 5000
+        assert np.all(np.abs(sketch.quantiles(qs) - expected) <= 0.01 * expected)
+
+        # Constant and zero pixels
+        sketch = PixelQuantileSketch(2)
+        sketch.update(np.array([[0, 300]] * 10, dtype=np.uint16))
+        quantiles = sketch.quantiles([0.5])
+        assert quantiles[0, 0] == 0
+        assert quantiles[0, 1] == pytest.approx(300, rel=0.01)
+        assert np.isnan(PixelQuantileSketch(2).quantiles([0.5])).all()
+
+    def test_sketch_merge_and_serialization(self):
+        values = build_values(1000)
+        sketch = PixelQuantileSketch(64)
+        sketch.update(values)
+
+        sketches = [PixelQuantileSketch(64), PixelQuantileSketch(64)]
+        sketches[0].update(values[:300])
+        sketches[1].update(values[300:])
+        merged = PixelQuantileSketch.from_bytes(sketches[0].to_bytes())
+        merged.merge(sketches[1])
+
+        np.testing.assert_array_equal(merged.counts, sketch.counts)
+        with pytest.raises(ValueError):
+            merged.merge(PixelQuantileSketch(64, relative_accuracy=0.02))
+
+    @pytest.mark.asyncio
+    async def test_app_sketches(self):
+        app_sensor_reader = AppSensorReader(
+            0, "127.0.0.1:5432", sinks=["quantiles"], quantile_snapshot_interval=0.0
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+
+        # Every frame of every sensor is counted once, whatever the number of reports
+        for row in build_values(3):
+            for sensor_id in ["ir_01", "ir_02"]:
+                await app_sensor_reader.ingest_raw_data(
+                    sensor_id,
+                    Frame(row, sensor_id, 0).to_bytes(),
+                    CONTENT_TYPE_FRAME,
+                    None,
+                    get_stamp_now(),
+                )
+            for _ in range(5):
+                await app_sensor_reader.process_sensor_data()
+        sink = app_sensor_reader.quantile_sink
+        sink.start()  # type: ignore
+        await sink.stop()  # type: ignore
+
+        assert {
+            sensor_id: sketch.count
+            for sensor_id, sketch in sink.sketches.items()  # type: ignore
+        } == {"ir_01": 3, "ir_02": 3}
+
+    @pytest.mark.asyncio
+    async def test_sink_retried_batch(self):
+        sink = QuantileSink(mock.MagicMock(), snapshot_interval=0.0)
+        sink.db_client.save_quantile_sketches.side_effect = [  # type: ignore
+            psycopg2.OperationalError("connection lost"),
+            None,
+        ]
+
+        # Frames of a batch retried after a failed snapshot are counted once
+        batch = [(Frame(row, "ir_01", 0), datetime.now()) for row in build_values(4)]
+        with pytest.raises(psycopg2.OperationalError):
+            await sink.write_batch(batch)
+        await sink.write_batch(batch)
+
+        assert sink.sketches["ir_01"].count == 4
+
+    @pytest.mark.asyncio
+    async def test_sink_snapshots(self):
+        db_client = PostgresDbClient("127.0.0.1:5432")
+        db_client.connect()
+        db_client.setup_data_structure()
+
+        # Sensor identifier unique to this test run, as the table is not cleaned up
+        sensor_id = f"test_quantiles_{datetime.now().timestamp()}"
+        time_start = datetime.now().astimezone()
+        values = build_values(40)
+
+        sink = QuantileSink(db_client, snapshot_interval=0.0, batch_size=10)
+        sink.start()
+        for row in values:
+            sink.put(Frame(row, sensor_id, 0), datetime.now())
+        await sink.stop()
+
+        # Sketches of all windows merge into the sketch since start
+        sketch, time_start_windows, time_end_windows = db_client.get_quantile_sketch(
+            sensor_id, time_start, datetime.now().astimezone()
+        )
+        # Windows partially overlapping the time range are merged whole
+        sketch_overlap, *time_range = db_client.get_quantile_sketch(
+            sensor_id,
+            time_start_windows + timedelta(microseconds=1),  # type: ignore
+            time_end_windows - timedelta(microseconds=1),  # type: ignore
+        )
+        db_client.disconnect()
+
+        assert sketch is not None and sketch.count == 40
+        np.testing.assert_array_equal(sketch.counts, sink.sketches[sensor_id].counts)
+        assert sink.sketches_window[sensor_id].count == 0
+        assert sketch_overlap is not None and sketch_overlap.count == 40
+        assert time_range == [time_start_windows, time_end_windows]
+
+    @pytest.mark.asyncio
+    async def test_quantile_queries(self):
+        app_sensor_reader = AppSensorReader(
+            5, "127.0.0.1:5432", sinks=["quantiles"], quantile_snapshot_interval=0
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        values = build_values(100)
+        await app_sensor_reader.quantile_sink.write_batch(  # type: ignore
+            [(Frame(row, "ir_01", 0), datetime.now()) for row in values]
+        )
+
+        msg = Msg(
+            _client=None,  # type: ignore
+            subject="quantiles.ir_01",
+            reply="reply_quantiles",
+            data=json.dumps({"quantiles": [0.5], "pixels": [37]}).encode(),
+        )
+        await app_sensor_reader.handler_quantile_queries(msg)
+
+        _, payload = app_sensor_reader.nats_client.publish.call_args.args
+        response = json.loads(payload.decode())
+        assert response["count"] == 100
+        assert response["quantiles"]["0.5"][0] == pytest.approx(
+            np.quantile(values[:, 37], 0.5, method="lower"), rel=0.01
+        )
+
+        # Unknown sensor, and time range without stored sketches
+        for subject, data in [
+            ("quantiles.ir_02", b""),
+            (
+                "quantiles.ir_01",
+                json.dumps(
+                    {"time_start": (datetime.now() - timedelta(hours=1)).isoformat()}
+                ).encode(),
+            ),
+        ]:
+            msg = Msg(
+                _client=None,  # type: ignore
+                subject=subject,
+                reply="reply_quantiles",
+                data=data,
+            )
+            await app_sensor_reader.handler_quantile_queries(msg)
+
+            _, payload = app_sensor_reader.nats_client.publish.call_args.args
+            assert json.loads(payload.decode())["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_quantile_queries_db_error(self):
+        app_sensor_reader = AppSensorReader(5, "127.0.0.1:5432", sinks=["quantiles"])
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        db_client = mock.Mock()
+        db_client.get_quantile_sketch.side_effect = psycopg2.OperationalError(
+            "connection lost"
+        )
+        app_sensor_reader.quantile_sink.db_client = db_client  # type: ignore
+
+        msg = Msg(
+            _client=None,  # type: ignore
+            subject="quantiles.ir_01",
+            reply="reply_quantiles",
+            data=json.dumps({"time_end": datetime.now().isoformat()}).encode(),
+        )
+        await app_sensor_reader.handler_quantile_queries(msg)
+
+        _, payload = app_sensor_reader.nats_client.publish.call_args.args
+        response = json.loads(payload.decode())
+        assert response == {"status": "error", "error": "connection lost"}
@@ -0,0 +1,137 @@
+import uuid
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import (
+    CONTENT_TYPE_FRAME,
+    Frame,
+    FrameStage,
+    get_stamp_now,
+)
+from sensor_reader.data.shared_frames import LatestFrameReader, LatestFrameWriter
+from sensor_reader.sinks.shm_sink import SharedMemorySink
+
+
+@pytest.fixture
+def prefix():
+    return f"sensor_reader_test_{uuid.uuid4().hex[:8]}"
+
+
+class TestSharedFrames:
+    def test_write_read(self, prefix):
+        writer = LatestFrameWriter(prefix)
+        # Resource tracker is shared with the writer
+        reader = LatestFrameReader("ir_01", prefix, unregister=False)
+        assert reader.read() is None
+
+        values = np.arange(64, dtype=np.uint16)
+        frame = Frame(values, "ir_01", 7)
+        frame.stamp(FrameStage.CAPTURE, (1.0, 2.0))
+        writer.write(frame)
+
+        frame_read = reader.read()
+        assert frame_read is not None
+        assert (frame_read.sensor_id, frame_read.seq) == ("ir_01", 7)
+        np.testing.assert_array_equal(frame_read.values, values)
+        assert frame_read.get_stamp(FrameStage.CAPTURE) == (1.0, 2.0)
+        assert frame_read.get_stamp(FrameStage.PUBLISH) is not None
+
+        # Only newer frames are read again
+        assert reader.read_new() is None
+        writer.write(Frame(values + 1, "ir_01", 8))
+        assert reader.read_new().seq == 8  # type: ignore
+
+        reader.close()
+        writer.close()
+
+    def test_zero_copy(self, prefix):
+        writer = LatestFrameWriter(prefix)
+        reader = LatestFrameReader("ir_01", prefix, unregister=False)
+        writer.write(Frame(np.zeros(64, dtype=np.uint16), "ir_01", 0))
+
+        # Views are read-only and no longer consistent once a newer frame is written
+        frame_read = reader.read(copy=False)
+        assert not frame_read.values.flags.writeable  # type: ignore
+        assert reader.is_current()
+        writer.write(Frame(np.ones(64, dtype=np.uint16), "ir_01", 1))
+        assert not reader.is_current()
+        assert frame_read.values[0] == 1  # type: ignore
+
+        reader.close()
+        writer.close()
+
+    def test_torn_read(self, prefix):
+        writer = LatestFrameWriter(prefix)
+        reader = LatestFrameReader("ir_01", prefix, unregister=False, max_retries=10)
+        writer.write(Frame(np.zeros(64, dtype=np.uint16), "ir_01", 0))
+
+        # Frame being written (odd version) is not read
+        segment = writer._segments["ir_01"]
+        segment.version[0] += 1
+        with pytest.raises(TimeoutError):
+            reader.read()
+        assert reader.count_retries == 10
+        segment.version[0] += 1
+        assert reader.read().seq == 0  # type: ignore
+
+        reader.close()
+        writer.close()
+
+    def test_segment_replaced(self, prefix):
+        writer = LatestFrameWriter(prefix)
+        reader = LatestFrameReader("ir/01", prefix, unregister=False)
+        writer.write(Frame(np.zeros(64, dtype=np.uint16), "ir/01", 0))
+        assert len(reader.read()) == 64  # type: ignore
+
+        # Larger frames replace the segment, which readers attach again
+        writer.write(Frame(np.zeros(256, dtype=np.uint16), "ir/01", 1))
+        frame_read = reader.read_new()
+        assert frame_read is not None
+        assert (len(frame_read), frame_read.seq) == (256, 1)
+
+        writer.close()
+        assert reader.read() is None
+        reader.close()
+
+    @pytest.mark.asyncio
+    async def test_sink(self, prefix):
+        sink = SharedMemorySink(prefix)
+        reader = LatestFrameReader("ir_01", prefix, unregister=False)
+        values = np.arange(64, dtype=np.uint16)
+        await sink.write_batch(
+            [(Frame(values, "ir_01", seq), datetime.now()) for seq in range(3)]
+        )
+
+        assert reader.read().seq == 2  # type: ignore
+        reader.close()
+        await sink.close()
+
+    @pytest.mark.asyncio
+    async def test_app_sink(self, prefix):
+        app_sensor_reader = AppSensorReader(
+            5, "127.0.0.1:5432", sinks=["shm"], shm_prefix=prefix
+        )
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        sink = app_sensor_reader.sinks[0]
+        sink.start()
+
+        # Frames of all sensors are written as they are parsed, without waiting for a report
+        for sensor_id in ["ir_01", "ir_02"]:
+            await app_sensor_reader.ingest_raw_data(
+                sensor_id,
+                Frame(np.zeros(64, dtype=np.uint16), sensor_id, 0).to_bytes(),
+                CONTENT_TYPE_FRAME,
+                None,
+                get_stamp_now(),
+            )
+        await sink.queue.join()
+
+        for sensor_id in ["ir_01", "ir_02"]:
+            reader = LatestFrameReader(sensor_id, prefix, unregister=False)
+            assert reader.read().sensor_id == sensor_id  # type: ignore
+            reader.close()
+        await sink.stop()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import CONTENT_TYPE_FRAME, Frame, get_stamp_now
+from sensor_reader.sinks.base import Sink
+from sensor_reader.sinks.calibration_sink import CalibrationSink
+from sensor_reader.sinks.file_sink import FileSink
+from sensor_reader.sinks.nats_sink import NatsSink
+from sensor_reader.sinks.pixel_history_sink import PixelHistorySink
+from sensor_reader.sinks.postgres_sink import PostgresSink
+from sensor_reader.sinks.shm_sink import SharedMemorySink
+
+
+class RecordingSink(Sink):
+    name = "recording"
+
+    def __init__(self, delay: float = 0.0, count_failures: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.count_failures = count_failures
+        self.batches = []
+
+    async def write_batch(self, batch):
+        await asyncio.sleep(self.delay)
+        if self.count_failures > 0:
+            self.count_failures -= 1
+            raise RuntimeError("Sink failure")
+        self.batches.append(batch)
+
+
+async def ingest_frames(app_sensor_reader: AppSensorReader, sensor_ids: list[str]):
+    for sensor_id in sensor_ids:
+        await app_sensor_reader.ingest_raw_data(
+            sensor_id,
+            Frame(np.zeros(64, dtype=np.uint16), sensor_id, 0).to_bytes(),
+            CONTENT_TYPE_FRAME,
+            None,
+            get_stamp_now(),
+        )
+
+
+def read_file_sink(path_file):
+    return [json.loads(line) for line in path_file.read_text().splitlines()]
+
+
+class TestSinks:
+    @pytest.mark.asyncio
+    async def test_batching(self):
+        sink = RecordingSink(batch_size=4)
+        for index in range(10):
+            sink.put([index], datetime.now())
+
+        sink.start()
+        await sink.stop()
+
+        assert [len(batch) for batch in sink.batches] == [4, 4, 2]
+        assert sink.count_written == 10
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_on_full_queue(self):
+        sink = RecordingSink(queue_size=2)
+        for index in range(3):
+            sink.put([index], datetime.now())
+
+        sink.start()
+        await sink.stop()
+
+        assert sink.count_dropped == 1
+        assert [batch[0][0] for batch in sink.batches] == [[1], [2]]
+
+    @pytest.mark.asyncio
+    async def test_retries(self):
+        sink = RecordingSink(count_failures=2, max_retries=2, retry_delay=0.001)
+        sink.put([1], datetime.now())
+
+        sink.start()
+        await sink.stop()
+
+        assert sink.count_written == 1
+        assert sink.count_failed == 0
+
+        sink = RecordingSink(count_failures=5, max_retries=1, retry_delay=0.001)
+        sink.put([1], datetime.now())
+
+        sink.start()
+        await sink.stop()
+
+        assert sink.count_written == 0
+        assert sink.count_failed == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_sink_does_not_delay_others(self):
+        slow_sink = RecordingSink(delay=1.0)
+        fast_sink = RecordingSink()
+        slow_sink.start()
+        fast_sink.start()
+
+        for sink in [slow_sink, fast_sink]:
+            sink.put([1], datetime.now())
+        await asyncio.sleep(0.05)
+
+        assert len(fast_sink.batches) == 1
+        assert len(slow_sink.batches) == 0
+
+        await fast_sink.stop()
+        await slow_sink.stop()
+
+    @pytest.mark.asyncio
+    async def test_file_sink(self, tmp_path):
+        path_file = tmp_path / "sensor_data.jsonl"
+        timestamp = datetime.now()
+
+        sink = FileSink(str(path_file), batch_size=2)
+        sink.put(Frame(np.array([1, 2, 3], dtype=np.uint16), "ir_01", 0), timestamp)
+        sink.put(Frame(np.array([4, 5, 6], dtype=np.uint16), "ir_01", 1), timestamp)
+
+        sink.start()
+        await sink.stop()
+
+        records = [json.loads(line) for line in path_file.read_text().splitlines()]
+        assert records == [
+            {
+                "sensor_id": "ir_01",
+                "seq": 0,
+                "value": [1, 2, 3],
+                "timestamp": timestamp.isoformat(),
+            },
+            {
+                "sensor_id": "ir_01",
+                "seq": 1,
+                "value": [4, 5, 6],
+                "timestamp": timestamp.isoformat(),
+            },
+        ]
+
+    @pytest.mark.asyncio
+    async def test_app_sensors(self, tmp_path):
+        path_file = tmp_path / "sensor_data.jsonl"
+        app_sensor_reader = AppSensorReader(
+            0, "127.0.0.1:5432", sinks=["file"], path_file_sink=str(path_file)
+        )
+
+        # Latest frames of all sensors are handed once to the sinks
+        await ingest_frames(app_sensor_reader, ["ir_01", "ir_02"])
+        for _ in range(5):
+            await app_sensor_reader.process_sensor_data()
+        assert app_sensor_reader.throughput_processed.count == 2
+        app_sensor_reader.sinks[0].start()
+        await app_sensor_reader.sinks[0].stop()
+
+        records = read_file_sink(path_file)
+        assert sorted(record["sensor_id"] for record in records) == ["ir_01", "ir_02"]
+        assert app_sensor_reader.last_sensor_frames == {}
+
+    @pytest.mark.parametrize(
+        "sinks, expected_sink_types",
+        [
+            (None, [NatsSink, PostgresSink]),
+            (["nats", "file"], [NatsSink, FileSink]),
+            (["file", "pixels"], [FileSink, PixelHistorySink]),
+            (["nats", "shm"], [NatsSink, SharedMemorySink]),
+            (["nats", "calibrated"], [NatsSink, CalibrationSink]),
+        ],
+    )
+    def test_create_sinks(self, sinks, expected_sink_types):
+        freq_read_data = 5
+        uri_db_server = "127.0.0.1:5432"
+
+        app_sensor_reader = AppSensorReader(freq_read_data, uri_db_server, sinks=sinks)
+
+        assert [type(sink) for sink in app_sensor_reader.sinks] == expected_sink_types
+
+        with pytest.raises(ValueError):
+            app_sensor_reader.create_sink("unknown")
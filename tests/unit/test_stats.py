@@ -0,0 +1,32 @@
+import pytest
+
+from sensor_reader.monitoring.stats import LatencyHistogram, ThroughputMeter
+
+
+class TestStats:
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram()
+        assert histogram.snapshot()["p50"] is None
+
+        for value in [0.001] * 90 + [0.1] * 10:
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["mean"] == pytest.approx(0.0109)
+        assert snapshot["p50"] == pytest.approx(0.001, rel=0.15)
+        assert snapshot["p99"] == pytest.approx(0.1, rel=0.15)
+        assert snapshot["max"] == 0.1
+
+        other = LatencyHistogram()
+        other.record(1.0)
+        histogram.merge(other)
+        assert histogram.count == 101
+        assert histogram.max == 1.0
+
+    def test_throughput_meter(self):
+        meter = ThroughputMeter(window=10.0)
+        for _ in range(20):
+            meter.record()
+
+        assert meter.snapshot() == {"count": 20, "rate": 2.0}
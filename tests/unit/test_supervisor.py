@@ -0,0 +1,138 @@
+import json
+from unittest import mock
+
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.app import AppSensorReader, get_shard, get_shard_mapping
+from sensor_reader.supervisor import Supervisor
+from tests.command.app_command import build_command
+
+
+def get_worker_stats(count_received: int, count_written: int):
+    return {
+        "status": "ok",
+        "stats": {
+            "throughput": {
+                "received": {"count": count_received, "rate": 10.0},
+                "processed": {"count": count_received, "rate": 5.0},
+            },
+            "sinks": {
+                "nats": {
+                    "queue_depth": 1,
+                    "written": count_written,
+                    "dropped": 0,
+                    "failed": 0,
+                }
+            },
+        },
+    }
+
+
+class TestSupervisor:
+    def test_shards_partition_sensors(self):
+        shard_count = 3
+        sensor_ids = [f"ir_{index:02d}" for index in range(30)]
+        apps = [
+            AppSensorReader(
+                5, "127.0.0.1:5432", shard_index=index, shard_count=shard_count
+            )
+            for index in range(shard_count)
+        ]
+
+        # Each sensor is owned by exactly one worker, which subscribes to the subject of its
+        # shard, and whose commands topic is its own
+        for sensor_id in sensor_ids:
+            owners = [app.shard_index for app in apps if app.is_sensor_owned(sensor_id)]
+            assert owners == [get_shard(sensor_id, shard_count)]
+        assert apps[1].topic_raw_data_sensors == "sensors.shard.1.*"
+        assert apps[1].sensor_id_from_subject("sensors.shard.1.ir_01") == "ir_01"
+        assert apps[1].topic_command == "app_command.worker.1"
+
+        app = AppSensorReader(5, "127.0.0.1:5432")
+        assert all(app.is_sensor_owned(sensor_id) for sensor_id in sensor_ids)
+        assert app.topic_raw_data_sensors == "sensors.*"
+        assert app.topic_command == "app_command"
+
+    def test_shards_match_nats_partitions(self):
+        # NATS server partitions subjects with the 32-bit FNV-1a hash of the wildcard token
+        assert get_shard("", 2**32) == 0x811C9DC5
+        assert get_shard("a", 2**32) == 0xE40C292C
+        assert get_shard_mapping(4) == {
+            "sensors.*": "sensors.shard.{{partition(4,1)}}.{{wildcard(1)}}"
+        }
+
+    def test_worker_kwargs(self):
+        supervisor = Supervisor(
+            2, {"path_file_sink": "data/out.jsonl", "path_profiling_dir": "prof"}
+        )
+
+        app_kwargs = supervisor.get_worker_kwargs(1)
+        assert app_kwargs["path_file_sink"] == "data/out.worker_1.jsonl"
+        assert app_kwargs["path_profiling_dir"] == "prof/worker_1"
+
+    def test_restart_crashed_workers(self):
+        supervisor = Supervisor(2, {}, restart_backoff=0.0)
+        workers = [mock.Mock(), mock.Mock()]
+        workers[0].is_alive.return_value = True
+        workers[1].is_alive.return_value = False
+        supervisor.workers = workers  # type: ignore
+
+        with mock.patch.object(supervisor, "start_worker") as start_worker:
+            supervisor.monitor_workers()
+
+        start_worker.assert_called_once_with(1)
+        assert supervisor.count_restarts == [0, 1]
+
+        # Workers exiting on command are not restarted
+        supervisor.flag_exit = True
+        with mock.patch.object(supervisor, "start_worker") as start_worker:
+            supervisor.monitor_workers()
+        start_worker.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_forward_set_and_stats_commands(self):
+        supervisor = Supervisor(2, {})
+        supervisor.nats_client = mock.AsyncMock()
+
+        # Tuning parameters are forwarded and kept for restarted workers
+        supervisor.nats_client.request.return_value = mock.Mock(
+            data=json.dumps({"status": "ok"}).encode()
+        )
+        msg = Msg(
+            _client=None,  # type: ignore
+            subject="app_command",
+            reply="reply_set",
+            data=build_command("set", {"sink_batch_size": 10}).encode(),
+        )
+        await supervisor.handler_command_messages(msg)
+
+        subjects = [
+            call.args[0] for call in supervisor.nats_client.request.call_args_list
+        ]
+        assert subjects == ["app_command.worker.0", "app_command.worker.1"]
+        assert supervisor.tuning_params == {"sink_batch_size": 10}
+        subject_reply, payload = supervisor.nats_client.publish.call_args.args
+        assert subject_reply == "reply_set"
+        assert json.loads(payload.decode())["status"] == "ok"
+
+        # Statistics of workers are aggregated
+        supervisor.nats_client.request.side_effect = [
+            mock.Mock(data=json.dumps(get_worker_stats(100, 90)).encode()),
+            mock.Mock(data=json.dumps(get_worker_stats(50, 40)).encode()),
+        ]
+        msg = Msg(
+            _client=None,  # type: ignore
+            subject="app_command",
+            reply="reply_stats",
+            data=build_command("stats").encode(),
+        )
+        await supervisor.handler_command_messages(msg)
+
+        _, payload = supervisor.nats_client.publish.call_args.args
+        stats = json.loads(payload.decode())["stats"]
+        assert stats["count_workers"] == 2
+        assert stats["throughput"]["received"] == {"count": 150, "rate": 20.0}
+        assert stats["sinks"]["nats"]["written"] == 130
+        assert stats["sinks"]["nats"]["queue_depth"] == 2
+        assert [worker["restarts"] for worker in stats["workers"]] == [0, 0]
@@ -0,0 +1,64 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from sensor_reader.app import AppSensorReader
+from sensor_reader.data.frame import Frame, FrameStage
+from sensor_reader.monitoring.tracing import LatencyTracer
+
+
+class TestLatencyTracer:
+    def test_stage_latencies(self, caplog):
+        tracer = LatencyTracer(slow_threshold=0.5)
+
+        frame = Frame(np.zeros(64, dtype=np.uint16), "ir_01", 0)
+        # Capture is stamped by the sensor with its own monotonic clock
+        frame.stamp(FrameStage.CAPTURE, (5.0, 1000.0))
+        frame.stamp(FrameStage.RECEIPT, (100.0, 1000.2))
+        frame.stamp(FrameStage.PARSE, (100.001, 1000.201))
+        frame.stamp(FrameStage.PUBLISH, (100.003, 1000.203))
+        frame.stamp(FrameStage.COMMIT, (101.0, 1001.2))
+
+        for stage in [FrameStage.PARSE, FrameStage.PUBLISH, FrameStage.COMMIT]:
+            tracer.record(frame, stage)
+
+        snapshot = tracer.snapshot()["stages"]
+        assert snapshot["receipt_to_parse"]["max"] == pytest.approx(0.001)
+        assert snapshot["parse_to_publish"]["max"] == pytest.approx(0.002)
+        assert snapshot["publish_to_commit"]["max"] == pytest.approx(0.997)
+        assert snapshot["total_to_publish"]["max"] == pytest.approx(0.203)
+        assert snapshot["total_to_commit"]["max"] == pytest.approx(1.2)
+
+        # Only the frame reaching the slow threshold is logged
+        assert tracer.count_slow_frames == 1
+        assert any("Slow frame ir_01#0" in record.message for record in caplog.records)
+
+    def test_missing_capture(self):
+        tracer = LatencyTracer()
+
+        frame = Frame(np.zeros(64, dtype=np.uint16), "ir_01", 0)
+        frame.stamp(FrameStage.PARSE)
+        tracer.record(frame, FrameStage.PARSE)
+
+        assert set(tracer.snapshot()["stages"]) == {"receipt_to_parse"}
+
+    @pytest.mark.asyncio
+    async def test_republished_frame(self):
+        app_sensor_reader = AppSensorReader(5, "127.0.0.1:5432")
+        app_sensor_reader.nats_client = mock.AsyncMock()
+        frame = Frame(np.zeros(64, dtype=np.uint16), "ir_01", 0)
+
+        # Last frame is published again until a new one arrives
+        for _ in range(3):
+            await app_sensor_reader.publish_sensor_data(frame)
+        frame.stamp_once(FrameStage.COMMIT)
+
+        calls = app_sensor_reader.nats_client.publish.call_args_list
+        stamps = {call.kwargs["headers"]["Stamp-Publish"] for call in calls}
+        snapshot = app_sensor_reader.tracer.snapshot()["stages"]
+        assert len(calls) == 3 and len(stamps) == 1
+        assert snapshot["receipt_to_publish"]["count"] == 1
+        assert not frame.stamp_once(FrameStage.PUBLISH)
+        # Commit is local to this process
+        assert "Stamp-Commit" not in frame.get_headers()
@@ -0,0 +1,157 @@
+import os
+import time
+from unittest import mock
+
+import pytest
+from nats.aio.msg import Msg
+
+from sensor_reader.traffic.capture_file import (
+    CaptureFileError,
+    CaptureReader,
+    CaptureWriter,
+)
+from sensor_reader.traffic.recorder import TrafficRecorder
+from sensor_reader.traffic.replayer import TrafficReplayer
+
+
+def write_capture(path_file, count_records, interval_ns=10_000_000, index_interval=4):
+    writer = CaptureWriter(str(path_file), index_interval=index_interval)
+    writer.open()
+    time_start = time.monotonic_ns()
+    for index in range(count_records):
+        writer.write(
+            f"sensors.ir_{index % 2}",
+            f"[{index}]".encode(),
+            {"Stamp-Capture": "1.0 2.0"} if index % 2 else None,
+            time_start + index * interval_ns,
+        )
+    writer.close()
+
+
+class TestCaptureFile:
+    def test_roundtrip(self, tmp_path):
+        path_file = tmp_path / "capture.bin"
+        write_capture(path_file, 10)
+
+        reader = CaptureReader(str(path_file))
+        records = list(reader)
+        reader.close()
+
+        assert reader.count_records == 10
+        assert len(reader.index) == 3
+        assert [record.payload for record in records] == [
+            f"[{index}]".encode() for index in range(10)
+        ]
+        assert records[1].subject == "sensors.ir_1"
+        assert records[1].headers == {"Stamp-Capture": "1.0 2.0"}
+        assert records[0].headers == {}
+        assert records[9].time_offset - records[0].time_offset == 90_000_000
+
+    def test_time_zero(self, tmp_path):
+        path_file = tmp_path / "capture.bin"
+        writer = CaptureWriter(str(path_file))
+        with mock.patch("sensor_reader.traffic.capture_file.time") as time_capture:
+            time_capture.monotonic_ns.side_effect = [0, 5_000, 9_000]
+            writer.open()
+            # Monotonic time 0 is a valid time, not a missing one
+            writer.write("sensors.ir_0", b"[0]", time_ns=0)
+            writer.write("sensors.ir_0", b"[1]")
+        writer.close()
+
+        reader = CaptureReader(str(path_file))
+        assert [record.time_offset for record in reader] == [0, 5_000]
+        reader.close()
+
+    def test_seek(self, tmp_path):
+        path_file = tmp_path / "capture.bin"
+        write_capture(path_file, 10)
+
+        reader = CaptureReader(str(path_file))
+        time_offset_start = list(reader)[6].time_offset
+        records = list(reader.read(time_offset_start))
+        reader.close()
+
+        assert [record.payload for record in records] == [
+            b"[6]",
+            b"[7]",
+            b"[8]",
+            b"[9]",
+        ]
+
+    def test_truncated_file(self, tmp_path):
+        path_file = tmp_path / "capture.bin"
+        write_capture(path_file, 10)
+
+        # Remove index, footer and part of the last record, like an interrupted recording
+        size_file = os.path.getsize(path_file)
+        os.truncate(path_file, size_file - 3 * 16 - 32 - 2)
+
+        reader = CaptureReader(str(path_file))
+        records = list(reader)
+        reader.close()
+
+        assert reader.count_records is None
+        assert len(records) == 9
+
+    def test_bad_file(self, tmp_path):
+        path_file = tmp_path / "capture.bin"
+        files = []
+
+        def open_file(*args):
+            files.append(open(*args))
+            return files[-1]
+
+        # Files are closed when rejected, including ones shorter than the header
+        for data in [b"not a capture file at all", b"short"]:
+            path_file.write_bytes(data)
+            with mock.patch(
+                "sensor_reader.traffic.capture_file.open", open_file, create=True
+            ):
+                with pytest.raises(CaptureFileError):
+                    CaptureReader(str(path_file))
+
+        assert len(files) == 2 and all(file.closed for file in files)
+
+
+class TestTrafficRecordReplay:
+    @pytest.mark.asyncio
+    async def test_recorder(self, tmp_path):
+        path_file = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(str(path_file))
+        # Same subjects as the app, without the subjects of sharded workers
+        assert recorder.subjects == ["sensors", "sensors.*"]
+        recorder.writer.open()
+
+        msg = Msg(_client=None, subject="sensors.ir_0", data=b"[1, 2]")
+        await recorder.handler_messages(msg)
+        recorder.writer.close()
+
+        reader = CaptureReader(str(path_file))
+        assert [(record.subject, record.payload) for record in reader] == [
+            ("sensors.ir_0", b"[1, 2]")
+        ]
+        reader.close()
+
+    @pytest.mark.parametrize(
+        "speed, expected_min_duration, expected_max_duration",
+        [(1.0, 0.09, 0.5), (10.0, 0.009, 0.05), (0.0, 0.0, 0.01)],
+    )
+    @pytest.mark.asyncio
+    async def test_replayer_speed(
+        self, speed, expected_min_duration, expected_max_duration, tmp_path
+    ):
+        path_file = tmp_path / "capture.bin"
+        write_capture(path_file, 10)
+
+        replayer = TrafficReplayer(str(path_file), speed=speed)
+        replayer.nats_client = mock.AsyncMock()
+        summary = await replayer.replay()
+
+        assert summary["messages"] == 10
+        assert expected_min_duration <= summary["duration"] <= expected_max_duration
+
+        calls = replayer.nats_client.publish.call_args_list
+        assert [call.args[0] for call in calls[:2]] == ["sensors.ir_0", "sensors.ir_1"]
+        # Capture timestamps are replaced by replay time
+        assert calls[1].kwargs["headers"]["Stamp-Capture"] != "1.0 2.0"
+        assert calls[0].kwargs["headers"] is None